@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2021 unfoldingWord
+#  http://creativecommons.org/licenses/MIT/
+#  See LICENSE file for details.
+#
+#  Contributors:
+#  Richard Mahn <rich.mahn@unfoldingword.org>
+
+"""
+Generates and validates the locale bundles in converters/pdf/locale used by the PDF converters.
+
+Jobs never translate at run time, so run this whenever a language is added to the catalog
+or a key is added to en.json, review the machine translations, and commit the bundles.
+
+    ./build_pdf_locales.py                  # Machine translate bundles for catalog languages that have none
+    ./build_pdf_locales.py -l fr -l hi      # Only these languages
+    ./build_pdf_locales.py --validate       # Check all the bundles, exiting non-zero on errors
+"""
+import argparse
+import json
+import os
+import sys
+import googletrans
+from app_settings.app_settings import AppSettings
+from converters.pdf.locales import LOCALE_DIR, DEFAULT_LOCALE, get_macro_language, validate_locale_bundle
+from general_tools.file_utils import load_json_object, write_file
+from rq_settings import prefix
+
+CATALOG_PAGE_SIZE = 100
+
+
+def get_catalog_languages():
+    """
+    Returns the languages of all the prod entries in the catalog, going through all the pages of the search,
+        or None if the catalog can't be searched
+    """
+    languages = set()
+    page = 1
+    while True:
+        try:
+            response = AppSettings.catalog_api.catalog_search(stage='prod', page=page, limit=CATALOG_PAGE_SIZE)
+        except Exception as e: # Also network errors, not just ApiException
+            print(f"Exception when calling V5Api->catalog_search: {e}")
+            return None
+        if not response or not response.ok:
+            print(f"Unable to search the catalog (page {page})")
+            return None
+        for entry in response.data:
+            languages.add(entry.language)
+        if len(response.data) < CATALOG_PAGE_SIZE:
+            return sorted(languages)
+        page += 1
+
+
+def get_google_language(language_id):
+    while language_id:
+        if language_id in googletrans.LANGUAGES:
+            return language_id
+        language_id = get_macro_language(language_id)
+    return None
+
+
+def build_locale_bundle(language_id, en_bundle, existing_bundle=None):
+    """
+    Machine translates the English bundle into the given language, keeping any existing translations
+    """
+    google_lang = get_google_language(language_id)
+    if not google_lang:
+        print(f"{language_id}: not supported by Google Translate, so will fall back to {get_macro_language(language_id) or DEFAULT_LOCALE}")
+        return None
+    bundle = existing_bundle or {
+        'source': en_bundle['target'],
+        'target': language_id,
+        'translator': 'google',
+        'google_lang': google_lang,
+        'translations': {},
+    }
+    translator = googletrans.Translator()
+    for key, value in en_bundle['translations'].items():
+        if key in bundle['translations']:
+            continue
+        try:
+            translation = translator.translate(value, src=DEFAULT_LOCALE, dest=google_lang)
+        except Exception as e:
+            print(f"{language_id}: unable to translate `{key}`: {e}")
+            continue
+        if translation and translation.text:
+            bundle['translations'][key] = translation.text
+    return bundle
+
+
+def build_locales(languages, overwrite=False):
+    en_bundle = load_json_object(os.path.join(LOCALE_DIR, f'{DEFAULT_LOCALE}.json'))
+    if not languages:
+        languages = get_catalog_languages()
+        if languages is None:
+            return False
+    for language_id in languages:
+        if language_id == DEFAULT_LOCALE:
+            continue
+        locale_file = os.path.join(LOCALE_DIR, f'{language_id}.json')
+        existing_bundle = None if overwrite else load_json_object(locale_file)
+        if existing_bundle and all(key in existing_bundle['translations'] for key in en_bundle['translations']):
+            continue
+        bundle = build_locale_bundle(language_id, en_bundle, existing_bundle)
+        if bundle and bundle['translations']:
+            write_file(locale_file, json.dumps(bundle, sort_keys=True, indent=2, ensure_ascii=False) + '\n')
+            print(f"{language_id}: wrote {locale_file}")
+    return True
+
+
+def validate_locales(strict=False):
+    en_bundle = load_json_object(os.path.join(LOCALE_DIR, f'{DEFAULT_LOCALE}.json'))
+    failed = False
+    for filename in sorted(os.listdir(LOCALE_DIR)):
+        if not filename.endswith('.json'):
+            continue
+        language_id = filename[:-len('.json')]
+        try:
+            bundle = load_json_object(os.path.join(LOCALE_DIR, filename))
+        except ValueError as e:
+            print(f"{language_id}: invalid JSON: {e}")
+            failed = True
+            continue
+        errors, missing = validate_locale_bundle(bundle, en_bundle)
+        if bundle.get('target') not in [None, language_id]:
+            errors.append(f"Target `{bundle['target']}` doesn't match the file name")
+        for error in errors:
+            print(f"{language_id}: {error}")
+        for key in missing:
+            print(f"{language_id}: missing `{key}`")
+        if errors or (strict and missing):
+            failed = True
+    return not failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-l', '--lang', metavar='LANGUAGE', dest='languages', action='append', default=[],
+                        help='Language to build a bundle for. Can specify multiple. Default: all languages in the catalog')
+    parser.add_argument('--overwrite', dest='overwrite', action='store_true',
+                        help='Re-translate bundles that already exist')
+    parser.add_argument('--validate', dest='validate', action='store_true', help='Only validate the existing bundles')
+    parser.add_argument('--strict', dest='strict', action='store_true',
+                        help='When validating, also fail on keys missing from a bundle')
+
+    args = parser.parse_args(sys.argv[1:])
+    if args.validate:
+        sys.exit(0 if validate_locales(args.strict) else 1)
+    AppSettings(prefix=prefix) # Sets up the catalog API
+    sys.exit(0 if build_locales(args.languages, args.overwrite) else 1)
@@ -73,8 +73,8 @@ class BiblePdfConverter(AlignedBiblePdfConverter):
     def get_appendix_rcs(self):
         pass
 
-    def replace_rc_links(self, text):
-        return text
+    def replace_rc_links(self, soup):
+        pass
 
     def get_body_html(self):
         self.log.info('Creating Bible for {0}...'.format(self.file_project_and_ref))
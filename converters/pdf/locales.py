@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2020 unfoldingWord
+#  http://creativecommons.org/licenses/MIT/
+#  See LICENSE file for details.
+#
+#  Contributors:
+#  Richard Mahn <rich.mahn@unfoldingword.org>
+
+"""
+Locale bundles for the PDF converters
+
+The bundles in the locale directory are generated and validated ahead of time by build_pdf_locales.py,
+so a job never translates anything or writes to the package. They are loaded once per worker and each
+language gets its translations compiled from its fallback chain: language -> macro-language -> English.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+from general_tools.file_utils import load_json_object
+
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'locale')
+DEFAULT_LOCALE = 'en'
+
+# Individual languages whose macro-language uses the same script, so its locale is a better fallback than English
+MACRO_LANGUAGES = {
+    'arb': 'ar',
+    'cmn': 'zh',
+    'npi': 'ne',
+    'ory': 'or',
+    'pes': 'fa',
+    'plt': 'mg',
+    'swh': 'sw',
+    'zsm': 'ms',
+}
+
+_locale_bundles = None
+_compiled_translations = {}
+
+
+def load_locale_bundles(locale_dir:str=LOCALE_DIR) -> Dict[str,dict]:
+    """
+    Returns all the locale bundles keyed by language code, reading them in only the first time
+    """
+    global _locale_bundles
+    if _locale_bundles is None:
+        bundles = {}
+        for filename in sorted(os.listdir(locale_dir)):
+            if filename.endswith('.json'):
+                bundles[filename[:-len('.json')]] = load_json_object(os.path.join(locale_dir, filename))
+        _locale_bundles = bundles
+    return _locale_bundles
+
+
+def get_macro_language(language_id:str) -> Optional[str]:
+    """
+    Returns the language code to fall back to for the given one, e.g. es-419 => es, plt => mg
+    """
+    if language_id in MACRO_LANGUAGES:
+        return MACRO_LANGUAGES[language_id]
+    if '-' in language_id:
+        return language_id.rsplit('-', 1)[0]
+    return None
+
+
+def get_fallback_chain(language_id:str) -> List[str]:
+    """
+    Returns the language codes to look for translations in, in order, always ending with English
+    """
+    chain = [language_id]
+    macro_language = get_macro_language(language_id)
+    while macro_language and macro_language not in chain:
+        chain.append(macro_language)
+        macro_language = get_macro_language(macro_language)
+    if DEFAULT_LOCALE not in chain:
+        chain.append(DEFAULT_LOCALE)
+    return chain
+
+
+def get_locale_language(language_id:str) -> str:
+    """
+    Returns the first language in the fallback chain of the given language that has a locale bundle
+    """
+    bundles = load_locale_bundles()
+    for code in get_fallback_chain(language_id):
+        if code in bundles:
+            return code
+    return DEFAULT_LOCALE
+
+
+def get_translations(language_id:str) -> Dict[str,str]:
+    """
+    Returns all the translations for the given language, filling in keys missing from its bundle
+        from the rest of its fallback chain. Compiled only once per language.
+    """
+    if language_id not in _compiled_translations:
+        bundles = load_locale_bundles()
+        translations = {}
+        for code in reversed(get_fallback_chain(language_id)):
+            if code in bundles:
+                translations.update(bundles[code]['translations'])
+        _compiled_translations[language_id] = translations
+    return _compiled_translations[language_id]
+
+
+def validate_locale_bundle(bundle:dict, default_bundle:dict) -> Tuple[List[str],List[str]]:
+    """
+    Checks a locale bundle against the default (English) one
+
+    Returns a list of errors (things that would break or mislabel a PDF)
+        and a list of the keys missing from the bundle (which fall back to the rest of the chain)
+    """
+    errors = []
+    if not isinstance(bundle, dict) or not isinstance(bundle.get('translations'), dict):
+        return ['No translations'], []
+    for field in ['source', 'target']:
+        if field not in bundle:
+            errors.append(f'Missing `{field}` field')
+    default_translations = default_bundle['translations']
+    translations = bundle['translations']
+    for key, value in translations.items():
+        if key not in default_translations:
+            errors.append(f'Unknown key `{key}`')
+        elif not isinstance(value, str) or not value.strip():
+            errors.append(f'Empty translation for `{key}`')
+    missing = [key for key in default_translations if key not in translations]
+    return errors, missing
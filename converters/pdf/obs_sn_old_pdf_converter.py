@@ -84,13 +84,12 @@ class ObsSnPdfConverter(ObsSnPdfConverter):
                     orig_obs_text = obs_text
                     phrases = html_tools.get_phrases_to_highlight(notes_html, 'h4')
                     if phrases:
+                        highlighter = html_tools.PhraseHighlighter(obs_text)
                         for phrase in phrases:
                             alignment = alignment_tools.split_string_into_alignment(phrase)
-                            marked_obs_text = html_tools.mark_phrases_in_html(obs_text, alignment)
-                            if not marked_obs_text:
+                            if not highlighter.mark(alignment):
                                 self.add_bad_highlight(obs_sn_rc, orig_obs_text, obs_sn_rc.rc_link, phrase)
-                            else:
-                                obs_text = marked_obs_text
+                        obs_text = highlighter.get_html()
 
                 obs_sn_html += f'''
 <div id="{obs_sn_rc.article_id}" class="frame">
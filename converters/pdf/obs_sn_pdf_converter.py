@@ -17,6 +17,7 @@ import general_tools.html_tools as html_tools
 from door43_tools.subjects import OBS_STUDY_NOTES
 from bs4 import BeautifulSoup
 from .pdf_converter import PdfConverter
+from .rc_link import ResourceContainerLinks
 from general_tools import obs_tools, alignment_tools
 from general_tools.url_utils import download_file
 from general_tools.file_utils import unzip
@@ -85,9 +86,9 @@ class ObsSnPdfConverter(PdfConverter):
             self.project_id = project
             self.errors = {}
             self.bad_highlights = {}
-            self.rcs = {}
-            self.appendix_rcs = {}
-            self.all_rcs = {}
+            self.rcs = ResourceContainerLinks()
+            self.appendix_rcs = ResourceContainerLinks()
+            self.all_rcs = ResourceContainerLinks()
             self.generate_html_file()
             self.generate_pdf_file()
 
@@ -138,13 +139,12 @@ class ObsSnPdfConverter(PdfConverter):
                     orig_obs_text = obs_text
                     phrases = html_tools.get_phrases_to_highlight(notes_html, 'h4')
                     if phrases:
+                        highlighter = html_tools.PhraseHighlighter(obs_text)
                         for phrase in phrases:
                             alignment = alignment_tools.split_string_into_alignment(phrase)
-                            marked_obs_text = html_tools.mark_phrases_in_html(obs_text, alignment)
-                            if not marked_obs_text:
+                            if not highlighter.mark(alignment):
                                 self.add_bad_highlight(obs_sn_rc, orig_obs_text, obs_sn_rc.rc_link, phrase)
-                            else:
-                                obs_text = marked_obs_text
+                        obs_text = highlighter.get_html()
 
                 obs_sn_html += f'''
         <div id="{obs_sn_rc.article_id}" class="frame">
@@ -226,13 +226,12 @@ class ObsSnPdfConverter(PdfConverter):
                     orig_obs_text = obs_text
                     phrases = html_tools.get_phrases_to_highlight(notes_html, 'h4')
                     if phrases:
+                        highlighter = html_tools.PhraseHighlighter(obs_text)
                         for phrase in phrases:
                             alignment = alignment_tools.split_string_into_alignment(phrase)
-                            marked_obs_text = html_tools.mark_phrases_in_html(obs_text, alignment)
-                            if not marked_obs_text:
+                            if not highlighter.mark(alignment):
                                 self.add_bad_highlight(obs_sn_rc, orig_obs_text, obs_sn_rc.rc_link, phrase)
-                            else:
-                                obs_text = marked_obs_text
+                        obs_text = highlighter.get_html()
 
                 obs_sn_sq_html += f'''
         <article id="{obs_sn_rc.article_id}">
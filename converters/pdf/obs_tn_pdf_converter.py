@@ -156,15 +156,14 @@ class ObsTnPdfConverter(PdfConverter):
                         orig_obs_text = obs_text
                         if notes_html:
                             phrases = html_tools.get_phrases_to_highlight(notes_html, 'h4')
+                            highlighter = html_tools.PhraseHighlighter(obs_text)
                             for phrase in phrases:
                                 alignment = alignment_tools.split_string_into_alignment(phrase)
-                                marked_obs_text = html_tools.mark_phrases_in_html(obs_text, alignment)
-                                if not marked_obs_text:
+                                if not highlighter.mark(alignment):
                                     if self.language_id in TN_TITLES_TO_IGNORE and \
                                             phrase.lower() not in TN_TITLES_TO_IGNORE[self.language_id]:
                                         self.add_bad_highlight(notes_rc, orig_obs_text, notes_rc.rc_link, phrase)
-                                else:
-                                    obs_text = marked_obs_text
+                            obs_text = highlighter.get_html()
 
                     if frame_idx == len(frames) - 1:
                         if 'bible_reference' in chapter_data and chapter_data['bible_reference']:
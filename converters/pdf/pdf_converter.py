@@ -17,9 +17,10 @@ import markdown2
 import string
 import yaml
 import shutil
+import tempfile
 import general_tools.html_tools as html_tools
-import googletrans
 import json
+from datetime import datetime
 from dcs_catalog_client.rest import ApiException
 from collections import Counter
 from cssutils import parseStyle
@@ -31,13 +32,18 @@ from urllib.parse import urlsplit, urlunsplit, urlparse
 from general_tools.font_utils import get_font_html_with_local_fonts
 from general_tools.file_utils import write_file, read_file, load_json_object, unzip
 from general_tools.url_utils import download_file, get_url
+from general_tools.debug_artifacts import DebugArtifacts, DEBUG_ARTIFACTS_ERRORS, DEBUG_ARTIFACTS_FULL, \
+    DEBUG_ARTIFACTS_NONE
 from .resource import Resource, Resources, DEFAULT_REF, DEFAULT_OWNER, OWNERS
-from .rc_link import ResourceContainerLink
+from .rc_link import ResourceContainerLink, ResourceContainerLinks
+from .locales import get_translations, get_locale_language
+from .pdf_sections import get_pdf_sections, get_section_html, get_cross_section_links, join_pdf_files
 from converters.converter import Converter
 from door43_tools.bible_books import BOOK_NUMBERS
 from door43_tools.subjects import SUBJECT_ALIASES, REQUIRED_RESOURCES, HEBREW_OLD_TESTAMENT, GREEK_NEW_TESTAMENT, ALIGNED_BIBLE, BIBLE, \
     OPEN_BIBLE_STORIES, TRANSLATION_ACADEMY, TRANSLATION_WORDS
 from app_settings.app_settings import AppSettings
+from rq_settings import debug_artifacts_level, debug_artifacts_dir
 
 STAGE_PROD = 'prod'
 STAGE_PREPROD = 'preprod'
@@ -60,6 +66,9 @@ APPENDIX_LINKING_LEVEL = 1
 APPENDIX_RESOURCES = ['ta', 'tw']
 CONTRIBUTORS_TO_HIDE = ['ugnt', 'uhb']
 
+# HTML files at least this big are rendered to PDF section by section (see write_pdf_in_sections())
+SECTIONED_PDF_MIN_HTML_SIZE = 15 * 1024 * 1024
+
 
 class PdfConverter(Converter):
     my_subject = None
@@ -72,6 +81,12 @@ class PdfConverter(Converter):
         self.relation_resources = Resources()
         self.project_id = None
 
+        level = self.options.get('debug_artifacts', debug_artifacts_level)
+        if not level:
+            level = DEBUG_ARTIFACTS_FULL if self.debug_mode else DEBUG_ARTIFACTS_NONE
+        job_name = f"{self.repo_subject}_{datetime.utcnow().strftime('%Y-%m-%d_%H:%M:%S_%f')}"
+        self.debug_artifacts = DebugArtifacts(os.path.join(debug_artifacts_dir, job_name), level)
+
         if not os.path.isdir(self.source_dir):
             self.log.error(f"No such folder: {self.source_dir}")
             return
@@ -95,9 +110,10 @@ class PdfConverter(Converter):
         self._project = None
         self.errors = {}
         self.bad_highlights = {}
-        self.rcs = {}
-        self.appendix_rcs = {}
-        self.all_rcs = {}
+        self.rcs = ResourceContainerLinks()
+        self.appendix_rcs = ResourceContainerLinks()
+        self.all_rcs = ResourceContainerLinks()
+        self.html = None
 
     def __del__(self):
         self.close_loggers()
@@ -305,56 +321,14 @@ class PdfConverter(Converter):
 
     def translate(self, key):
         if not self.locale:
-            locale_file = os.path.join(self.pdf_converters_dir, 'locale', f'{self.language_id}.json')
-            if os.path.isfile(locale_file):
-                self.locale = load_json_object(locale_file)
-            else:
-                self.log.warning(f'No locale file for {self.language_id}. Using English (en) with Google translate')
-                self.locale = self.get_locale_with_google()
-        if key not in self.locale['translations']:
+            self.locale = get_translations(self.language_id)
+            locale_language = get_locale_language(self.language_id)
+            if locale_language != self.language_id:
+                self.log.warning(f'No locale file for {self.language_id}. Using {locale_language}')
+        if key not in self.locale:
             self.log.error(f"No translation for `{key}`")
             exit(1)
-        return self.locale['translations'][key]
-
-    def determine_google_language(self):
-        if self.language_id in googletrans.LANGUAGES:
-            return self.language_id
-        else:
-            sample_text = self.get_sample_text()
-            if sample_text:
-                translator = googletrans.Translator()
-                detect = translator.detect(sample_text)
-                if detect and detect.lang:
-                    return detect.lang
-                else:
-                    return None
-            else:
-                return None
-
-    def get_locale_with_google(self):
-        en_locale_file = os.path.join(self.pdf_converters_dir, 'locale', 'en.json')
-        locale = load_json_object(en_locale_file)
-        google_lang = self.determine_google_language()
-        locale_file = os.path.join(self.pdf_converters_dir, 'locale', f'{self.language_id}.json')
-        if os.path.exists(locale_file):
-            return load_json_object(locale_file)
-        locale['source'] = locale['target']
-        locale['target'] = self.language_id
-        locale['translator'] = 'google'
-        locale['google_lang'] = google_lang
-        translator = googletrans.Translator()
-        for key, value in locale['translations'].items():
-            translation=None
-            try:
-                translation = translator.translate(value, src='en', dest=google_lang)
-            except:
-                pass
-            if translation and translation.text:
-                locale['translations'][key] = translation.text
-            else:
-                locale['translations'][key] = value
-        write_file(locale_file, json.dumps(locale, sort_keys=True, indent=2, ensure_ascii=False))
-        return locale
+        return self.locale[key]
 
     @staticmethod
     def create_rc(rc_link, article='', title=None, linking_level=0, article_id=None):
@@ -426,6 +400,7 @@ class PdfConverter(Converter):
         pass
 
     def finish_up(self):
+        self.debug_artifacts.close()
         self.close_loggers()
 
     def setup_images_dir(self):
@@ -506,6 +481,7 @@ class PdfConverter(Converter):
             self.generate_pdf_file()
 
     def generate_html_file(self):
+        self.html = None
         if not os.path.exists(self.html_file):
             self.log.info(f'Creating HTML file for {self.file_project_and_ref}...')
 
@@ -517,13 +493,12 @@ class PdfConverter(Converter):
 
             self.log.info('Generating body HTML...')
             body_html = self.get_body_html()
-            body_html = self.add_fit_to_page_wrappers(body_html)
             if not body_html:
                 return False
-            write_file("/tmp/out.html", body_html)
+            self.debug_artifacts.save(f'{self.file_project_and_ref}_body.html', body_html)
             self.log.info('Generating appendix RCs...')
             self.get_appendix_rcs()
-            self.all_rcs = {**self.rcs, **self.appendix_rcs}
+            self.all_rcs = ResourceContainerLinks({**self.rcs, **self.appendix_rcs})
             if 'ta' in self.resources:
                 self.log.info('Generating UTA appendix HTML...')
                 body_html += self.get_appendix_html(self.resources['ta'])
@@ -533,47 +508,57 @@ class PdfConverter(Converter):
             self.log.info('Fixing links in body HTML...')
             body_html = self.fix_links(body_html)
             body_html = self._fix_links(body_html)
-            self.log.info('Replacing RC links in body HTML...')
-            body_html = self.replace_rc_links(body_html)
-            self.log.info('Generating Contributors HTML...')
-            body_html += self.get_contributors_html()
-            self.log.info('Generating TOC HTML...')
-            body_html, toc_html = self.get_toc_html(body_html)
-            self.log.info('Done generating TOC HTML.')
 
             self.log.info('Populating HTML template...')
             with open(os.path.join(self.pdf_converters_dir, 'templates', 'pdf_template.html')) as template_file:
                 html_template = string.Template(template_file.read())
             title = f'{self.title} - v{self.version}'
-
-            self.log.info('Piecing together the HTML file...')
-            body_html = '\n'.join([cover_html, license_html, toc_html, body_html])
-            body_html = self.download_all_images(body_html)
             head = '\n'.join([f'<link href="{style}" rel="stylesheet">' for style in self.style_sheets])
             head += self.head_html
             html = html_template.safe_substitute(lang=self.language_id, dir=self.language_direction, title=title,
                                                  head=head, body=body_html)
-            write_file(self.html_file, html)
+            # From here on all the processing is done on this one parsed document, which is only serialized once
+            self.log.info('Parsing HTML...')
+            soup = BeautifulSoup(html, 'html.parser')
+            self.add_fit_to_page_wrappers(soup)
+            self.log.info('Replacing RC links in body HTML...')
+            self.replace_rc_links(soup)
+            self.log.info('Generating Contributors HTML...')
+            self.append_html(soup.body, self.get_contributors_html())
+            self.log.info('Generating TOC HTML...')
+            toc_html = self.get_toc_html(soup)
+            self.log.info('Done generating TOC HTML.')
+
+            self.log.info('Piecing together the HTML file...')
+            self.prepend_html(soup.body, '\n'.join([cover_html, license_html, toc_html]))
+            self.download_all_images(soup)
+            self.html = str(soup)
+            write_file(self.html_file, self.html)
+            if self.errors:
+                self.debug_artifacts.save(f'{self.file_project_and_ref}.html', self.html, DEBUG_ARTIFACTS_ERRORS)
             self.save_errors_html()
             self.save_bad_highlights_html()
             self.log.info('Generated HTML file.')
         else:
             self.log.info(f'HTML file {self.html_file} is already there. Not generating. Use -r to force regeneration.')
 
+    @staticmethod
+    def append_html(element, html):
+        for content in list(BeautifulSoup(html, 'html.parser').contents):
+            element.append(content.extract())
+
+    @staticmethod
+    def prepend_html(element, html):
+        for content in reversed(list(BeautifulSoup(html, 'html.parser').contents)):
+            element.insert(0, content.extract())
+
     @classmethod
-    def add_fit_to_page_wrappers(cls, html):
-        if 'fit-to-page' not in html:
-            return html
-        soup = BeautifulSoup(html, 'html.parser')
-        elements = soup.find_all(class_="fit-to-page")
-        if not elements:
-            return html
-        for i, element in enumerate(elements):
+    def add_fit_to_page_wrappers(cls, soup):
+        for i, element in enumerate(soup.find_all(class_="fit-to-page")):
             span = soup.new_tag("span", id=f"fit-to-page-{i+1}")
             for content in reversed(element.contents):
                 span.insert(0, content.extract())
             element.append(span)
-        return str(soup)
 
     def generate_pdf_file(self):
         if not os.path.exists(self.html_file):
@@ -583,9 +568,19 @@ class PdfConverter(Converter):
             self.log.info(f'Generating PDF file {self.pdf_file}...')
             # Convert HTML to PDF with weasyprint
             base_url = f'file://{self.output_dir}'
-            all_pages_fitted = False
-            soup = BeautifulSoup(read_file(self.html_file), 'html.parser')
-            doc = HTML(string=str(soup), base_url=base_url).render()
+            # Use the HTML we just generated if we have it, rather than reading it back in
+            html = self.html if self.html else read_file(self.html_file)
+            soup = None
+            doc = None
+            try:
+                if self.use_sectioned_pdf_rendering(len(html)):
+                    self.write_pdf_in_sections(BeautifulSoup(html, 'html.parser'), base_url)
+                else:
+                    doc = HTML(string=html, base_url=base_url).render()
+            except Exception:
+                self.debug_artifacts.save(f'{self.file_project_and_ref}_failed.html', html, DEBUG_ARTIFACTS_ERRORS)
+                raise
+            # OBS is never rendered in sections (see use_sectioned_pdf_rendering())
             if self.main_resource.subject == OPEN_BIBLE_STORIES:
                 all_pages_fit = False
                 tries = 0
@@ -598,6 +593,8 @@ class PdfConverter(Converter):
                                 if anchor not in doc.pages[page_idx-1].anchors:
                                     continue
                                 all_pages_fit = False
+                                if not soup:
+                                    soup = BeautifulSoup(html, 'html.parser')
                                 diff = 0.05
                                 if page.anchors[anchor][1] > 90:
                                     diff = 0.1
@@ -618,15 +615,96 @@ class PdfConverter(Converter):
                                 element['style'] = css
                                 self.log.info(f'RESIZING {anchor} to {font_size_str}... ({diff}, {page.anchors[anchor]})')
                     if not all_pages_fit:
-                        doc = HTML(string=str(soup), base_url=base_url).render()
-                        write_file(os.path.join(self.output_dir, f'{self.file_project_and_ref}_resized.html'),
-                                    str(soup))
-            doc.write_pdf(self.pdf_file)
+                        resized_html = str(soup)
+                        doc = HTML(string=resized_html, base_url=base_url).render()
+                        self.debug_artifacts.save(f'{self.file_project_and_ref}_resized.html', resized_html)
+            if doc:
+                doc.write_pdf(self.pdf_file)
             self.log.info('Generated PDF file.')
             self.log.info(f'PDF file located at {self.pdf_file}')
         else:
             self.log.info(f'PDF file {self.pdf_file} is already there. Not generating. Use -r to force regeneration.')
 
+    def use_sectioned_pdf_rendering(self, html_size):
+        if self.main_resource.subject == OPEN_BIBLE_STORIES:
+            # OBS resizes its fit-to-page frames by re-rendering the whole document
+            return False
+        if 'sectioned_pdf' in self.options:
+            return bool(self.options['sectioned_pdf'])
+        return html_size >= SECTIONED_PDF_MIN_HTML_SIZE
+
+    def write_pdf_in_sections(self, soup, base_url):
+        """
+        Renders the front matter (everything up to and including the TOC) and the body sections as separate
+        WeasyPrint documents, writes each one to its own PDF file and joins the files into self.pdf_file, so only
+        one section's DOM and layout is in memory at a time. The sections are laid out twice: first for their
+        page counts and the TOC page numbers (instead of re-paginating for target-counter()), then with the page
+        numbers continuing from the previous section via `counter-reset` and the total page count in the footer.
+        Links to anchors in other sections are added back when the files are joined.
+        """
+        front_matter_html, sections_html = get_pdf_sections(soup)
+        toc_links = []
+        contents = soup.find(id='contents')
+        if contents:
+            toc_links = contents.find_all('a', href=re.compile(r'^#'))
+        # The page count of the front matter is needed for the page offset of the body, so we lay it out first
+        # with placeholder page numbers and again at the end with the real ones
+        for link in toc_links:
+            link['data-page'] = '999'
+        self.log.info('Laying out the front matter...')
+        front_matter_page_count = len(self.render_pdf_section(soup, front_matter_html(), base_url).pages)
+        page_offset = front_matter_page_count
+        anchor_pages = {}
+        for section_idx, section_html in enumerate(sections_html):
+            self.log.info(f'Laying out section {section_idx + 1} of {len(sections_html)} (starting on page {page_offset + 1})...')
+            section_doc = self.render_pdf_section(soup, section_html, base_url, page_offset)
+            for page_idx, page in enumerate(section_doc.pages):
+                for anchor in page.anchors:
+                    if anchor not in anchor_pages:
+                        anchor_pages[anchor] = page_offset + page_idx + 1
+            page_offset += len(section_doc.pages)
+            del section_doc
+        total_pages = page_offset
+        for link in toc_links:
+            link['data-page'] = str(anchor_pages.get(link['href'][1:], ''))
+
+        temp_dir = tempfile.mkdtemp(prefix='pdf_sections_')
+        try:
+            pdf_files = []
+            all_anchors = set()
+            cross_section_links = []
+            page_offset = 0
+            for section_idx, section_html in enumerate([front_matter_html()] + sections_html):
+                if section_idx:
+                    self.log.info(f'Rendering section {section_idx} of {len(sections_html)}...')
+                else:
+                    self.log.info('Rendering the front matter with TOC page numbers...')
+                section_doc = self.render_pdf_section(soup, section_html, base_url, page_offset, total_pages)
+                if not section_idx and len(section_doc.pages) != front_matter_page_count:
+                    self.log.warning(f'Front matter went from {front_matter_page_count} to {len(section_doc.pages)} pages. TOC page numbers will be off.')
+                anchors, links = get_cross_section_links(section_doc.pages, page_offset)
+                all_anchors.update(anchors)
+                cross_section_links += links
+                pdf_files.append(os.path.join(temp_dir, f'section_{section_idx}.pdf'))
+                section_doc.write_pdf(pdf_files[-1])
+                page_offset += len(section_doc.pages)
+                del section_doc
+            self.log.info(f'Joining {len(pdf_files)} PDF files...')
+            join_pdf_files(pdf_files, self.pdf_file,
+                           [link for link in cross_section_links if link[1] in all_anchors])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def render_pdf_section(soup, body_html, base_url, page_offset=0, total_pages=None):
+        styles = '#contents ul a::after { content: attr(data-page); }'
+        if page_offset:
+            styles += f' @page :first {{ counter-reset: page {page_offset + 1}; }}'
+        if total_pages:
+            # counter(pages) would only count the pages of this section
+            styles += f' @page {{ @bottom-center {{ content: counter(page) " / {total_pages}"; }} }}'
+        return HTML(string=get_section_html(soup, body_html, styles), base_url=base_url).render()
+
     def save_errors_html(self):
         if not self.errors:
             self.log.info('No errors for this version!')
@@ -777,8 +855,7 @@ class PdfConverter(Converter):
                 return resource
         return None
 
-    def download_all_images(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
+    def download_all_images(self, soup):
         for img in soup.find_all('img'):
             if img['src'].startswith('http'):
                 u = urlsplit(img['src'])._replace(query="", fragment="")
@@ -793,7 +870,6 @@ class PdfConverter(Converter):
                     except:
                         pass
                 img['src'] = file_path
-        return str(soup)
 
     @abstractmethod
     def get_body_html(self):
@@ -804,18 +880,19 @@ class PdfConverter(Converter):
         pass
 
     def get_rc_by_article_id(self, article_id):
-        for rc_link, rc in self.all_rcs.items():
-            if rc.article_id == article_id:
-                return rc
+        return self.all_rcs.get_by_article_id(article_id)
 
-    def get_toc_html(self, body_html):
+    def get_toc_html(self, soup):
+        """
+        Returns the TOC HTML for the section headers of the given document, adding the hidden right header
+        string before each header to the document as it goes
+        """
         toc_html = f'''
 <article id="contents">
     {self.toc_title}
 '''
         prev_toc_level = 0
         prev_header_level = 0
-        soup = BeautifulSoup(body_html, 'html.parser')
         header_titles = [None, None, None, None, None, None]
         headers = soup.find_all(re.compile(r'^h\d'), {
                                 'class': 'section-header'})
@@ -889,7 +966,7 @@ class PdfConverter(Converter):
             toc_html += '</li>\n</ul>\n'
         toc_html += '</article>'
 
-        return [str(soup), toc_html]
+        return toc_html
 
     def get_cover_html(self):
         version_str = f'{self.translate("version")} {self.version}'
@@ -996,8 +1073,7 @@ class PdfConverter(Converter):
         self.log.error(f'FOUND SOME MALFORMED RC LINKS: {m.group()}')
         return m.group()
 
-    def replace_rc_links(self, text):
-        soup = BeautifulSoup(text, 'html.parser')
+    def replace_rc_links(self, soup):
         rc_pattern = 'rc://[/A-Za-z0-9*_-]+'
         rc_regex = re.compile(rc_pattern)
 
@@ -1030,8 +1106,6 @@ class PdfConverter(Converter):
                 last_part.insert_after(part)
                 last_part = part
 
-        return str(soup)
-
     @staticmethod
     def _fix_links(html):
         # Change [[http.*]] to <a href="http\1">http\1</a>
@@ -1292,8 +1366,9 @@ class PdfConverter(Converter):
                 self.add_error_message(source_rc, rc.rc_link, fix)
                 self.log.error(f'FIX FOUND FOR FOR TW ARTICLE IN {source_rc.rc_link}: {rc.rc_link} => {fix}')
             tw_article_html = markdown2.markdown_path(file_path)
-            tw_article_html = html_tools.make_first_header_section_header(tw_article_html)
-            tw_article_html = html_tools.increment_headers(tw_article_html, increment_header_depth)
+            tw_article_html = html_tools.transform_headers(tw_article_html,
+                                                           html_tools.first_header_section_header_step(),
+                                                           html_tools.increment_headers_step(increment_header_depth))
             tw_article_html = self.fix_tw_links(tw_article_html, rc.extra_info[0])
             tw_article_html = f'''
 <article id="{rc.article_id}">
@@ -1317,13 +1392,16 @@ class PdfConverter(Converter):
         return text
 
     def convert(self):
-        self.setup_resources()
-        self.setup_images_dir()
-        self.setup_style_sheets()
-        self.setup_loggers()
-        self.generate_all_files()
-        self.upload_pdf_and_json_to_cdn()
-        self.finish_up()
+        try:
+            self.setup_resources()
+            self.setup_images_dir()
+            self.setup_style_sheets()
+            self.setup_loggers()
+            self.generate_all_files()
+            self.upload_pdf_and_json_to_cdn()
+        finally:
+            # Also saves the debug artifacts of a failed build
+            self.finish_up()
         return True
 
     def get_catalog_entry(self, resource_name, owners, langs, refs):
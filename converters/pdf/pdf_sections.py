@@ -0,0 +1,170 @@
+"""
+Helpers for rendering a very large HTML file to PDF section by section
+    (see PdfConverter.write_pdf_in_sections())
+"""
+from bs4 import BeautifulSoup, NavigableString, Tag
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, FloatObject, NameObject, NumberObject, TextStringObject
+
+SECTIONED_PDF_MAX_SECTION_SIZE = 3 * 1024 * 1024
+RUNNING_HEADER_LEFT_SELECTOR = '.manual-cover h2, .resource-title-page h1, h1.section-header'
+RUNNING_HEADER_RIGHT_SELECTOR = '.header-right'
+PDF_SCALE = 0.75 # WeasyPrint writes CSS px as PDF points
+
+
+def get_pdf_sections(soup, max_size=SECTIONED_PDF_MAX_SECTION_SIZE):
+    """
+    Splits the top level elements of the body into the front matter (up to and including the TOC) and body
+    sections no bigger than max_size (elements that are too big are split on their children).
+    Each body section starts with the running header strings in effect where it begins.
+    Returns a function giving the front matter HTML (so it reflects later changes to the TOC links) and the
+    list of body section HTML.
+    """
+    elements = [element for element in soup.body.children
+                if isinstance(element, Tag) or (isinstance(element, NavigableString) and element.strip())]
+    front_matter = []
+    if soup.find(id='contents'):
+        while elements:
+            element = elements.pop(0)
+            front_matter.append(element)
+            if isinstance(element, Tag) and (element.get('id') == 'contents' or element.find(id='contents')):
+                break
+    header_left = header_right = ''
+    for element in front_matter:
+        header_left, header_right = get_running_headers(element, header_left, header_right)
+    pieces = []
+    for element in elements:
+        pieces += split_html_element(soup, element, max_size)
+    sections = []
+    for section_html in pack_html_pieces(pieces, max_size):
+        running_headers = soup.new_tag('span', attrs={'class': 'hidden'})
+        running_headers['style'] = f'string-set: header-left {css_string(header_left)}, ' \
+                                   f'header-right {css_string(header_right)}'
+        sections.append(str(running_headers) + section_html)
+        section_soup = BeautifulSoup(section_html, 'html.parser')
+        header_left, header_right = get_running_headers(section_soup, header_left, header_right)
+
+    def get_front_matter_html():
+        return '\n'.join([str(element) for element in front_matter])
+
+    return get_front_matter_html, sections
+
+
+def get_running_headers(element, header_left, header_right):
+    if not isinstance(element, Tag):
+        return header_left, header_right
+    header_lefts = element.select(RUNNING_HEADER_LEFT_SELECTOR)
+    if header_lefts:
+        header_left = header_lefts[-1].get_text()
+    header_rights = element.select(RUNNING_HEADER_RIGHT_SELECTOR)
+    if header_rights:
+        header_right = header_rights[-1].get_text()
+    return header_left, header_right
+
+
+def css_string(text):
+    text = ' '.join(text.split()).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def split_html_element(soup, element, max_size):
+    html = str(element)
+    if len(html) <= max_size or not isinstance(element, Tag):
+        return [html]
+    children = [child for child in element.children
+                if isinstance(child, Tag) or (isinstance(child, NavigableString) and child.strip())]
+    if len(children) < 2:
+        return [html]
+    pieces = []
+    for child in children:
+        pieces += split_html_element(soup, child, max_size)
+    wrapped = []
+    for idx, chunk in enumerate(pack_html_pieces(pieces, max_size)):
+        # Only the first piece keeps the id so anchors stay unique
+        attrs = {key: value for key, value in element.attrs.items() if idx == 0 or key != 'id'}
+        wrapped.append(f'{get_open_tag(soup, element.name, attrs)}{chunk}</{element.name}>')
+    return wrapped
+
+
+def pack_html_pieces(pieces, max_size):
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for piece in pieces:
+        if chunk and chunk_size + len(piece) > max_size:
+            chunks.append('\n'.join(chunk))
+            chunk = []
+            chunk_size = 0
+        chunk.append(piece)
+        chunk_size += len(piece)
+    if chunk:
+        chunks.append('\n'.join(chunk))
+    return chunks
+
+
+def get_open_tag(soup, name, attrs):
+    """
+    Returns the opening tag with the attribute values escaped (and list values such as class joined)
+    """
+    return str(soup.new_tag(name, attrs=attrs))[:-len(f'</{name}>')]
+
+
+def get_section_html(soup, body_html, styles):
+    """
+    Returns a whole HTML document for a section, with the head and the html and body attributes of the soup
+    """
+    html_tag = get_open_tag(soup, 'html', soup.html.attrs if soup.html else {})
+    body_tag = get_open_tag(soup, 'body', soup.body.attrs if soup.body else {})
+    head_html = str(soup.head)[:-len('</head>')] if soup.head else '<head>'
+    return f'''<!DOCTYPE html>
+{html_tag}
+{head_html}
+<style>{styles}</style>
+</head>
+{body_tag}
+{body_html}
+</body>
+</html>
+'''
+
+
+def get_cross_section_links(pages, first_page_idx):
+    """
+    Returns the anchors on the given (WeasyPrint) pages and the internal links to anchors that aren't on them,
+    which WeasyPrint leaves out of the section's PDF, as (page index, anchor, PDF rectangle) tuples
+    """
+    anchors = {anchor for page in pages for anchor in page.anchors}
+    links = []
+    for page_idx, page in enumerate(pages):
+        for link_type, target, rectangle, _ in page.links:
+            if link_type == 'internal' and target not in anchors:
+                x1, y1, x2, y2 = rectangle
+                links.append((first_page_idx + page_idx, target,
+                              [x1 * PDF_SCALE, (page.height - y1) * PDF_SCALE,
+                               x2 * PDF_SCALE, (page.height - y2) * PDF_SCALE]))
+    return anchors, links
+
+
+def join_pdf_files(pdf_files, pdf_file, links=()):
+    """
+    Joins the PDF files (with their bookmarks, links and named destinations) into pdf_file,
+    using the metadata of the first one, and adds the given (page index, anchor, PDF rectangle) links
+    to the named destinations
+    """
+    writer = PdfWriter()
+    for section_file in pdf_files:
+        writer.append(section_file, import_outline=True, excluded_fields=())
+    if pdf_files:
+        metadata = PdfReader(pdf_files[0]).metadata
+        if metadata:
+            writer.add_metadata(metadata)
+    for page_idx, anchor, rectangle in links:
+        writer.add_annotation(page_idx, DictionaryObject({
+            NameObject('/Type'): NameObject('/Annot'),
+            NameObject('/Subtype'): NameObject('/Link'),
+            NameObject('/Rect'): ArrayObject([FloatObject(value) for value in rectangle]),
+            NameObject('/BS'): DictionaryObject({NameObject('/W'): NumberObject(0)}),
+            NameObject('/Dest'): TextStringObject(anchor),
+        }))
+    with open(pdf_file, 'wb') as out_file:
+        writer.write(out_file)
@@ -19,6 +19,9 @@ from bs4 import BeautifulSoup, Tag
 
 
 class ResourceContainerLink(object):
+    # The attributes that the article id is made from
+    LINK_ATTRIBUTES = ('language_id', 'resource', 'type', 'project', 'extra_info', '_article_id')
+    link_changes = 0 # How many times any of those have been changed after an rc link was made
 
     def __init__(self, rc_link, article='', title=None, linking_level=0, article_id=None):
         self._rc_link = rc_link
@@ -43,6 +46,12 @@ class ResourceContainerLink(object):
         self.linking_level = linking_level
         self._article_id = article_id
         self.references = []
+        self._initialized = True
+
+    def __setattr__(self, name, value):
+        if name in self.LINK_ATTRIBUTES and '_initialized' in self.__dict__:
+            ResourceContainerLink.link_changes += 1
+        super().__setattr__(name, value)
 
     @property
     def rc_link(self):
@@ -119,3 +128,62 @@ class ResourceContainerLink(object):
 
     def toJSON(self):
         return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True, indent=4)
+
+
+class ResourceContainerLinks(dict):
+    """
+    Dictionary of ResourceContainerLink objects keyed by their rc link, which also keeps an index of them by
+    article id so that get_by_article_id() is a dictionary lookup instead of a scan of all the links.
+    As with a scan, the first link added with a given article id is the one returned. The index is rebuilt
+    if the rc link of any ResourceContainerLink has been changed since (e.g., a bad TA link fixed up).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._by_article_id = {}
+        self._link_changes = ResourceContainerLink.link_changes
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, rc_link, rc):
+        if rc_link in self:
+            # Replacing a link can change which link comes first for an article id, so reindex when needed
+            self._by_article_id = None
+        super().__setitem__(rc_link, rc)
+        if self._by_article_id is not None:
+            self._by_article_id.setdefault(rc.article_id, rc)
+
+    def __delitem__(self, rc_link):
+        super().__delitem__(rc_link)
+        self._by_article_id = None
+
+    def update(self, *args, **kwargs):
+        for rc_link, rc in dict(*args, **kwargs).items():
+            self[rc_link] = rc
+
+    def setdefault(self, rc_link, rc=None):
+        if rc_link not in self:
+            self[rc_link] = rc
+        return self[rc_link]
+
+    def pop(self, *args):
+        self._by_article_id = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self._by_article_id = None
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self._by_article_id = {}
+
+    def reindex(self):
+        self._by_article_id = {}
+        self._link_changes = ResourceContainerLink.link_changes
+        for rc in self.values():
+            self._by_article_id.setdefault(rc.article_id, rc)
+
+    def get_by_article_id(self, article_id):
+        if self._by_article_id is None or self._link_changes != ResourceContainerLink.link_changes:
+            self.reindex()
+        return self._by_article_id.get(article_id)
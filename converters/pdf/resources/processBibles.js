@@ -1,9 +1,8 @@
-require("babel-polyfill"); // required for async/await
-import path from 'path-extra';
-import fs from 'fs-extra';
-import sourceContentUpdater from 'tc-source-content-updater';
-import yaml from 'js-yaml';
-import yargs from 'yargs';
+const path = require('path-extra');
+const fs = require('fs-extra');
+const sourceContentUpdater = require('tc-source-content-updater').default;
+const yaml = require('js-yaml');
+const yargs = require('yargs');
 
 const RESOURCE_ORG = "unfoldingWord";
 
@@ -1,7 +1,2 @@
-// Transpile all code following this line with babel and use '@babel/preset-env' (aka ES6) preset.
-require("@babel/register")({
-  presets: ["@babel/preset-env"]
-});
-
-// Import the rest of our application.
+// processBibles.js is plain CommonJS that Node runs as is, so there is no transpile step at startup.
 module.exports = require('./processBibles.js')
@@ -410,6 +410,7 @@ class SnSqPdfConverter(TsvPdfConverter):
         else:
             sn_notes = []
         orig_scripture = scripture
+        highlighter = html_tools.PhraseHighlighter(scripture)
         for sn_note_idx, sn_note in enumerate(sn_notes):
             occurrence = 1
             if represent_int(sn_note['Occurrence']) and int(sn_note['Occurrence']) > 0:
@@ -427,18 +428,14 @@ class SnSqPdfConverter(TsvPdfConverter):
             if len(phrase) > 1:
                 split = ' split'
             tag = f'<span class="highlight phrase phrase-{sn_note_idx+1}{split}">'
-            marked_verse_html = html_tools.mark_phrases_in_html(scripture, phrase, tag=tag)
-            if not marked_verse_html:
+            if not highlighter.mark(phrase, tag=tag):
                 fix = None
                 if flatten_alignment(phrase).lower() not in QUOTES_TO_IGNORE:
                     if sn_note['GLQuote']:
-                        marked_with_gl_quote = html_tools.mark_phrases_in_html(scripture, gl_quote_phrase)
-                        if marked_with_gl_quote:
+                        if highlighter.find(gl_quote_phrase) is not None:
                             fix = sn_note['GLQuote']
                     self.add_bad_highlight(rc, orig_scripture, sn_note['rc'], sn_note['GLQuote'], fix)
-            else:
-                scripture = marked_verse_html
-        scripture += footnote
+        scripture = highlighter.get_html() + footnote
         return scripture
 
     def get_aligned_text(self, bible_id, context_id):
@@ -452,7 +449,8 @@ class SnSqPdfConverter(TsvPdfConverter):
             return None
         quote = context_id['quote']
         occurrence = int(context_id['occurrence'])
-        alignment = get_alignment(verse_objects, quote, occurrence)
+        alignment = get_alignment(verse_objects, quote, occurrence,
+                                  verse_ref=self.get_verse_ref(bible_id, chapter, verse))
         if not alignment:
             title = f'{self.project_title} {chapter}:{verse}'
             aligned_text_rc_link = f'rc://{self.language_id}/{bible_id}/bible/{self.project_id}/{self.pad(chapter)}/{str(verse).zfill(3)}'
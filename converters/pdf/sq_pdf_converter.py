@@ -362,6 +362,7 @@ class SqPdfConverter(TsvPdfConverter):
         else:
             sq_notes = []
         orig_scripture = scripture
+        highlighter = html_tools.PhraseHighlighter(scripture)
         for sq_note_idx, sq_note in enumerate(sq_notes):
             occurrence = 1
             if represent_int(sq_note['Occurrence']) and int(sq_note['Occurrence']) > 0:
@@ -379,18 +380,14 @@ class SqPdfConverter(TsvPdfConverter):
             if len(phrase) > 1:
                 split = ' split'
             tag = f'<span class="highlight phrase phrase-{sq_note_idx+1}{split}">'
-            marked_verse_html = html_tools.mark_phrases_in_html(scripture, phrase, tag=tag)
-            if not marked_verse_html:
+            if not highlighter.mark(phrase, tag=tag):
                 fix = None
                 if flatten_alignment(phrase).lower() not in QUOTES_TO_IGNORE:
                     if sq_note['GLQuote']:
-                        marked_with_gl_quote = html_tools.mark_phrases_in_html(scripture, gl_quote_phrase)
-                        if marked_with_gl_quote:
+                        if highlighter.find(gl_quote_phrase) is not None:
                             fix = sq_note['GLQuote']
                     self.add_bad_highlight(rc, orig_scripture, sq_note['rc'], sq_note['GLQuote'], fix)
-            else:
-                scripture = marked_verse_html
-        scripture += footnote
+        scripture = highlighter.get_html() + footnote
         return scripture
 
     def fix_sq_links(self, html, chapter):
@@ -16,6 +16,7 @@ import markdown2
 from bs4 import BeautifulSoup
 from door43_tools.subjects import TRANSLATION_ACADEMY
 from .pdf_converter import PdfConverter
+from .rc_link import ResourceContainerLinks
 from general_tools.file_utils import read_file
 
 
@@ -84,9 +85,9 @@ class TaPdfConverter(PdfConverter):
         self.project_id = ''
         self.errors = {}
         self.bad_highlights = {}
-        self.rcs = {}
-        self.appendix_rcs = {}
-        self.all_rcs = {}
+        self.rcs = ResourceContainerLinks()
+        self.appendix_rcs = ResourceContainerLinks()
+        self.all_rcs = ResourceContainerLinks()
         self.generate_html_file()
         self.generate_pdf_file()
 
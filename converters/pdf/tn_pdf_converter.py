@@ -20,7 +20,7 @@ from collections import OrderedDict
 from .tsv_pdf_converter import TsvPdfConverter
 from .pdf_converter import represent_int
 from door43_tools.bible_books import BOOK_CHAPTER_VERSES, BOOK_NUMBERS
-from general_tools.alignment_tools import flatten_alignment
+from general_tools.alignment_tools import flatten_alignment, get_alignment_cache_stats
 from general_tools.file_utils import load_json_object, get_latest_version_path, get_child_directories
 
 QUOTES_TO_IGNORE = ['general information:', 'connecting statement:']
@@ -45,12 +45,21 @@ class TnPdfConverter(TsvPdfConverter):
             if resource.subject == ALIGNED_BIBLE:
                 self.populate_book_data(resource.identifier, resource.language_id)
         self.populate_book_data(self.ol_bible_id, self.ol_lang_code)
+        stats_before = get_alignment_cache_stats()
         self.populate_tw_words_data()
         self.populate_tn_groups_data()
         self.populate_tn_book_data()
+        self.log_alignment_cache_stats(stats_before)
         html = self.get_tn_html()
         return html
 
+    def log_alignment_cache_stats(self, stats_before):
+        stats = get_alignment_cache_stats()
+        hits = stats['hits'] - stats_before['hits']
+        lookups = hits + stats['misses'] - stats_before['misses']
+        if lookups:
+            self.log.info(f'Aligned text lookups: {lookups:,}, {hits:,} ({hits / lookups:.0%}) found in the cache')
+
     def populate_tn_book_data(self):
         book_filename = f'{self.language_id}_{self.main_resource.identifier}_{self.book_number_padded}-{self.project_id.upper()}.tsv'
         book_filepath = os.path.join(self.main_resource.repo_dir, book_filename)
@@ -370,6 +379,7 @@ class TnPdfConverter(TsvPdfConverter):
                 not self.tw_words_data[chapter][verse]:
             return scripture
         phrases = self.tw_words_data[chapter][verse]
+        highlighter = html_tools.PhraseHighlighter(scripture)
         for group_data_idx, group_data in enumerate(phrases):
             tw_rc = group_data['contextId']['rc']
             split = ''
@@ -378,13 +388,10 @@ class TnPdfConverter(TsvPdfConverter):
             tag = f'<a href="{tw_rc}" class="tw-phrase tw-phrase-{group_data_idx + 1}{split}">'
             alignment = group_data['alignments'][bible_id]
             if alignment:
-                marked_verse_html = html_tools.mark_phrases_in_html(scripture, alignment, tag=tag)
-                if not marked_verse_html:
+                if not highlighter.mark(alignment, tag=tag):
                     if rc:
                         self.add_bad_highlight(rc, orig_scripture, tw_rc, flatten_alignment(group_data))
-                else:
-                    scripture = marked_verse_html
-        scripture += footnote
+        scripture = highlighter.get_html() + footnote
         return scripture
 
     def get_scripture_with_tn_quotes(self, bible_id, chapter, verse, rc, scripture):
@@ -401,6 +408,7 @@ class TnPdfConverter(TsvPdfConverter):
         else:
             tn_notes = []
         orig_scripture = scripture
+        highlighter = html_tools.PhraseHighlighter(scripture)
         for tn_note_idx, tn_note in enumerate(tn_notes):
             occurrence = 1
             if represent_int(tn_note['Occurrence']) and int(tn_note['Occurrence']) > 0:
@@ -418,18 +426,14 @@ class TnPdfConverter(TsvPdfConverter):
             if len(phrase) > 1:
                 split = ' split'
             tag = f'<span class="highlight phrase phrase-{tn_note_idx+1}{split}">'
-            marked_verse_html = html_tools.mark_phrases_in_html(scripture, phrase, tag=tag)
-            if not marked_verse_html:
+            if not highlighter.mark(phrase, tag=tag):
                 fix = None
                 if flatten_alignment(phrase).lower() not in QUOTES_TO_IGNORE:
                     if tn_note['GLQuote']:
-                        marked_with_gl_quote = html_tools.mark_phrases_in_html(scripture, gl_quote_phrase)
-                        if marked_with_gl_quote:
+                        if highlighter.find(gl_quote_phrase) is not None:
                             fix = tn_note['GLQuote']
                     self.add_bad_highlight(rc, orig_scripture, tn_note['rc'], tn_note['GLQuote'], fix)
-            else:
-                scripture = marked_verse_html
-        scripture += footnote
+        scripture = highlighter.get_html() + footnote
         return scripture
 
     def fix_tn_links(self, html, chapter):
@@ -242,6 +242,7 @@ class TqPdfConverter(TsvPdfConverter):
         else:
             tq_notes = []
         orig_scripture = scripture
+        highlighter = html_tools.PhraseHighlighter(scripture)
         for tq_note_idx, tq_note in enumerate(tq_notes):
             occurrence = 1
             if represent_int(tq_note['Occurrence']) and int(tq_note['Occurrence']) > 0:
@@ -259,18 +260,14 @@ class TqPdfConverter(TsvPdfConverter):
             if len(phrase) > 1:
                 split = ' split'
             tag = f'<span class="highlight phrase phrase-{tq_note_idx+1}{split}">'
-            marked_verse_html = html_tools.mark_phrases_in_html(scripture, phrase, tag=tag)
-            if not marked_verse_html:
+            if not highlighter.mark(phrase, tag=tag):
                 fix = None
                 if flatten_alignment(phrase).lower() not in QUOTES_TO_IGNORE:
                     if tq_note['GLQuote']:
-                        marked_with_gl_quote = html_tools.mark_phrases_in_html(scripture, gl_quote_phrase)
-                        if marked_with_gl_quote:
+                        if highlighter.find(gl_quote_phrase) is not None:
                             fix = tq_note['GLQuote']
                     self.add_bad_highlight(rc, orig_scripture, tq_note['rc'], tq_note['GLQuote'], fix)
-            else:
-                scripture = marked_verse_html
-        scripture += footnote
+        scripture = highlighter.get_html() + footnote
         return scripture
 
     def fix_tq_links(self, html, chapter):
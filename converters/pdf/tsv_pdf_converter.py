@@ -13,24 +13,34 @@ This script generates the HTML and PDF TSV (parent class) documents
 import os
 import re
 import csv
+import fcntl
+import shutil
+import hashlib
+import tempfile
 import subprocess
 import markdown2
 from abc import abstractmethod
 from bs4 import BeautifulSoup
 from collections import OrderedDict
 from .pdf_converter import PdfConverter
+from .verse_objects_index import VerseObjectsIndex
 from tx_usfm_tools.singleFilelessHtmlRenderer import SingleFilelessHtmlRenderer
 from door43_tools.subjects import ALIGNED_BIBLE, BIBLE
 from general_tools.alignment_tools import get_alignment, flatten_quote
-from general_tools.file_utils import read_file, load_json_object, get_latest_version_path, get_child_directories
+from general_tools.file_utils import read_file, make_dir, get_latest_version_path, get_child_directories
 from general_tools.usfm_utils import unalign_usfm
 
+# Output of processBibles.js, shared by jobs on this worker that use the same resource commits
+PROCESSED_RESOURCES_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'tX_processed_resources')
+PROCESSED_RESOURCES_CACHE_SIZE = 10 # How many of the most recently used outputs are kept
+
 
 class TsvPdfConverter(PdfConverter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.alignment_bibles = []
         self.resources_dir = None
+        self.resources_lock_fd = None # Shared lock on a cached resources_dir while we use it
         self.ult = None
         self.ust = None
 
@@ -39,6 +49,7 @@ class TsvPdfConverter(PdfConverter):
     def reinit(self):
         super().reinit()
         self.book_data = OrderedDict()
+        self.verse_objects_indexes = {}
         self.last_ended_with_quote_tag = False
         self.last_ended_with_paragraph_tag = False
         self.open_quote = False
@@ -87,24 +98,134 @@ class TsvPdfConverter(PdfConverter):
             exit(1)
 
     def process_bibles(self):
-        self.resources_dir = os.path.join(self.download_dir, f'resources')
         if not self.ult:
             self.log.error('No Bible found!')
             exit(1)
+        cache_key = self.get_processed_resources_cache_key()
+        if cache_key:
+            self.resources_dir = os.path.join(PROCESSED_RESOURCES_CACHE_DIR, cache_key)
+            if self.lock_processed_resources():
+                self.log.info(f'Using resources already processed for these commits in {self.resources_dir}')
+                try:
+                    os.utime(self.resources_dir) # Marks it as recently used
+                except OSError:
+                    pass
+                return
+            # Process into a directory of our own and move it into place, so other workers never see a partial one
+            make_dir(PROCESSED_RESOURCES_CACHE_DIR)
+            build_dir = tempfile.mkdtemp(prefix=f'{cache_key}_', dir=PROCESSED_RESOURCES_CACHE_DIR)
+            try:
+                self.run_process_bibles(os.path.join(build_dir, 'resources'))
+                try:
+                    os.rename(os.path.join(build_dir, 'resources'), self.resources_dir)
+                except OSError:
+                    pass  # Another worker got there first with the same resources
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+            if self.lock_processed_resources():
+                self.evict_processed_resources()
+                return
+            self.log.warning(f'Resources processed in {self.resources_dir} were removed by another job')
+        self.resources_dir = os.path.join(self.download_dir, f'resources')
         if not os.path.exists(self.resources_dir):
-            args = ['node', 'start.js',
-                    '--resources_dir', self.resources_dir,
-                    '--repos_dir', self.download_dir,
-                    '-l', self.language_id,
-                    '--ult_id', self.ult.identifier]
-            if self.ust:
-                args += ['--ust_id', self.ust.identifier]
-            cmd = ' '.join(args)
-            self.log.info(f'Running `{cmd}` in {self.pdf_converters_dir}/resources')
-            ret = subprocess.call(cmd, shell=True, cwd=f'{self.pdf_converters_dir}/resources')
-            if ret:
-                self.log.error('Error running resources/processBibles.js. Exiting.')
-                exit(1)
+            self.run_process_bibles(self.resources_dir)
+
+    def lock_processed_resources(self):
+        """
+        Takes a shared lock on the cached resources_dir (if it's there),
+            so evict_processed_resources() in other jobs leaves it alone while we use it
+            (released by finish_up(), or when the process ends)
+
+        Returns False if there's no such directory (e.g., it was removed before we got the lock)
+        """
+        if self.resources_lock_fd is not None:
+            try:
+                if os.path.samestat(os.fstat(self.resources_lock_fd), os.stat(self.resources_dir)):
+                    return True # From an earlier project
+            except OSError:
+                pass
+            self.unlock_processed_resources()
+        try:
+            fd = os.open(self.resources_dir, os.O_RDONLY)
+        except OSError:
+            return False
+        fcntl.flock(fd, fcntl.LOCK_SH) # Waits if another job is removing it
+        try:
+            is_same_dir = os.path.samestat(os.fstat(fd), os.stat(self.resources_dir))
+        except OSError:
+            is_same_dir = False
+        if not is_same_dir:
+            os.close(fd)
+            return False
+        self.resources_lock_fd = fd
+        return True
+
+    def unlock_processed_resources(self):
+        if self.resources_lock_fd is not None:
+            os.close(self.resources_lock_fd) # Also releases the lock
+            self.resources_lock_fd = None
+
+    def finish_up(self):
+        self.unlock_processed_resources()
+        super().finish_up()
+
+    def evict_processed_resources(self):
+        """
+        Removes the least recently used outputs of processBibles.js from the cache,
+            keeping PROCESSED_RESOURCES_CACHE_SIZE of them (including ours)
+            but never ones that another job is using (see lock_processed_resources())
+        """
+        cached_dirs = []
+        for dir_name in get_child_directories(PROCESSED_RESOURCES_CACHE_DIR):
+            cached_dir = os.path.join(PROCESSED_RESOURCES_CACHE_DIR, dir_name)
+            # Leaves alone the build dirs of other workers (named '<cache_key>_<random>')
+            if cached_dir == self.resources_dir or not re.fullmatch(r'[0-9a-f]{40}', dir_name):
+                continue
+            try:
+                cached_dirs.append((os.path.getmtime(cached_dir), cached_dir))
+            except OSError:
+                pass  # Another worker just removed it
+        for _, cached_dir in sorted(cached_dirs, reverse=True)[PROCESSED_RESOURCES_CACHE_SIZE - 1:]:
+            try:
+                fd = os.open(cached_dir, os.O_RDONLY)
+            except OSError:
+                continue  # Another worker just removed it
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self.log.info(f'Not removing resources still in use in {cached_dir}')
+            else:
+                self.log.info(f'Removing resources processed for other commits in {cached_dir}')
+                shutil.rmtree(cached_dir, ignore_errors=True)
+            finally:
+                os.close(fd)
+
+    def get_processed_resources_cache_key(self):
+        """
+        Returns a key for the output of processBibles.js from the commits of all the resources it reads,
+            or None if a commit isn't known so the output can't be reused
+        """
+        commits = [self.language_id, self.ult.identifier, self.ust.identifier if self.ust else '']
+        for resource in sorted(self.resources.values(), key=lambda r: r.repo_name):
+            if not resource.last_commit_sha:
+                return None
+            commits.append(f'{resource.owner}/{resource.repo_name}@{resource.last_commit_sha}')
+        return hashlib.sha1('\n'.join(commits).encode('utf-8')).hexdigest()
+
+    def run_process_bibles(self, resources_dir):
+        args = ['node', 'start.js',
+                '--resources_dir', resources_dir,
+                '--repos_dir', self.download_dir,
+                '-l', self.language_id,
+                '--ult_id', self.ult.identifier]
+        if self.ust:
+            args += ['--ust_id', self.ust.identifier]
+        cmd = ' '.join(args)
+        self.log.info(f'Running `{cmd}` in {self.pdf_converters_dir}/resources')
+        ret = subprocess.call(cmd, shell=True, cwd=f'{self.pdf_converters_dir}/resources')
+        if ret:
+            self.log.error('Error running resources/processBibles.js. Exiting.')
+            exit(1)
 
     def get_usfm_from_verse_objects(self, verse_objects):
         usfm = ''
@@ -244,22 +365,22 @@ class TsvPdfConverter(PdfConverter):
                           flags=re.IGNORECASE | re.MULTILINE)
         return html
 
+    def get_verse_objects_index(self, bible_id):
+        if bible_id not in self.verse_objects_indexes:
+            bible_path = os.path.join(self.resources_dir, self.language_id, 'bibles', bible_id)
+            verse_objects_index = VerseObjectsIndex(bible_path)
+            if not verse_objects_index.bible_version_path:
+                self.log.error(f'No versions found in {bible_path}!')
+                exit(1)
+            self.verse_objects_indexes[bible_id] = verse_objects_index
+        return self.verse_objects_indexes[bible_id]
+
     def get_verse_objects(self, bible_id, chapter, verse):
-        bible_path = os.path.join(self.resources_dir, self.language_id, 'bibles', bible_id)
-        if not bible_path:
-            self.log.error(f'{bible_path} not found!')
-            exit(1)
-        bible_version_path = get_latest_version_path(bible_path)
-        if not bible_version_path:
-            self.log.error(f'No versions found in {bible_path}!')
-            exit(1)
+        return self.get_verse_objects_index(bible_id).get(self.project_id, chapter, verse)
 
-        chapter_json_path = f'{bible_version_path}/{self.project_id}/{chapter}.json'
-        data = load_json_object(chapter_json_path)
-        if verse in data:
-            return data[verse]['verseObjects']
-        else:
-            return []
+    def get_verse_ref(self, bible_id, chapter, verse):
+        # The version path identifies the processed Bible, so alignments of its verses can be remembered
+        return self.get_verse_objects_index(bible_id).bible_version_path, self.project_id, chapter, verse
 
     def get_text_from_verse_objects(self, verse_objects):
         text = ''
@@ -281,7 +402,8 @@ class TsvPdfConverter(PdfConverter):
             return None
         quote = context_id['quote']
         occurrence = int(context_id['occurrence'])
-        alignment = get_alignment(verse_objects, quote, occurrence)
+        alignment = get_alignment(verse_objects, quote, occurrence,
+                                  verse_ref=self.get_verse_ref(bible_id, chapter, verse))
         if not alignment:
             title = f'{self.project_title} {chapter}:{verse}'
             aligned_text_rc_link = f'rc://{self.language_id}/{bible_id}/bible/{self.project_id}/{self.pad(chapter)}/{str(verse).zfill(3)}'
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2020 unfoldingWord
+#  http://creativecommons.org/licenses/MIT/
+#  See LICENSE file for details.
+#
+#  Contributors:
+#  Richard Mahn <rich.mahn@unfoldingword.org>
+
+"""
+Index of the verse objects processBibles wrote out for a Bible, one JSON file per chapter
+"""
+import os
+import pickle
+import tempfile
+from glob import glob
+from typing import Dict, List, Optional, Tuple
+from app_settings.app_settings import AppSettings
+from general_tools.file_utils import load_json_object, get_latest_version_path
+
+INDEX_FILENAME = 'verse_objects.pickle'
+
+
+class VerseObjectsIndex:
+    """
+    Maps (book, chapter, verse) to the verse objects of a Bible, reading in each book's chapter files
+        only the first time the book is looked up.
+
+    Each book's index is pickled next to its chapter files, so later jobs using the same
+        processed resources load one file instead of parsing every chapter.
+    """
+
+    def __init__(self, bible_path:str) -> None:
+        """
+        :param str bible_path: The processed Bible's directory, e.g. <resources_dir>/en/bibles/ult
+        """
+        self.bible_path = bible_path
+        self._bible_version_path:Optional[str] = None
+        self._verses:Dict[Tuple[str,str,str],List[dict]] = {}
+        self._loaded_books = set()
+
+    @property
+    def bible_version_path(self) -> Optional[str]:
+        if self._bible_version_path is None:
+            self._bible_version_path = get_latest_version_path(self.bible_path)
+        return self._bible_version_path
+
+    def get(self, book:str, chapter:str, verse:str) -> List[dict]:
+        """
+        Returns the verse objects of the given verse, or [] if there are none
+        """
+        if book not in self._loaded_books:
+            self.load_book(book)
+        return self._verses.get((book, str(chapter), str(verse)), [])
+
+    def load_book(self, book:str) -> None:
+        self._loaded_books.add(book)
+        if not self.bible_version_path:
+            return
+        book_path = os.path.join(self.bible_version_path, book)
+        chapter_files = glob(os.path.join(book_path, '*.json'))
+        if not chapter_files:
+            return
+        index_file = os.path.join(book_path, INDEX_FILENAME)
+        book_verses = None
+        if os.path.isfile(index_file) and \
+                os.path.getmtime(index_file) >= max(os.path.getmtime(file) for file in chapter_files):
+            try:
+                with open(index_file, 'rb') as f:
+                    book_verses = pickle.load(f)
+            except Exception as e:
+                AppSettings.logger.warning(f"Unable to load {index_file}, so rebuilding it: {e}")
+        if book_verses is None:
+            book_verses = self.read_book(chapter_files)
+            # Written to a temp file and moved into place so other jobs never load a half-written index
+            temp_file = None
+            try:
+                with tempfile.NamedTemporaryFile('wb', dir=book_path, prefix=f'{INDEX_FILENAME}.',
+                                                 suffix='.tmp', delete=False) as f:
+                    temp_file = f.name
+                    pickle.dump(book_verses, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_file, index_file)
+            except OSError as e:
+                AppSettings.logger.warning(f"Unable to save {index_file}: {e}")
+                if temp_file and os.path.exists(temp_file):
+                    os.remove(temp_file)
+        for (chapter, verse), verse_objects in book_verses.items():
+            self._verses[(book, chapter, verse)] = verse_objects
+
+    @staticmethod
+    def read_book(chapter_files:List[str]) -> Dict[Tuple[str,str],List[dict]]:
+        book_verses = {}
+        for chapter_file in chapter_files:
+            chapter = os.path.splitext(os.path.basename(chapter_file))[0]
+            data = load_json_object(chapter_file)
+            if not isinstance(data, dict):
+                continue
+            for verse, verse_data in data.items():
+                if isinstance(verse_data, dict) and 'verseObjects' in verse_data:
+                    book_verses[(chapter, verse)] = verse_data['verseObjects']
+        return book_verses
@@ -8,7 +8,10 @@
 #  Richard Mahn <rich.mahn@unfoldingword.org>
 
 import re
+import copy
+import json
 import string
+from collections import Counter, OrderedDict
 from general_tools.file_utils import load_json_object
 
 hebrew_punctuation = '׃׀־׳״׆'
@@ -86,26 +89,127 @@ def convert_single_dimensional_quote_to_multidimensional(quote):
     return multi_quote
 
 
-def get_alignment(verse_objects, quote, occurrence=1):
-    orig_quote = quote
+# Milestone content can join the words of a quote with nothing, spaces or word joiners
+MILESTONE_JOINERS = ['', ' ', '\u2060']
+# Alignments already found, keyed by (verse ref, quote, occurrence)
+ALIGNMENT_CACHE_SIZE = 20000
+_alignment_cache = OrderedDict()
+_alignment_cache_stats = Counter() # The 'hits' and 'misses' of the cache
+
+
+def get_alignment(verse_objects, quote, occurrence=1, verse_ref=None):
+    """
+    Returns the words of the verse objects aligned to the original language quote, in phrases, or None if
+        any word of the quote isn't aligned.
+
+    If verse_ref is given (it needs to identify the Bible and its version as well as the verse), the result
+        is remembered so the same quote and occurrence in that verse is only looked up once.
+    """
+    if verse_ref is not None:
+        cache_key = (verse_ref, get_quote_key(quote), occurrence)
+        if cache_key in _alignment_cache:
+            _alignment_cache_stats['hits'] += 1
+            _alignment_cache.move_to_end(cache_key)
+            return copy.deepcopy(_alignment_cache[cache_key])
+        _alignment_cache_stats['misses'] += 1
+
     if isinstance(quote, str):
         quote = split_string_into_quote(quote, occurrence)
     elif not isinstance(quote[0], list):
         quote = convert_single_dimensional_quote_to_multidimensional(quote)
 
+    milestone_index = get_milestone_index(verse_objects)
     alignment = []
     for group in quote:
-        quote_combinations = get_quote_combinations(group)
-        alignment += get_alignment_by_combinations(verse_objects, group, quote_combinations)
-
-    for phrase in quote:
-        for word in phrase:
-            if 'found' not in word and re.sub(rf'[{punctuation}]', '', word['word']):
-                return None
+        combination_index = get_combination_index(get_quote_combinations(group), milestone_index)
+        # A word can only be found as part of a combination that is in the verse, so if one can't be, neither can the quote
+        findable = set(index for combo in combination_index.values() for index in combo['indexes'])
+        for word_idx, word in enumerate(group):
+            if word_idx not in findable and 'found' not in word and re.sub(rf'[{punctuation}]', '', word['word']):
+                alignment = None
+                break
+        if alignment is None:
+            break
+        found_indexes = set()
+        alignment += _get_alignment_by_combination_index(verse_objects, combination_index, found_indexes)
+        for word_idx in found_indexes:
+            group[word_idx]['found'] = True
+
+    if alignment is not None:
+        for phrase in quote:
+            for word in phrase:
+                if 'found' not in word and re.sub(rf'[{punctuation}]', '', word['word']):
+                    alignment = None
+                    break
+            if alignment is None:
+                break
+
+    if verse_ref is not None:
+        _alignment_cache[cache_key] = copy.deepcopy(alignment)
+        if len(_alignment_cache) > ALIGNMENT_CACHE_SIZE:
+            _alignment_cache.popitem(last=False)
     return alignment
 
 
+def get_quote_key(quote):
+    if isinstance(quote, str):
+        return quote
+    return json.dumps(quote, sort_keys=True, ensure_ascii=False)
+
+
+def get_alignment_cache_stats():
+    """
+    Returns how many of the get_alignment() calls with a verse_ref were answered from the cache (hits)
+        and how many had to look for the alignment (misses)
+    """
+    return {'hits': _alignment_cache_stats['hits'], 'misses': _alignment_cache_stats['misses']}
+
+
+def clear_alignment_cache():
+    _alignment_cache.clear()
+    _alignment_cache_stats.clear()
+
+
+def get_milestone_index(verse_objects, index=None):
+    """
+    Returns an inverted index of the original language content of the verse's milestones to their occurrences
+    """
+    if index is None:
+        index = {}
+    for verse_object in verse_objects:
+        if 'type' in verse_object and verse_object['type'] == 'milestone' and 'content' in verse_object:
+            index.setdefault(verse_object['content'], set()).add(verse_object.get('occurrence'))
+        if 'children' in verse_object:
+            get_milestone_index(verse_object['children'], index)
+    return index
+
+
+def get_combination_index(quote_combinations, milestone_index=None):
+    """
+    Maps each (milestone content, occurrence) a quote combination can match to the first combination that matches it,
+        only keeping the ones in the milestone index if given
+    """
+    combination_index = {}
+    for combo in quote_combinations:
+        for joiner in MILESTONE_JOINERS:
+            content = joiner.join(combo['word'])
+            if milestone_index is not None and \
+                    (content not in milestone_index or combo['occurrence'] not in milestone_index[content]):
+                continue
+            combination_index.setdefault((content, combo['occurrence']), combo)
+    return combination_index
+
+
 def get_alignment_by_combinations(verse_objects, quote, quote_combinations, found=False):
+    found_indexes = set()
+    alignments = _get_alignment_by_combination_index(verse_objects, get_combination_index(quote_combinations),
+                                                     found_indexes, found)
+    for index in found_indexes:
+        quote[index]['found'] = True
+    return alignments
+
+
+def _get_alignment_by_combination_index(verse_objects, combination_index, found_indexes, found=False):
     alignments = []
     in_between_alignments = []
     last_found = False
@@ -113,24 +217,16 @@ def get_alignment_by_combinations(verse_objects, quote, quote_combinations, foun
         my_found = found
         if 'type' in verse_object and verse_object['type'] == 'milestone':
             if 'content' in verse_object:
-                for combo in quote_combinations:
-                    joined = ''.join(combo['word'])
-                    joined_with_spaces = ' '.join(combo['word'])
-                    joined_with_joiner = '\u2060'.join(combo['word'])
-                    if combo['occurrence'] == verse_object['occurrence'] and \
-                            (joined == verse_object['content'] or
-                             joined_with_spaces == verse_object['content'] or
-                             joined_with_joiner == verse_object['content']):
-                        my_found = True
-                        for index in combo['indexes']:
-                            quote[index]['found'] = True
-                        break
-                if not my_found:
+                combo = combination_index.get((verse_object['content'], verse_object['occurrence']))
+                if combo:
+                    my_found = True
+                    found_indexes.update(combo['indexes'])
+                else:
                     last_found = False
                     in_between_alignments = []
             if 'children' in verse_object:
-                my_alignments = get_alignment_by_combinations(verse_object['children'], quote, quote_combinations,
-                                                              my_found)
+                my_alignments = _get_alignment_by_combination_index(verse_object['children'], combination_index,
+                                                                    found_indexes, my_found)
                 if not found and my_found:
                     if last_found:
                         alignments[-1] += in_between_alignments + my_alignments
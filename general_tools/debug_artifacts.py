@@ -0,0 +1,82 @@
+import os
+import gzip
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Optional
+
+from app_settings.app_settings import AppSettings
+
+
+DEBUG_ARTIFACTS_NONE = 'none' # Don't save anything
+DEBUG_ARTIFACTS_ERRORS = 'errors' # Only save what is needed to look into a failed or erroring job
+DEBUG_ARTIFACTS_FULL = 'full' # Save all the intermediate files
+DEBUG_ARTIFACTS_LEVELS = [DEBUG_ARTIFACTS_NONE, DEBUG_ARTIFACTS_ERRORS, DEBUG_ARTIFACTS_FULL]
+
+
+class DebugArtifacts:
+    """
+    Saves intermediate files (e.g., the assembled HTML of a PDF) to a per-job directory
+        for reproducing rendering issues.
+
+    Artifacts are gzipped and written on a background thread so they stay off the critical path,
+        and nothing at all is written for artifacts above the configured level.
+    """
+
+    def __init__(self, artifacts_dir:str, level:Optional[str]=DEBUG_ARTIFACTS_NONE) -> None:
+        """
+        :param str artifacts_dir: The job's directory to write the artifacts to (created when first needed)
+        :param str level: One of DEBUG_ARTIFACTS_LEVELS
+        """
+        if level not in DEBUG_ARTIFACTS_LEVELS:
+            AppSettings.logger.warning(f"Unknown debug artifacts level '{level}' so not saving any")
+            level = DEBUG_ARTIFACTS_NONE
+        self.artifacts_dir = artifacts_dir
+        self.level = level
+        self._executor:Optional[ThreadPoolExecutor] = None
+        self._pending:List[Future] = []
+
+
+    def wants(self, level:str) -> bool:
+        """
+        Returns True if artifacts of the given level are being saved
+        """
+        return self.level != DEBUG_ARTIFACTS_NONE \
+            and DEBUG_ARTIFACTS_LEVELS.index(level) <= DEBUG_ARTIFACTS_LEVELS.index(self.level)
+
+
+    def save(self, filename:str, content:str, level:str=DEBUG_ARTIFACTS_FULL) -> Optional[str]:
+        """
+        Queues <content> to be written gzipped to <filename>.gz in the artifacts dir
+            if artifacts of <level> are wanted.
+
+        Returns the path the artifact will be written to, or None if it isn't saved.
+        """
+        if not self.wants(level):
+            return None
+        filepath = os.path.join(self.artifacts_dir, f'{filename}.gz')
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='debug_artifacts')
+        self._pending.append(self._executor.submit(self._write, filepath, content))
+        AppSettings.logger.debug(f"Saving {level} debug artifact to {filepath}")
+        return filepath
+
+
+    @staticmethod
+    def _write(filepath:str, content:str) -> None:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with gzip.open(filepath, 'wt', encoding='utf-8', compresslevel=6) as artifact_file:
+            artifact_file.write(content)
+
+
+    def close(self) -> None:
+        """
+        Waits for the queued artifacts to be written
+        """
+        for future in self._pending:
+            try:
+                future.result()
+            except Exception as e:
+                AppSettings.logger.error(f"Unable to save debug artifact: {e}")
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
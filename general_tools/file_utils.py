@@ -158,9 +158,9 @@ def get_mime_type(path:str) -> str:
 
 
 def get_files(directory:str, relative_paths:bool=False, include_directories:bool=False,
-                                topdown:bool=False, extensions=None, exclude=None) -> List[str]:
+                                topdown:bool=False, extensions=None, exclude=None, walk=os.walk) -> List[str]:
     file_list = []
-    for root, dirs, files in os.walk(directory, topdown=topdown):
+    for root, dirs, files in walk(directory, topdown=topdown):
         if exclude and (os.path.basename(root) in exclude or os.path.basename(root).lower() in exclude):
             continue
         if relative_paths:
@@ -1,7 +1,8 @@
 import re
 import string
+from html import escape, unescape
 from bs4 import BeautifulSoup, Tag
-from .alignment_tools import flatten_alignment
+from .alignment_tools import flatten_alignment, split_string_into_alignment
 
 PHRASE_PARTS_TO_IGNORE = ['a', 'am', 'an', 'and', 'as', 'are', 'at', 'be', 'by', 'did', 'do', 'does', 'done', 'for', 'from', 'had', 'has', 'have', 'i', 'in', 'into', 'less', 'let', 'may', 'might', 'more', 'my', 'not', 'is', 'of', 'on', 'one', 'onto', 'than', 'the', 'their', 'then', 'this', 'that', 'those', 'these', 'to', 'was', 'we', 'who', 'whom', 'with', 'will', 'were', 'your', 'you', 'would', 'could', 'should', 'shall', 'can']
 
@@ -49,81 +50,167 @@ def get_text_strings_from_element(wrapper):
 
 
 def mark_phrases_in_html(html, phrases, tag='<span class="highlight">', break_on_word=True):
-    soup = BeautifulSoup(html, 'html.parser')
-    text = soup.text
-    for phrase_idx, words in enumerate(phrases):
-        phrase = flatten_alignment([words])
-
-        if not phrase or (phrase_idx < len(phrases) - 1 and phrase.lower() in PHRASE_PARTS_TO_IGNORE):
-            continue
-
-        first_word = words[0]['word']
-        first_word_occurrence = words[0]['occurrence']
-
-        if break_on_word:
-            # This gets tricky for phrases that start/end with curly quotes, as then
-            # it doesn't see a word break (\b) before or after it, so we also have to look for
-            # beginning/end of string (^ $) and punctuation before/after it
-            word_break_before = rf'(^|\b|(?<=[{re.escape(string.punctuation)}\s]))'
-            word_break_after = rf'($|\b|(?=[{re.escape(string.punctuation)}\s]))'
-        else:
-            word_break_before = ''
-            word_break_after = ''
-
-        start_indices = [i.start() for i in re.finditer(rf'{word_break_before}{re.escape(first_word)}{word_break_after}', text)]
-
-        if len(start_indices) < first_word_occurrence:
-            return
-
-        phrase_start = -1
-        phrase_end = -1
-        for start_index in start_indices[first_word_occurrence-1:]:
-            end_index = start_index + len(phrase)
-            if end_index > len(text):
-                return
-            if phrase == text[start_index:end_index]:
-                phrase_start = start_index
-                phrase_end = end_index
-                break
-
-        if phrase_start < 0:
-            return
-
-        text_strings = get_text_strings_from_element(soup)
-        to_process_index = 0
-        text_string = text_strings.pop(0)
-        while (to_process_index + len(text_string)) <= phrase_start:
-            to_process_index += len(text_string)
-            text_string = text_strings.pop(0)
-
-        while to_process_index < phrase_end:
-            match_start = phrase_start - to_process_index
-            match_end = phrase_end - to_process_index
-            if match_start < 0:
-                match_start = 0
-            if match_end > len(text_string):
-                match_end = len(text_string)
-
-            pre_match_str = text_string[:match_start]
-            pre_match = soup.new_string(pre_match_str)
-            text_string.replace_with(pre_match)
-
-            match_str = text_string[match_start:match_end]
-            match_tag_soup = BeautifulSoup(tag, 'html.parser')
-            match_tag = match_tag_soup.find()
-            match_tag.string = match_str
-            pre_match.insert_after(match_tag)
-
-            if match_end < len(text_string):
-                post_match_str = text_string[match_end:]
-                post_match = soup.new_string(post_match_str)
-                match_tag.insert_after(post_match)
-                text_strings.insert(0, post_match)
-
-            to_process_index += match_end
-            if to_process_index < phrase_end:
-                text_string = text_strings.pop(0)
-    return str(soup)
+    highlighter = PhraseHighlighter(html, break_on_word)
+    if highlighter.mark(phrases, tag):
+        return highlighter.get_html()
+
+
+class PhraseHighlighter:
+    """
+    Marks phrases in HTML, one after the other, without parsing the HTML into a tree.
+
+    The text of the HTML is projected out once with the offsets of its text nodes in the markup, and the places
+        where a word can start and end are indexed, so each phrase is found in the text with a few lookups.
+        Marks are only written back into the markup when the HTML is asked for, with each phrase wrapping its part
+        of every text node it covers and phrases marked later nested inside those marked earlier.
+    """
+    TOKEN_REGEX = re.compile(r'<!--.*?-->|<[a-zA-Z/!?][^>]*>', flags=re.DOTALL)
+    TAG_NAME_REGEX = re.compile(r'<\s*([^\s>/]+)')
+
+    def __init__(self, html, break_on_word=True):
+        self.html = html
+        self.break_on_word = break_on_word
+        self.segments = []  # (markup, start, end) where start and end are the text's offsets for text nodes, else None
+        texts = []
+        text_length = 0
+        position = 0
+        for match in self.TOKEN_REGEX.finditer(html):
+            if match.start() > position:
+                text_length = self.add_text_segment(html[position:match.start()], texts, text_length)
+            self.segments.append((match.group(0), None, None))
+            position = match.end()
+        if position < len(html):
+            self.add_text_segment(html[position:], texts, text_length)
+        self.text = ''.join(texts)
+        self.marks = []  # (start, end, open_tag, close_tag) in the order they were marked
+        self._word_starts = None
+        self._word_ends = None
+        self._word_indices = {}
+
+    def add_text_segment(self, markup, texts, text_length):
+        text = unescape(markup)
+        self.segments.append((markup, text_length, text_length + len(text)))
+        texts.append(text)
+        return text_length + len(text)
+
+    def is_word_start(self, index):
+        if self._word_starts is None:
+            self.index_word_breaks()
+        return index in self._word_starts
+
+    def is_word_end(self, index):
+        if self._word_ends is None:
+            self.index_word_breaks()
+        return index in self._word_ends
+
+    def index_word_breaks(self):
+        # Same as the regex (^|\b|(?<=[punctuation\s]))word($|\b|(?=[punctuation\s])): a word can start at the
+        # beginning, at a word boundary or after punctuation or a space, and can end likewise
+        text = self.text
+        is_word_char = [c.isalnum() or c == '_' for c in text]
+        is_break_char = [c in string.punctuation or c.isspace() for c in text]
+        self._word_starts = {0}
+        self._word_ends = {len(text)}
+        for i in range(1, len(text)):
+            if is_word_char[i - 1] != is_word_char[i]:
+                self._word_starts.add(i)
+                self._word_ends.add(i)
+            if is_break_char[i - 1]:
+                self._word_starts.add(i)
+            if is_break_char[i]:
+                self._word_ends.add(i)
+        if text and is_break_char[0]:
+            self._word_ends.add(0)
+
+    def get_word_indices(self, word):
+        """
+        Returns the indices in the text where the word occurs, the same as re.finditer() would find them
+        """
+        if word not in self._word_indices:
+            indices = []
+            if not word:
+                pattern = rf'(^|\b|(?<=[{re.escape(string.punctuation)}\s]))($|\b|(?=[{re.escape(string.punctuation)}\s]))' \
+                    if self.break_on_word else ''
+                indices = [match.start() for match in re.finditer(pattern, self.text)]
+            else:
+                start = self.text.find(word)
+                while start >= 0:
+                    end = start + len(word)
+                    if not self.break_on_word or (self.is_word_start(start) and self.is_word_end(end)):
+                        indices.append(start)
+                        start = self.text.find(word, end)
+                    else:
+                        start = self.text.find(word, start + 1)
+            self._word_indices[word] = indices
+        return self._word_indices[word]
+
+    def find(self, phrases):
+        """
+        Returns the (start, end) in the text of each part of the phrases to mark, or None if any part isn't found
+        """
+        spans = []
+        for phrase_idx, words in enumerate(phrases):
+            phrase = flatten_alignment([words])
+
+            if not phrase or (phrase_idx < len(phrases) - 1 and phrase.lower() in PHRASE_PARTS_TO_IGNORE):
+                continue
+
+            first_word = words[0]['word']
+            first_word_occurrence = words[0]['occurrence']
+            start_indices = self.get_word_indices(first_word)
+
+            if len(start_indices) < first_word_occurrence:
+                return None
+
+            phrase_span = None
+            for start_index in start_indices[first_word_occurrence-1:]:
+                end_index = start_index + len(phrase)
+                if end_index > len(self.text):
+                    return None
+                if self.text.startswith(phrase, start_index):
+                    phrase_span = (start_index, end_index)
+                    break
+
+            if not phrase_span:
+                return None
+            spans.append(phrase_span)
+        return spans
+
+    def mark(self, phrases, tag='<span class="highlight">'):
+        """
+        Marks the phrases with the tag if all of their parts are found, returning whether they were
+        """
+        spans = self.find(phrases)
+        if spans is None:
+            return False
+        close_tag = f'</{self.TAG_NAME_REGEX.match(tag).group(1)}>'
+        for start, end in spans:
+            self.marks.append((start, end, tag, close_tag))
+        return True
+
+    def get_html(self):
+        if not self.marks:
+            return self.html
+        html = ''
+        for markup, start, end in self.segments:
+            if start is None or not any(mark_start < end and mark_end > start for mark_start, mark_end, _, _ in self.marks):
+                html += markup
+            else:
+                html += self.render_text(start, end, self.marks)
+        return html
+
+    def render_text(self, start, end, marks):
+        if start >= end:
+            return ''
+        for mark_idx, (mark_start, mark_end, open_tag, close_tag) in enumerate(marks):
+            if mark_start < end and mark_end > start:
+                mark_start = max(mark_start, start)
+                mark_end = min(mark_end, end)
+                inner_marks = marks[mark_idx+1:]
+                return self.render_text(start, mark_start, inner_marks) + open_tag + \
+                    self.render_text(mark_start, mark_end, inner_marks) + close_tag + \
+                    self.render_text(mark_end, end, inner_marks)
+        return escape(self.text[start:end], quote=False)
 
 
 def unnest_a_links(html):
@@ -153,55 +240,127 @@ def find_quote_variation_in_text(text, phrase, occurrence=1, ignore_small_words=
         phrase.replace('’', "'"),
         # All right pointing curly single quotes made straight
         phrase.replace('‘', "'")]
+    highlighter = PhraseHighlighter(text)
     for quote_variation in quote_variations:
-        if quote_variation != phrase:
-            marked_text = mark_phrases_in_html(text, quote_variation)
-            if marked_text:
-                return quote_variation
+        if quote_variation != phrase and \
+                highlighter.find(split_string_into_alignment(quote_variation, occurrence)) is not None:
+            return quote_variation
+
+
+# Tags, and the comments, scripts and styles whose contents must be left alone, in one pass over the markup
+TAG_REGEX = re.compile(r'<!--.*?-->|<(script|style)\b.*?</\1\s*>|'
+                       r'<(/?)([a-zA-Z][^\s/>]*)((?:"[^"]*"|\'[^\']*\'|[^\'">])*)>',
+                       flags=re.DOTALL | re.IGNORECASE)
+ATTRIBUTE_REGEX = re.compile(r'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+                 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+                 'nextid', 'spacer'}
+SHIFT_HEADERS = 'shift'
+FIRST_HEADER = 'first_header'
+
+
+def increment_headers_step(increase_depth=1):
+    renames = []
+    for level in range(5, 0, -1):
+        new_level = level + increase_depth
+        if new_level > 6:
+            new_level = 6
+        renames.append((level, new_level))
+    return SHIFT_HEADERS, renames
+
+
+def decrement_headers_step(minimum_header=2, decrease=1):
+    if minimum_header < 2:
+        minimum_header = 2
+    renames = []
+    for level in range(minimum_header, 6):
+        new_level = level - decrease
+        if new_level < 1:
+            new_level = 1
+        renames.append((level, new_level))
+    return SHIFT_HEADERS, renames
+
+
+def first_header_section_header_step(level=None, no_toc=False, no_header=False, header_level=None):
+    classes = ['section-header']
+    if no_toc:
+        classes.append('no-toc')
+    if no_header:
+        classes.append('no-header')
+    return FIRST_HEADER, (level, classes, header_level)
+
+
+def transform_headers(html, *steps):
+    """
+    Applies the header steps, in order, to the header tags of the HTML in a single pass over the markup,
+        the same as applying each of increment_headers(), decrement_headers() and
+        make_first_header_section_header() in turn would, without parsing the HTML into a tree.
+    """
+    first_header_done = [False] * len(steps)
+    open_elements = []  # (original name, new name) of each element not yet closed, as the parser would see them
+
+    def transform_tag(match):
+        name = match.group(3)
+        if not name:
+            return match.group(0)
+        name = name.lower()
+        attributes = match.group(4)
+        if match.group(2):
+            # A closing tag closes the most recent element opened with the same name and any still open inside it.
+            # Those are closed explicitly if they are headers, so renaming them can't change which one closes.
+            for element_idx in range(len(open_elements) - 1, -1, -1):
+                if open_elements[element_idx][0] == name:
+                    closing_tags = ''.join(f'</{new_name}>' for _, new_name in reversed(open_elements[element_idx + 1:])
+                                           if re.match(r'h\d', new_name))
+                    new_name = open_elements[element_idx][1]
+                    del open_elements[element_idx:]
+                    return f'{closing_tags}</{new_name}{attributes}>'
+            # Nothing to close, so the parser would ignore it, but it might close a renamed header if left in
+            return '' if re.match(r'h\d', name) else match.group(0)
+        new_name = name
+        if re.match(r'h\d', name):
+            for step_idx, (step_type, step_args) in enumerate(steps):
+                if step_type == SHIFT_HEADERS:
+                    for level, new_level in step_args:
+                        if new_name.startswith(f'h{level}'):
+                            new_name = f'h{new_level}'
+                elif not first_header_done[step_idx] and re.match(r'h\d', new_name):
+                    first_header_done[step_idx] = True
+                    level, classes, header_level = step_args
+                    attributes = add_section_header_attributes(attributes, classes, header_level)
+                    if level:
+                        new_name = f'h{level}'
+        if name not in VOID_ELEMENTS and not attributes.rstrip().endswith('/'):
+            open_elements.append((name, new_name))
+        if new_name == name and attributes == match.group(4):
+            return match.group(0)
+        return f'<{new_name}{attributes}>'
+
+    return TAG_REGEX.sub(transform_tag, html)
+
+
+def add_section_header_attributes(attributes, classes, header_level=None):
+    attrs = {}
+    for match in ATTRIBUTE_REGEX.finditer(attributes):
+        value = next((v for v in match.group(2, 3, 4) if v is not None), '')
+        attrs[match.group(1).lower()] = unescape(value)
+    attrs['class'] = ' '.join(attrs.get('class', '').split() + classes)
+    if header_level:
+        attrs['header-level'] = str(header_level)
+    return ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items())
 
 
 def increment_headers(html, increase_depth=1):
     if html:
-        soup = BeautifulSoup(html, 'html.parser')
-        for level in range(5, 0, -1):
-            new_level = level + increase_depth
-            if new_level > 6:
-                new_level = 6
-            headers = soup.find_all(re.compile(f'^h{level}'))
-            for header in headers:
-                header.name = f'h{new_level}'
-        html = str(soup)
+        html = transform_headers(html, increment_headers_step(increase_depth))
     return html
 
 
 def decrement_headers(html, minimum_header=2, decrease=1):
-    if minimum_header < 2:
-        minimum_header = 2
     if html:
-        soup = BeautifulSoup(html, 'html.parser')
-        for level in range(minimum_header, 6):
-            new_level = level - decrease
-            if new_level < 1:
-                new_level = 1
-            headers = soup.find_all(re.compile(rf'^h{level}'))
-            for header in headers:
-                header.name = f'h{new_level}'
-        html = str(soup)
+        html = transform_headers(html, decrement_headers_step(minimum_header, decrease))
     return html
 
 
 def make_first_header_section_header(html, level=None, no_toc=False, no_header=False, header_level=None):
-    soup = BeautifulSoup(html, 'html.parser')
-    header = soup.find(re.compile(r'^h\d'))
-    classes = ['section-header']
-    if no_toc:
-        classes.append('no-toc')
-    if no_header:
-        classes.append('no-header')
-    if header:
-        header['class'] = header.get('class', []) + classes
-        if level:
-            header.name = f'h{level}'
-        if header_level:
-            header['header-level'] = header_level
-    return str(soup)
+    return transform_headers(html, first_header_section_header_step(level, no_toc, no_header, header_level))
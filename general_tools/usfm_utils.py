@@ -2,6 +2,23 @@
 
 import re
 
+# All the tags used for alignments and words, matched in one pass. Only \w keeps its word.
+ALIGNMENT_MARKUP_REGEX = re.compile(r'\\(?:ts(?:-s)*\s*\\\*\s*'
+                                    r'|zaln-s[^*]*?\*'
+                                    r'|zaln-e\\\*'
+                                    r'|k-s.*?\\\*'
+                                    r'|k-e\\\*'
+                                    r'|w (?P<word>[^|]+)\|.*?\\w\*)')
+MULTIPLE_SPACES_REGEX = re.compile(r'  +')
+POSSESSIVE_REGEX = re.compile(r"\s*' s(?!\w)")
+S5_REGEX = re.compile(r'\\s5')
+UNCLOSED_FQA_REGEX = re.compile(r'\\fqa([^*]+)\\fqa(?![*])')
+CHAPTER_SPLIT_REGEX = re.compile(r'\\c ')
+QUOTE_PAIR_REGEX = re.compile(r'\s*"\s*([^"]+)\s*"\s*', flags=re.DOTALL)
+MARKER_PUNCTUATION_REGEX = re.compile(r'\\(\w+\**)([^\w* \n])')
+SPACE_BEFORE_PUNCTUATION_REGEX = re.compile(r' +([:;.?,!\]})-])')
+SPACE_AFTER_OPENING_REGEX = re.compile(r'([{(\[-]) +')
+
 
 def unalign_usfm(aligned_usfm):
     """
@@ -10,31 +27,38 @@ def unalign_usfm(aligned_usfm):
     :return: the unaligned USFM of the string
     """
     # Remove all tags used for alignments and words
-    usfm = re.sub(r'\\ts(-s)*\s*\\\*\s*', r'', aligned_usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\zaln-s[^*]*?\*', r'', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\zaln-e\\\*', r'', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\k-s.*?\\\*', r'', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\k-e\\\*', r'', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\w ([^|]+)\|.*?\\w\*', r'\1', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'^\n', '', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'^([^\\].*)\n(?=[^\\])', r'\1 ', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'^\\(.*)\n(?=[^\\])', r'\\\1 ', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'  +', ' ', usfm, flags=re.UNICODE | re.MULTILINE)
+    usfm = ALIGNMENT_MARKUP_REGEX.sub(lambda match: match.group('word') or '', aligned_usfm)
+    usfm = join_usfm_lines(usfm)
+    usfm = MULTIPLE_SPACES_REGEX.sub(' ', usfm)
 
     # Clean up bad USFM data and fixing punctuation
-    usfm = re.sub(r"\s*' s(?!\w)", "'s", usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\s5', '', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'\\fqa([^*]+)\\fqa(?![*])', r'\\fqa\1\\fqa*', usfm, flags=re.UNICODE | re.MULTILINE)
-    
+    usfm = POSSESSIVE_REGEX.sub("'s", usfm)
+    usfm = S5_REGEX.sub('', usfm)
+    usfm = UNCLOSED_FQA_REGEX.sub(r'\\fqa\1\\fqa*', usfm)
+
     # Pair up quotes by chapter
-    chapters = re.compile(r'\\c ').split(usfm)
-    usfm = chapters[0]
-    for chapter in chapters[1:]:
-        chapter = re.sub(r'\s*"\s*([^"]+)\s*"\s*', r' "\1" ', chapter, flags=re.UNICODE | re.MULTILINE | re.DOTALL)
-        usfm += f'\\c {chapter}'
-    usfm = re.sub(r'\\(\w+\**)([^\w* \n])', r'\\\1 \2', usfm, flags=re.UNICODE | re.MULTILINE)  # \\q1" => \q1 "
-    usfm = re.sub(r" ' ", r" '", usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r' +([:;.?,!\]})-])', r'\1', usfm, flags=re.UNICODE | re.MULTILINE)
-    usfm = re.sub(r'([{(\[-]) +', r'\1', usfm, flags=re.UNICODE | re.MULTILINE)
+    chapters = CHAPTER_SPLIT_REGEX.split(usfm)
+    usfm = '\\c '.join([chapters[0]] + [QUOTE_PAIR_REGEX.sub(r' "\1" ', chapter) for chapter in chapters[1:]])
+    usfm = MARKER_PUNCTUATION_REGEX.sub(r'\\\1 \2', usfm)  # \\q1" => \q1 "
+    usfm = usfm.replace(" ' ", " '")
+    usfm = SPACE_BEFORE_PUNCTUATION_REGEX.sub(r'\1', usfm)
+    usfm = SPACE_AFTER_OPENING_REGEX.sub(r'\1', usfm)
 
     return usfm.strip()
+
+
+def join_usfm_lines(usfm):
+    """
+    Drops empty lines and joins each line that doesn't start with a marker onto the line before it
+    """
+    lines = usfm.split('\n')
+    # An empty last line is just the text ending with a newline, so it stays
+    lines = [line for line in lines[:-1] if line] + lines[-1:]
+    joined = [lines[0]]
+    for line in lines[1:]:
+        if line and line[0] != '\\':
+            joined.append(' ')
+        else:
+            joined.append('\n')
+        joined.append(line)
+    return ''.join(joined)
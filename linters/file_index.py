@@ -0,0 +1,169 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+import os
+
+from app_settings.app_settings import AppSettings
+
+
+class FileStat(NamedTuple):
+    size: int
+    mtime: float
+
+
+class FileIndex:
+    """
+    An index of all the files and folders under a linter's source_dir,
+        made with one walk of the tree, so that the linters can look things up
+        without going back to the disk.
+
+    Paths are absolute (and normalized). Anything outside the source folder
+        is still checked on disk.
+    """
+
+    def __init__(self, source_dir:str) -> None:
+        self.root = os.path.abspath(source_dir)
+        self.paths:Set[str] = set() # All the files and folders
+        self.listings:Dict[str,Tuple[List[str],List[str]]] = {} # Folder -> (folder names, file names)
+        self.extensions:Dict[str,List[str]] = {} # Lowercase extension -> file paths
+        self.stats:Dict[str,FileStat] = {} # File path -> (size, mtime)
+        self.linked_folders:Set[str] = set() # Links to folders (which aren't indexed, like os.walk)
+        self.link_results:Dict[Tuple[str,str],bool] = {} # (folder, relative link) -> exists
+        if os.path.isdir(self.root):
+            self.paths.add(self.root)
+            self._add_folder(self.root)
+        AppSettings.logger.debug(f"Indexed {len(self.stats):,} files in {len(self.listings):,} folders under '{self.root}'")
+
+
+    def _add_folder(self, folder_path:str) -> None:
+        dir_names, file_names, sub_folders = [], [], []
+        try:
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dir_names.append(entry.name)
+                        if entry.is_symlink(): # Like os.walk, don't follow links to folders
+                            self.linked_folders.add(entry.path)
+                        else:
+                            sub_folders.append(entry.path)
+                    else:
+                        try:
+                            stat = entry.stat()
+                        except OSError: # e.g., a broken link (which os.path.exists() says isn't there)
+                            file_names.append(entry.name)
+                            continue
+                        file_names.append(entry.name)
+                        self.stats[entry.path] = FileStat(stat.st_size, stat.st_mtime)
+                        self.extensions.setdefault(os.path.splitext(entry.name)[1].lower(), []).append(entry.path)
+                    self.paths.add(entry.path)
+        except OSError as e:
+            AppSettings.logger.debug(f"Unable to index '{folder_path}': {e}")
+            return
+        self.listings[folder_path] = dir_names, file_names
+        for sub_folder in sub_folders:
+            self._add_folder(sub_folder)
+
+
+    def contains(self, path:str) -> bool:
+        """
+        Returns True if the (absolute, normalized) path is inside the indexed folder
+            (and not inside a linked folder)
+        """
+        if path == self.root:
+            return True
+        if not path.startswith(self.root + os.sep):
+            return False
+        if self.linked_folders and path not in self.paths:
+            parent_path = os.path.dirname(path)
+            while parent_path != self.root:
+                if parent_path in self.linked_folders:
+                    return False
+                parent_path = os.path.dirname(parent_path)
+        return True
+
+
+    def exists(self, path:str) -> bool:
+        path = os.path.abspath(path)
+        if not self.contains(path):
+            return os.path.exists(path)
+        return path in self.paths
+
+    def link_exists(self, folder_path:str, link:str) -> bool:
+        """
+        Returns True if the relative link (from a file in folder_path) goes to something that exists
+
+        The answers are remembered, because the same links are in many files.
+        """
+        try:
+            return self.link_results[folder_path, link]
+        except KeyError:
+            exists = self.link_results[folder_path, link] = self.exists(os.path.join(folder_path, link))
+            return exists
+
+    def isfile(self, path:str) -> bool:
+        path = os.path.abspath(path)
+        if not self.contains(path):
+            return os.path.isfile(path)
+        return path in self.stats
+
+    def isdir(self, path:str) -> bool:
+        path = os.path.abspath(path)
+        if not self.contains(path):
+            return os.path.isdir(path)
+        return path in self.listings or path in self.paths and path not in self.stats
+
+
+    def listdir(self, folder_path:str) -> List[str]:
+        """
+        Like os.listdir() (but raises FileNotFoundError for anything that's not an indexed folder)
+        """
+        folder_path = os.path.abspath(folder_path)
+        if not self.contains(folder_path):
+            return os.listdir(folder_path)
+        try:
+            dir_names, file_names = self.listings[folder_path]
+        except KeyError:
+            raise FileNotFoundError(f"No such directory: '{folder_path}'")
+        return dir_names + file_names
+
+
+    def walk(self, top:str, topdown:bool=True) -> Iterator[Tuple[str,List[str],List[str]]]:
+        """
+        Like os.walk(), in the same order, except the given lists are copies
+            (so changing them doesn't stop the walk going into folders)
+        """
+        top_path = os.path.abspath(top)
+        if not self.contains(top_path):
+            yield from os.walk(top, topdown=topdown)
+            return
+        if top_path not in self.listings:
+            return
+        dir_names, file_names = self.listings[top_path]
+        if topdown:
+            yield top, list(dir_names), list(file_names)
+        for dir_name in dir_names:
+            yield from self.walk(os.path.join(top, dir_name), topdown)
+        if not topdown:
+            yield top, list(dir_names), list(file_names)
+
+
+    def get_files(self, extension:str, folder_path:Optional[str]=None) -> List[str]:
+        """
+        Returns the sorted paths of all the files (under folder_path if given)
+            with the given extension (ignoring case)
+        """
+        file_paths = self.extensions.get(extension.lower(), [])
+        if folder_path is not None:
+            folder_path = os.path.abspath(folder_path)
+            file_paths = [file_path for file_path in file_paths if file_path.startswith(folder_path + os.sep)]
+        return sorted(file_paths)
+
+
+    def get_stat(self, file_path:str) -> Optional[FileStat]:
+        """
+        Returns the (size, mtime) of an indexed file, else None
+        """
+        return self.stats.get(os.path.abspath(file_path))
+# end of FileIndex class
@@ -1,10 +1,120 @@
+from collections import Counter, deque
+from typing import Dict, List, Optional, Set
+
 from app_settings.app_settings import AppSettings
 
 
 class LintLogger:
-    def __init__(self):
-        self.warnings = []
+    """
+    Collects the warnings from a linter as they're found,
+        only keeping the ones that can go into the results
+        (the first MAX_WARNINGS and the last few), so that a repo
+        with huge numbers of warnings doesn't use huge amounts of memory.
+
+    A warning can be given a category with its own budget (CATEGORY_BUDGETS),
+        after which the warnings in that category are only counted.
+    Once WARNING_BUDGET warnings have been logged (or the budget of a category),
+        is_full() tells the linters to stop doing any more expensive checks.
+
+    The warnings aren't passed on as they're found because the callback payload
+        is only sent (in one POST) once the conversion has finished too,
+        so only keeping the ones that go into it is what saves the memory.
+    """
+    MAX_WARNINGS = 1000 # sanity check so we don't overflow callback size limits
+    LAST_WARNING_COUNT = 9 # Kept from the end (as well as the first ones) when there's too many
+    WARNING_BUDGET = 10_000
+    CATEGORY_BUDGETS = {'punctuation': 500}
+
+    def __init__(self, max_warnings:Optional[int]=MAX_WARNINGS) -> None:
+        """
+        Set max_warnings to None to keep all the warnings
+        """
+        self.max_warnings = max_warnings
+        self.warnings:List[str] = [] # The first ones
+        self.warning_categories:List[Optional[str]] = [] # The category of each of those
+        self.last_warnings = deque(maxlen=self.LAST_WARNING_COUNT) # Any after that
+        self.warning_count = 0 # Not including the suppressed ones
+        self.category_counts:Dict[str,int] = Counter()
+        self.suppressed_counts:Dict[str,int] = Counter() # Category -> warnings over budget
+        self.unchecked_categories:Set[str] = set() # Ones that a linter was told not to look for any more
+
+    def warning(self, msg:str, category:Optional[str]=None) -> None:
+        if self.add_warning(msg, category):
+            AppSettings.logger.debug(f"LINT ISSUE: {msg}")
+
+    def add_warning(self, msg:str, category:Optional[str]=None) -> bool:
+        """
+        Keeps the warning if it might go into the results (without logging it),
+            unless its category is over budget
+
+        Returns False if the warning was only counted.
+        """
+        if category:
+            self.category_counts[category] += 1
+            if self.category_counts[category] > self.CATEGORY_BUDGETS.get(category, self.WARNING_BUDGET):
+                self.suppressed_counts[category] += 1
+                return False
+        self.warning_count += 1
+        if self.max_warnings is None or len(self.warnings) < self.max_warnings:
+            self.warnings.append(msg)
+            self.warning_categories.append(category)
+        else:
+            self.last_warnings.append(msg)
+        return True
+
+    def add_warnings_from(self, other:'LintLogger') -> None:
+        """
+        Adds the warnings kept by another logger (e.g., from another process)
+            as if they'd been logged here, so they count towards the budgets here
+        """
+        for msg, category in zip(other.warnings, other.warning_categories):
+            self.add_warning(msg, category)
+        for msg in other.last_warnings: # Only kept when other has max_warnings (and without their categories)
+            self.add_warning(msg)
+        for category, suppressed_count in other.suppressed_counts.items():
+            self.category_counts[category] += suppressed_count
+            self.suppressed_counts[category] += suppressed_count
+        self.unchecked_categories |= other.unchecked_categories
+
+    def is_full(self, category:Optional[str]=None) -> bool:
+        """
+        Returns True if any more warnings (in the category if given)
+            would just be thrown away, so there's no point looking for them
+
+        (The results then say that the count of the suppressed ones in the category is incomplete.)
+        """
+        if self.warning_count >= self.WARNING_BUDGET:
+            return True
+        if category is not None \
+        and self.category_counts[category] >= self.CATEGORY_BUDGETS.get(category, self.WARNING_BUDGET):
+            self.unchecked_categories.add(category)
+            return True
+        return False
 
-    def warning(self, msg):
-        self.warnings.append(msg)
-        AppSettings.logger.debug(f"LINT ISSUE: {msg}")
+    def get_results(self) -> List[str]:
+        """
+        Returns the warnings for the results,
+            i.e., the first ones and the last ones if there's too many
+        """
+        if self.warning_count <= self.MAX_WARNINGS:
+            warnings = self.warnings + list(self.last_warnings)
+        else:
+            warnings = self.warnings[:self.MAX_WARNINGS-self.LAST_WARNING_COUNT-1]
+            warnings.append("………………")
+            warnings.extend((self.warnings[self.MAX_WARNINGS-self.LAST_WARNING_COUNT-1:]
+                                + list(self.last_warnings))[-self.LAST_WARNING_COUNT:])
+            msg = f"Linter warnings reduced from {self.warning_count:,} to {len(warnings)}"
+            AppSettings.logger.debug(msg)
+            warnings.append(msg)
+        for category, suppressed_count in self.suppressed_counts.items():
+            if category in self.unchecked_categories:
+                warnings.append(f"Another {suppressed_count:,} '{category}' warnings weren't listed (and no more were looked for)")
+            else:
+                warnings.append(f"Another {suppressed_count:,} '{category}' warnings weren't listed")
+        for category in sorted(self.unchecked_categories - self.suppressed_counts.keys()):
+            warnings.append(f"No more '{category}' warnings were looked for"
+                            f" after the first {self.CATEGORY_BUDGETS.get(category, self.WARNING_BUDGET):,}")
+        if self.warning_count >= self.WARNING_BUDGET:
+            warnings.append(f"Linting stopped early after {self.warning_count:,} warnings")
+        return warnings
+# end of LintLogger class
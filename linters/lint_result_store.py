@@ -0,0 +1,121 @@
+from typing import Any, Dict, Iterable, Optional, Set
+from types import ModuleType
+from functools import lru_cache
+import hashlib
+import json
+import sqlite3
+import time
+
+from app_settings.app_settings import AppSettings
+
+
+@lru_cache(maxsize=None)
+def get_source_version(*modules:ModuleType) -> str:
+    """
+    Returns a hash of the source files of the modules,
+        to use as the linter_version of results that they produce,
+        so that results from code that has changed since are never reused
+    """
+    source_hash = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as source_file:
+            source_hash.update(source_file.read())
+    return source_hash.hexdigest()
+
+
+
+class LintResultStore:
+    """
+    A local SQLite store of the results of linting individual files,
+        so that files that haven't changed since a previous job don't have to be linted again.
+
+    Results are keyed by a hash of the linter, the source of the code that produced them
+        (see get_source_version), the file contents, and anything else the results depend on (see make_key).
+    New results and usage times are only written out by close(), in one transaction.
+    Any database problem just means the results aren't reused (it never stops the linting).
+    """
+    MAX_UNUSED_DAYS = 30
+
+    def __init__(self, db_path:str) -> None:
+        self.db_path = db_path
+        self.new_results:Dict[str,str] = {}
+        self.used_keys:Set[str] = set()
+        self.hit_count = self.miss_count = 0
+        try:
+            self.connection:Optional[sqlite3.Connection] = sqlite3.connect(db_path, timeout=30)
+            self.connection.execute('CREATE TABLE IF NOT EXISTS lint_results'
+                                    ' (key TEXT PRIMARY KEY, results TEXT NOT NULL, last_used REAL NOT NULL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS lint_results_last_used ON lint_results (last_used)')
+        except sqlite3.Error as e:
+            AppSettings.logger.warning(f"Unable to open lint results store '{db_path}': {e}")
+            self.connection = None
+
+
+    @staticmethod
+    def make_key(linter_name:str, linter_version:str, contents:str, dependencies:Iterable[Any]=()) -> str:
+        """
+        Returns the SHA-256 of everything that the lint results of one file depend on
+
+        dependencies can be anything else that affects the results,
+            e.g., settings, or the paths and hashes of other files (such as link targets)
+        """
+        key_hash = hashlib.sha256(f'{linter_name}\n{linter_version}\n'.encode())
+        key_hash.update(hashlib.sha256(contents.encode('utf-8', 'surrogatepass')).digest())
+        for dependency in dependencies:
+            key_hash.update(f'\n{dependency}'.encode('utf-8', 'surrogatepass'))
+        return key_hash.hexdigest()
+
+
+    def get(self, key:str) -> Optional[Any]:
+        """
+        Returns the stored results for the key, else None
+        """
+        if key in self.new_results:
+            return json.loads(self.new_results[key])
+        results = None
+        if self.connection is not None:
+            try:
+                row = self.connection.execute('SELECT results FROM lint_results WHERE key=?', (key,)).fetchone()
+            except sqlite3.Error as e:
+                AppSettings.logger.warning(f"Unable to read lint results store: {e}")
+                self.connection = None
+            else:
+                if row is not None:
+                    results = json.loads(row[0])
+                    self.used_keys.add(key)
+        if results is None: self.miss_count += 1
+        else: self.hit_count += 1
+        return results
+
+
+    def put(self, key:str, results:Any) -> None:
+        """
+        Saves the (JSON-serializable) results for the key
+            (tuples come back as lists)
+        """
+        if self.connection is not None:
+            self.new_results[key] = json.dumps(results)
+
+
+    def close(self) -> None:
+        """
+        Writes the new results, marks the reused ones as used, and forgets old unused ones
+        """
+        if self.connection is None:
+            return
+        AppSettings.logger.debug(f"Lint results store: reused {self.hit_count:,}, saving {len(self.new_results):,}")
+        now = time.time()
+        try:
+            with self.connection:
+                self.connection.executemany('INSERT OR REPLACE INTO lint_results VALUES (?,?,?)',
+                                            ((key, results, now) for key, results in self.new_results.items()))
+                self.connection.executemany('UPDATE lint_results SET last_used=? WHERE key=?',
+                                            ((now, key) for key in self.used_keys))
+                self.connection.execute('DELETE FROM lint_results WHERE last_used<?',
+                                        (now - self.MAX_UNUSED_DAYS * 24 * 60 * 60,))
+        except sqlite3.Error as e:
+            AppSettings.logger.warning(f"Unable to update lint results store: {e}")
+        self.connection.close()
+        self.connection = None
+        self.new_results, self.used_keys = {}, set()
+# end of LintResultStore class
@@ -1,20 +1,29 @@
-from typing import Any, Optional, Union
+from typing import Any, List, Optional, Tuple, Union
 import json
 import os
 import tempfile
 import traceback
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from abc import ABCMeta, abstractmethod
 import re
 
 from app_settings.app_settings import AppSettings
-from rq_settings import prefix, debug_mode_flag
+from rq_settings import prefix, debug_mode_flag, lint_results_db, lint_workers
 from general_tools.url_utils import download_file
 from general_tools.file_utils import unzip, remove_tree
 from linters.lint_logger import LintLogger
+from linters.file_index import FileIndex
+from linters.lint_result_store import LintResultStore
 from resource_container.ResourceContainer import RC
 
-
+# For check_punctuation_pairs
+PUNCTUATION_PAIRS_TO_CHECK = (('(',')'), ('[',']'), ('{','}'), ('**_','_**'))
+OPENING_BRACKETS = {')':'(', ']':'[', '}':'{'}
+BRACKET_RE = re.compile(r'[()\[\]{}]')
+POSSIBLE_POINT_RE = re.compile(r'\s\d\) ')
+PAIR_CHARS_RE = re.compile(r'[()\[\]{}_*]')
+MAX_PAIR_REMOVALS = 8 # Deeper nesting than this gets checked one bracket at a time
 
 class Linter(metaclass=ABCMeta):
     """
@@ -36,12 +45,16 @@ class Linter(metaclass=ABCMeta):
 
         # TODO: Why do we need this? How does it help?
         self.rc:Optional[RC] = None   # Constructed later when we know we have a source_dir
+        self.file_index:Optional[FileIndex] = None # All the linters share this view of the source_dir files
+        self.result_store:Optional[LintResultStore] = None # Results for files linted in previous jobs
+        self.lint_executor:Optional[ProcessPoolExecutor] = None # Started by get_lint_executor() if needed
     # end of Linter.__init__ function
 
 
     def close(self) -> None:
         """delete temp files"""
         # print("Linter close() was called!")
+        self.shutdown_lint_executor()
         if prefix and debug_mode_flag:
             AppSettings.logger.debug(f"Linter temp folder '{self.temp_dir}' has been left on disk for debugging!")
         else:
@@ -49,6 +62,39 @@ class Linter(metaclass=ABCMeta):
     # end of Linter.close()
 
 
+    def get_lint_executor(self, task_count:int) -> Optional[ProcessPoolExecutor]:
+        """
+        Returns this linter's pool of lint_workers processes
+            (started when first needed and shut down at the end of run()),
+            or None if the tasks should be done one at a time in this process
+
+        The pool isn't kept for later jobs because rq ends the process after each job
+            (which would leave the pool processes running).
+        """
+        if min(lint_workers, task_count) < 2:
+            return None
+        if self.lint_executor is not None and self.lint_executor._broken: # e.g., a worker was killed
+            self.shutdown_lint_executor()
+        if self.lint_executor is None:
+            try:
+                self.lint_executor = ProcessPoolExecutor(max_workers=lint_workers)
+            except (OSError, NotImplementedError) as e: # e.g., no /dev/shm
+                AppSettings.logger.debug(f"Linting files one at a time: {e}")
+                return None
+        return self.lint_executor
+    # end of Linter.get_lint_executor()
+
+
+    def shutdown_lint_executor(self) -> None:
+        """
+        Stops the pool processes (if they were started)
+        """
+        if self.lint_executor is not None:
+            self.lint_executor.shutdown(cancel_futures=True)
+            self.lint_executor = None
+    # end of Linter.shutdown_lint_executor()
+
+
     # def __del__(self):
     #     print("Linter __del__() was called!")
     #     self.close()
@@ -86,6 +132,9 @@ class Linter(metaclass=ABCMeta):
             # lint files
             # if self.source_dir:
             self.rc = RC(directory=self.source_dir)
+            self.file_index = FileIndex(self.source_dir) # Walk the tree once for all the checks
+            if lint_results_db:
+                self.result_store = LintResultStore(lint_results_db)
             #AppSettings.logger.debug(f"Got RC = {self.rc}")
             AppSettings.logger.debug(f"Linting '{self.source_dir}' files…")
             success = self.lint()
@@ -93,17 +142,14 @@ class Linter(metaclass=ABCMeta):
         except Exception as e:
             message = f"Linting process ended abnormally: {e}"
             AppSettings.logger.error(message)
-            self.log.warnings.append(message)
+            self.log.add_warning(message)
             AppSettings.logger.error(f'{e}: {traceback.format_exc()}')
-        warnings = self.log.warnings
-        MAX_WARNINGS = 1000
-        if len(self.log.warnings) > MAX_WARNINGS:  # sanity check so we don't overflow callback size limits
-            warnings = self.log.warnings[:MAX_WARNINGS-10]
-            warnings.append("………………")
-            warnings.extend(self.log.warnings[-9:])
-            msg = f"Linter warnings reduced from {len(self.log.warnings):,} to {len(warnings)}"
-            AppSettings.logger.debug(msg)
-            warnings.append(msg)
+        finally:
+            self.shutdown_lint_executor()
+            if self.result_store:
+                self.result_store.close()
+                self.result_store = None
+        warnings = self.log.get_results()
 
         results = {
             'success': success,
@@ -121,79 +167,91 @@ class Linter(metaclass=ABCMeta):
         If closing parenthesis is used for points, e.g., 1) This point.
             then set the optional flag.
         """
-        punctuation_pairs_to_check = (('(',')'), ('[',']'), ('{','}'), ('**_','_**'))
-
-        found_any_paired_chars = False
-        # found_mismatch = False
-        for pairStart,pairEnd in punctuation_pairs_to_check:
-            pairStartCount = some_text.count(pairStart)
-            pairEndCount   = some_text.count(pairEnd)
-            if pairStartCount or pairEndCount:
-                found_any_paired_chars = True
+        if self.log.is_full('punctuation') or not PAIR_CHARS_RE.search(some_text):
+            return # Nothing to check (or no room for any more warnings)
+
+        brackets = ''.join(BRACKET_RE.findall(some_text))
+        # Removing the matched pairs leaves only the opening brackets that are never closed
+        #   unless there's a nesting error (then we need to go through them one at a time)
+        nesting_string = brackets
+        for _n in range(MAX_PAIR_REMOVALS):
+            reduced_nesting_string = nesting_string.replace('()','').replace('[]','').replace('{}','')
+            if reduced_nesting_string == nesting_string:
+                break
+            nesting_string = reduced_nesting_string
+        else: # too deeply nested to finish this way
+            nesting_string = None
+        nesting_warnings = []
+        if nesting_string is None or nesting_string.lstrip('([{'):
+            nesting_string, nesting_warnings = self.find_nesting_errors(some_text, brackets, ref)
+
+        for pairStart,pairEnd in PUNCTUATION_PAIRS_TO_CHECK:
+            if len(pairStart) == 1:
+                pairStartCount, pairEndCount = brackets.count(pairStart), brackets.count(pairEnd)
+            else:
+                pairStartCount, pairEndCount = some_text.count(pairStart), some_text.count(pairEnd)
             if pairStartCount > pairEndCount:
-                self.log.warning(f"{ref}: Possible missing closing '{pairEnd}' — found {pairStartCount} '{pairStart}' but {pairEndCount} '{pairEnd}'")
-                # found_mismatch = True
+                self.log.warning(f"{ref}: Possible missing closing '{pairEnd}' — found {pairStartCount} '{pairStart}' but {pairEndCount} '{pairEnd}'", 'punctuation')
             elif pairEndCount > pairStartCount:
                 if allow_close_parenthesis_points:
-                    # possible_points_list = re.findall(r'\s\d\) ', some_text)
-                    # if possible_points_list: print("possible_points_list", possible_points_list)
-                    possible_point_count = len(re.findall(r'\s\d\) ', some_text))
+                    possible_point_count = len(POSSIBLE_POINT_RE.findall(some_text))
                     pairEndCount -= possible_point_count
                 if pairEndCount > pairStartCount: # still
-                    self.log.warning(f"{ref}: Possible missing opening '{pairStart}' — found {pairStartCount} '{pairStart}' but {pairEndCount} '{pairEnd}'")
-                # found_mismatch = True
-        if found_any_paired_chars: # and not found_mismatch:
-            # Double-check the nesting
-            lines = some_text.split('\n')
-            nestingString = ''
-            line_number = 1
-            for ix, char in enumerate(some_text):
-                if char in '({[':
-                    nestingString += char
-                elif char in ')}]':
-                    if char == ')': wanted_start_char = '('
-                    elif char == '}': wanted_start_char = '{'
-                    elif char == ']': wanted_start_char = '['
-                    if nestingString and nestingString[-1] == wanted_start_char:
-                        nestingString = nestingString[:-1] # Close off successful match
-                    else: # not the closing that we expected
-                        if char==')' \
-                        and ix>0 and some_text[ix-1].isdigit() \
-                        and ix<len(some_text)-1 and some_text[ix+1] in ' \t':
-                            # This could be part of a list like 1) ... 2) ...
-                            pass # Just ignore this—at least they'll still get the above mismatched count message
-                        else:
-                            locateString = f" after recent '{nestingString[-1]}'" if nestingString else ''
-                            self.log.warning(f"{ref} line {line_number:,}: Possible nesting error—found unexpected '{char}'{locateString} near {lines[line_number-1]}")
-                elif char == '\n':
-                    line_number += 1
-            if nestingString: # handle left-overs
-                reformatted_nesting_string = "'" + "', '".join(nestingString) + "'"
-                self.log.warning(f"{ref}: Seem to have the following unclosed field(s): {reformatted_nesting_string}")
+                    self.log.warning(f"{ref}: Possible missing opening '{pairStart}' — found {pairStartCount} '{pairStart}' but {pairEndCount} '{pairEnd}'", 'punctuation')
+        # Double-check the nesting
+        for nesting_warning in nesting_warnings:
+            self.log.warning(nesting_warning, 'punctuation')
+        if nesting_string: # handle left-overs
+            reformatted_nesting_string = "'" + "', '".join(nesting_string) + "'"
+            self.log.warning(f"{ref}: Seem to have the following unclosed field(s): {reformatted_nesting_string}", 'punctuation')
         # NOTE: Notifying all those is probably overkill,
         #  but never mind (it might help detect multiple errors)
 
         # These are markdown specific checks, but hopefully shouldn't hurt to be done for all strings
         # They don't seem to be picked up by the markdown linter libraries for some reason.
-        for field,regex in ( # Put longest ones first
-                        # Seems that the fancy ones (commented out) don't find occurrences at the start (or end?) of the text
-                        ('___', r'___'),
-                        # ('___', r'[^_]___[^_]'), # three underlines
-                        ('***', r'\*\*\*'),
-                        # ('***', r'[^\*]\*\*\*[^\*]'), # three asterisks
-                        ('__', r'__'),
-                        # ('__', r'[^_]__[^_]'), # two underlines
-                        ('**', r'\*\*'),
-                        # ('**', r'[^\*]\*\*[^\*]'), # two asterisks
-                    ):
-            count = len(re.findall(regex, some_text)) # Finds all NON-OVERLAPPING matches
+        for field in ('___', '***', '__', '**'): # Put longest ones first
+            count = some_text.count(field) # Counts all NON-OVERLAPPING occurrences
             if count:
-                # print(f"check_punctuation_pairs found {count} of '{field}' at {ref} in '{some_text}'")
                 if (count % 2) != 0:
-                    # print(f"{ref}: Seem to have have mismatched '{field}' pairs in '{some_text}'")
                     content_snippet = some_text if len(some_text) < 85 \
                                         else f"{some_text[:40]} …… {some_text[-40:]}"
-                    self.log.warning(f"{ref}: Seem to have have mismatched '{field}' pairs in '{content_snippet}'")
+                    self.log.warning(f"{ref}: Seem to have have mismatched '{field}' pairs in '{content_snippet}'", 'punctuation')
                     break # Only want one warning per text
     # end of Linter.check_punctuation_pairs function
+
+
+    @staticmethod
+    def find_nesting_errors(some_text:str, brackets:str, ref:str) -> Tuple[str,List[str]]:
+        """
+        Goes through the brackets (found in order in the text), one at a time,
+            to find where the nesting goes wrong.
+
+        Returns the opening brackets left unclosed and the warnings.
+        """
+        nesting_list = [] # The opening brackets not yet closed
+        nesting_warnings = []
+        bracket_indexes = None # Where each bracket is in the text (only needed for the mismatches)
+        line_number, line_number_index = 1, 0
+        for n, char in enumerate(brackets):
+            if char in '({[':
+                nesting_list.append(char)
+            elif nesting_list and nesting_list[-1] == OPENING_BRACKETS[char]:
+                nesting_list.pop() # Close off successful match
+            else: # not the closing that we expected
+                if bracket_indexes is None:
+                    bracket_indexes = [bracket_match.start() for bracket_match in BRACKET_RE.finditer(some_text)]
+                ix = bracket_indexes[n]
+                if char==')' \
+                and ix>0 and some_text[ix-1].isdigit() \
+                and ix<len(some_text)-1 and some_text[ix+1] in ' \t':
+                    # This could be part of a list like 1) ... 2) ...
+                    continue # Just ignore this—at least they'll still get the mismatched count message
+                line_number += some_text.count('\n', line_number_index, ix)
+                line_number_index = ix
+                line_end_index = some_text.find('\n', ix)
+                line = some_text[some_text.rfind('\n', 0, ix)+1:line_end_index if line_end_index>=0 else None]
+                locateString = f" after recent '{nesting_list[-1]}'" if nesting_list else ''
+                nesting_warnings.append(f"{ref} line {line_number:,}: Possible nesting error—found unexpected '{char}'{locateString} near {line}")
+        return ''.join(nesting_list), nesting_warnings
+    # end of Linter.find_nesting_errors function
 #end of linter.py
\ No newline at end of file
@@ -1,9 +1,9 @@
 import os
 import json
 from html.parser import HTMLParser
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
-from rq_settings import prefix, debug_mode_flag
+from rq_settings import markdown_linter_backend, lint_workers
 from linters.linter import Linter
 from aws_tools.lambda_handler import LambdaHandler
 from general_tools.file_utils import read_file, get_files
@@ -11,6 +11,34 @@ from app_settings.app_settings import AppSettings
 
 from linters.py_markdown_linter.lint import MarkdownLinter as PyMarkdownLinter
 from linters.py_markdown_linter.config import LintConfig
+from linters.py_markdown_linter import config as py_markdown_config, lint as py_markdown_lint, \
+    rules as py_markdown_rules
+from linters.lint_result_store import get_source_version
+
+
+# The file rules to turn on (MD002 is off, as in the Node.js linter config in get_invoke_payload)
+ENABLED_RULE_IDS = ('MD001',)
+# Rules left to the Node.js linter's defaults or not wanted
+DISABLED_RULE_IDS = ('MD009', 'MD010', 'MD013')
+_py_markdown_linter = None
+
+
+def lint_markdown_string(markdown_string:str) -> List[Tuple[Optional[int],str]]:
+    """
+    Lints one Markdown file (in whichever process this gets called)
+
+    Returns a list of (line number or None, message) tuples.
+    """
+    global _py_markdown_linter
+    if _py_markdown_linter is None:
+        lint_config = LintConfig()
+        for rule_id in ENABLED_RULE_IDS:
+            lint_config.enable_rule_by_id(rule_id)
+        for rule_id in DISABLED_RULE_IDS:
+            lint_config.disable_rule_by_id(rule_id)
+        _py_markdown_linter = PyMarkdownLinter(lint_config)
+    return [(rule_violation.line_nr, rule_violation.message)
+                            for rule_violation in _py_markdown_linter.lint(markdown_string)]
 
 
 
@@ -20,6 +48,7 @@ class MarkdownLinter(Linter):
         super(MarkdownLinter, self).__init__(*args, **kwargs)
         self.single_file = None
         self.single_dir = None
+        self.md_strings:Optional[Dict[str,str]] = None # Contents of the .md files (once they've been read)
 
 
     def lint(self) -> bool:
@@ -32,58 +61,84 @@ class MarkdownLinter(Linter):
         """
         AppSettings.logger.debug("MarkdownLinter.lint()")
 
+        md_data = self.get_strings() # Each file is only read once
         # Do some preliminary checks on the files
-        for filename in self.get_files(relative_paths=True):
-            with open( os.path.join(self.source_dir, filename), 'rt') as md_file:
-                file_contents = md_file.read()
+        for filename, file_contents in md_data.items():
             self.check_punctuation_pairs(file_contents, filename.replace('.md',''))
+        if self.log.is_full():
+            AppSettings.logger.warning(f"Not linting the Markdown after {self.log.warning_count:,} warnings")
+            return True
 
-
-        md_data = self.get_strings() # Used for AWS Lambda call
-        # Determine approximate length of the payload data
-        payloadString = json.dumps(md_data) # (it doesn't include 'config' yet)
-        if not isinstance(payloadString, str): # then it must be Python3 bytes
-            payloadString = payloadString.decode()
-        estimated_payload_length = len(payloadString) + 335 # Allow for 'config' strings (included later)
-        AppSettings.logger.debug(f"Approx length of Markdown Linter payload = {estimated_payload_length:,} characters.")
-        payload_oversize_flag = estimated_payload_length > 6_291_456 # 6 MB—AWS Lambda call will fail
-        if payload_oversize_flag:
+        if markdown_linter_backend == 'lambda':
+            # Determine approximate length of the payload data
+            payloadString = json.dumps(md_data) # (it doesn't include 'config' yet)
+            estimated_payload_length = len(payloadString) + 335 # Allow for 'config' strings (included later)
+            AppSettings.logger.debug(f"Approx length of Markdown Linter payload = {estimated_payload_length:,} characters.")
+            if estimated_payload_length <= 6_291_456: # 6 MB—else AWS Lambda call will fail
+                return self.lint_remotely(md_data)
             AppSettings.logger.warning(f"Oversize Markdown Linter payload = {estimated_payload_length:,} characters.")
+        self.lint_locally(md_data)
+        return True
 
-        test_pyLinter = prefix and debug_mode_flag # True: always use new Python linter; False: mostly use AWS Lambda call
-        if test_pyLinter or payload_oversize_flag:
-            # New code using unfinished PyMarkdownLinter
-            AppSettings.logger.info("Invoking (unfinished) PyMarkdownLinter…")
-            lint_config = LintConfig()
-            for rule_id in ('MD009', 'MD010', 'MD013'): # Ignore
-                lint_config.disable_rule_by_id(rule_id)
-            py_markdown_linter = PyMarkdownLinter(lint_config)
-            for filename in self.get_files(relative_paths=True):
-                with open( os.path.join(self.source_dir, filename), 'rt') as md_file:
-                    linter_warnings = py_markdown_linter.lint(md_file.read())
-                if linter_warnings:
-                    AppSettings.logger.debug(f"Markdown linter result count for {filename} = {len(linter_warnings):,}.")
-                    for rule_violation in linter_warnings:
-                        self.log.warning(f"{filename.replace('.md','')} line {rule_violation.line_nr}: {rule_violation.message}")
-
-        else: # old (tx-Manager) code using AWS Lambda node.js call
-            AppSettings.logger.info("Invoking Node.js linter via AWS Lambda call…")
-            # print(len(md_data), md_data)
-            # AppSettings.logger.debug(f"Size of markdown data = {len(md_data)}") # Useless—always shows 1
-            lint_data = self.invoke_markdown_linter(self.get_invoke_payload(md_data))
-            if not lint_data:
-                return False
-            # RJH: What is this code doing? Why are warnings expressed as HTML segments here???
-            self.repo_owner = self.repo_name = '' # WE DON'T KNOW THIS STUFF
-            for f in lint_data.keys():
-                file_url = f'https://git.door43.org/{self.repo_owner}/{self.rc.repo_name}/src/master/{f}'
-                for item in lint_data[f]:
-                    error_context = ''
-                    if item['errorContext']:
-                        error_context = f'See "{self.strip_tags(item["errorContext"])}"'
-                    line = '<a href="{0}" target="_blank">{1}</a> - Line {2}: {3}. {4}'. \
-                        format(file_url, f, item['lineNumber'], item['ruleDescription'], error_context)
-                    self.log.warning(line)
+
+    def lint_locally(self, md_data:Dict[str,str]) -> None:
+        """
+        Lints the files with PyMarkdownLinter, in a pool of processes if there's more than one CPU,
+            logging the warnings file by file (in order) as the results come in
+
+        Files that haven't changed since an earlier job reuse the stored results.
+        """
+        filenames, markdown_strings = list(md_data.keys()), list(md_data.values())
+        result_keys:List[Optional[str]] = [None] * len(filenames)
+        stored_results:List[Optional[list]] = [None] * len(filenames)
+        if self.result_store:
+            linter_version = get_source_version(py_markdown_config, py_markdown_lint, py_markdown_rules)
+            for n, markdown_string in enumerate(markdown_strings):
+                result_keys[n] = self.result_store.make_key(self.__class__.__name__, linter_version,
+                                                            markdown_string, (ENABLED_RULE_IDS, DISABLED_RULE_IDS))
+                stored_results[n] = self.result_store.get(result_keys[n])
+        strings_to_lint = [markdown_string for markdown_string, linter_warnings in zip(markdown_strings, stored_results)
+                                                                                    if linter_warnings is None]
+        AppSettings.logger.info(f"Invoking PyMarkdownLinter on {len(strings_to_lint):,} of {len(filenames):,} files…")
+        executor = self.get_lint_executor(len(strings_to_lint))
+        if executor:
+            new_results = executor.map(lint_markdown_string, strings_to_lint,
+                                       chunksize=max(1, len(strings_to_lint) // (lint_workers * 4)))
+        else:
+            new_results = map(lint_markdown_string, strings_to_lint)
+        for filename, result_key, linter_warnings in zip(filenames, result_keys, stored_results):
+            if linter_warnings is None:
+                linter_warnings = next(new_results)
+                if result_key:
+                    self.result_store.put(result_key, linter_warnings)
+            if linter_warnings:
+                AppSettings.logger.debug(f"Markdown linter result count for {filename} = {len(linter_warnings):,}.")
+                for line_nr, message in linter_warnings:
+                    if line_nr is None: # from a file rule
+                        self.log.warning(f"{filename.replace('.md','')}: {message}")
+                    else:
+                        self.log.warning(f"{filename.replace('.md','')} line {line_nr}: {message}")
+
+
+    def lint_remotely(self, md_data:Dict[str,str]) -> bool:
+        """
+        Lints the files with the Node.js linter via an AWS Lambda call (the old tx-Manager code)
+        """
+        AppSettings.logger.info("Invoking Node.js linter via AWS Lambda call…")
+        lint_data = self.invoke_markdown_linter(self.get_invoke_payload(md_data))
+        if not lint_data:
+            return False
+        # RJH: What is this code doing? Why are warnings expressed as HTML segments here???
+        self.repo_owner = self.repo_name = '' # WE DON'T KNOW THIS STUFF
+        for f in lint_data.keys():
+            file_url = f'https://git.door43.org/{self.repo_owner}/{self.rc.repo_name}/src/master/{f}'
+            for item in lint_data[f]:
+                error_context = ''
+                if item['errorContext']:
+                    error_context = f'See "{self.strip_tags(item["errorContext"])}"'
+                line = '<a href="{0}" target="_blank">{1}</a> - Line {2}: {3}. {4}'. \
+                    format(file_url, f, item['lineNumber'], item['ruleDescription'], error_context)
+                self.log.warning(line)
         return True
 
 
@@ -96,25 +151,47 @@ class MarkdownLinter(Linter):
         if self.single_dir:
             dir_path = os.path.join(self.source_dir, self.single_dir)
             sub_files = sorted(get_files(directory=dir_path, relative_paths=relative_paths, exclude=self.EXCLUDED_FILES,
-                                         extensions=['.md']))
+                                         extensions=['.md'], walk=self.file_index.walk))
             files = []
             for f in sub_files:
                 files.append(os.path.join(self.single_dir, f))
         else:
             files = sorted(get_files(directory=self.source_dir, relative_paths=relative_paths, exclude=self.EXCLUDED_FILES,
-                                     extensions=['.md']))
+                                     extensions=['.md'], walk=self.file_index.walk))
         return files
 
 
-    def get_strings(self) -> List[str]:
-        strings = {}
-        for filename in self.get_files(relative_paths=True):
-            filepath = os.path.join(self.source_dir, filename)
-            try: text = read_file(filepath)
-            except Exception as e:
-                self.log.warning(f"Error reading {filename}: {e}")
-            strings[filename] = text
-        return strings
+    def get_strings(self) -> Dict[str,str]:
+        """
+        Returns the contents of the .md files (keyed by their relative paths)
+            only reading them the first time it's called
+        """
+        if self.md_strings is None:
+            self.md_strings = {}
+            for filename in self.get_files(relative_paths=True):
+                filepath = os.path.join(self.source_dir, filename)
+                try: self.md_strings[filename] = read_file(filepath)
+                except Exception as e:
+                    self.log.warning(f"Error reading {filename}: {e}")
+        return self.md_strings
+
+
+    def get_link_check_strings(self) -> Dict[str,str]:
+        """
+        Returns the contents of all the .md files (keyed by their relative paths),
+            i.e., the ones from get_strings() and also the EXCLUDED_FILES (e.g., readme.md),
+            which aren't linted as Markdown but can still have invalid links
+        """
+        md_strings = dict(self.get_strings())
+        dir_path = os.path.join(self.source_dir, self.single_dir) if self.single_dir else self.source_dir
+        for filename in get_files(directory=dir_path, relative_paths=True, extensions=['.md'], walk=self.file_index.walk):
+            if self.single_dir:
+                filename = os.path.join(self.single_dir, filename)
+            if filename not in md_strings:
+                try: md_strings[filename] = read_file(os.path.join(self.source_dir, filename))
+                except Exception as e:
+                    self.log.warning(f"Error reading {filename}: {e}")
+        return dict(sorted(md_strings.items()))
 
 
     def get_invoke_payload(self, strings:Dict[str,Any]) -> Dict[str,Any]:
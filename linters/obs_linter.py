@@ -1,3 +1,4 @@
+from typing import Dict
 import os
 import re
 
@@ -7,6 +8,13 @@ from linters.markdown_linter import MarkdownLinter
 from linters.obs_data import obs_data
 
 
+REFERENCE_RE = re.compile(r'^_.*_ *$', re.M | re.U)
+# The (frame number, strict, loose) picture link patterns for the frames of each story
+FRAME_PATTERNS = {chapter_number: [(frame_index, f'-{chapter_number}-{frame_index}.jpg)\n', f'-{chapter_number}-{frame_index}.')
+                                    for frame_index in (str(frame_idx).zfill(2) for frame_idx in range(1, chapter_data['frames']))]
+                    for chapter_number, chapter_data in obs_data['chapters'].items()}
+
+
 class ObsLinter(MarkdownLinter):
 
     def lint(self) -> bool:
@@ -22,49 +30,27 @@ class ObsLinter(MarkdownLinter):
         # chapter check
         project_dir = os.path.join(self.source_dir, self.rc.project().path)
         AppSettings.logger.debug(f"project_dir1 = {project_dir}")
-        if not os.path.isdir(project_dir):
+        if not self.file_index.isdir(project_dir):
             project_dir = self.source_dir
             AppSettings.logger.debug(f"project_dir2 = {project_dir}")
-        AppSettings.logger.debug(f"project_dir contains {os.listdir(project_dir)}")
+        AppSettings.logger.debug(f"project_dir contains {self.file_index.listdir(project_dir)}")
 
-        reference_re = re.compile(r'^_.*_ *$', re.M | re.U)
+        # The chapters get read once for these checks and the Markdown linter
+        md_data = self.get_strings()
         for chapter in range(1, 51):
             chapter_number = str(chapter).zfill(2)
             filename = os.path.join(project_dir, chapter_number + '.md')
 
-            if not os.path.isfile(filename):
+            if not self.file_index.isfile(filename):
                 self.log.warning(f"Chapter {chapter_number} does not exist.")
                 continue
 
-            chapter_md = read_file(filename)
-            is_title = chapter_md.find('# ')
-
-            # Find chapter headings
-            if is_title < 0:
-                self.log.warning(f"Chapter {chapter_number} does not have a title.")
-
-            # Identify missing frames
-            expected_frame_count = obs_data['chapters'][str(chapter).zfill(2)]['frames']
-
-            for frame_idx in range(1, expected_frame_count):
-                frame_index = str(frame_idx).zfill(2)
-                pattern_strict = '-{0}-{1}.jpg)\n'.format(chapter_number, frame_index)
-                strict_find_result = chapter_md.find(pattern_strict)
-                if strict_find_result < 0: # not found
-                    pattern_loose = '-{0}-{1}.'.format(chapter_number, frame_index)
-                    if chapter_md.find(pattern_loose) < 0:
-                        self.log.warning(f"Missing frame: {chapter_number}-{frame_index}")
-                    else: # failed the strict one, but found the loose one
-                        self.log.warning(f"Unexpected picture link formatting: {chapter_number}-{frame_index}")
-
-            # look for verse reference
-            if not reference_re.search(chapter_md):
-                self.log.warning(f"Bible reference not found at end of chapter {chapter_number}!")
+            self.check_chapter(chapter_number, self.get_md_string(md_data, filename))
 
         # Check front and back matter
         for book_end in ['front', 'back']:
             filename = os.path.join(project_dir, book_end, 'intro.md')
-            if not os.path.isfile(filename):
+            if not self.file_index.isfile(filename):
                 filename = os.path.join(project_dir, '{0}.md'.format(book_end))
 
             lines = {
@@ -72,13 +58,48 @@ class ObsLinter(MarkdownLinter):
                 'back':  'We want to make this visual'
             }
 
-            if not os.path.isfile(filename):
+            if not self.file_index.isfile(filename):
                 self.log.warning(f"{book_end}.md does not exist.")
                 continue
 
             if self.rc.resource.language.identifier != 'en':
-                end_content = read_file(filename)
+                end_content = self.get_md_string(md_data, filename)
                 if lines[book_end] in end_content:
                     self.log.warning(f"Story {book_end} matter is not translated.")
 
         return super(ObsLinter, self).lint()  # Runs the markdown linter
+
+
+    def get_md_string(self, md_data:Dict[str,str], filename:str) -> str:
+        """
+        Returns the contents of the file (already read if it's one of the .md files)
+        """
+        try:
+            return md_data[os.path.relpath(filename, self.source_dir)]
+        except KeyError: # e.g., an excluded file
+            return read_file(filename)
+
+
+    def check_chapter(self, chapter_number:str, chapter_md:str) -> None:
+        """
+        Checks one story for its title, the picture links of all its frames,
+            and its Bible reference
+        """
+        is_title = chapter_md.find('# ')
+
+        # Find chapter headings
+        if is_title < 0:
+            self.log.warning(f"Chapter {chapter_number} does not have a title.")
+
+        # Identify missing frames
+        for frame_index, pattern_strict, pattern_loose in FRAME_PATTERNS[chapter_number]:
+            strict_find_result = chapter_md.find(pattern_strict)
+            if strict_find_result < 0: # not found
+                if chapter_md.find(pattern_loose) < 0:
+                    self.log.warning(f"Missing frame: {chapter_number}-{frame_index}")
+                else: # failed the strict one, but found the loose one
+                    self.log.warning(f"Unexpected picture link formatting: {chapter_number}-{frame_index}")
+
+        # look for verse reference
+        if not REFERENCE_RE.search(chapter_md):
+            self.log.warning(f"Bible reference not found at end of chapter {chapter_number}!")
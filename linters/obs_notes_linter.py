@@ -21,10 +21,10 @@ class ObsNotesLinter(MarkdownLinter):
         # chapter check
         project_dir = os.path.join(self.source_dir, self.rc.project().path)
         AppSettings.logger.debug(f"project_dir1 = {project_dir}")
-        if not os.path.isdir(project_dir):
+        if not self.file_index.isdir(project_dir):
             project_dir = self.source_dir
             AppSettings.logger.debug(f"project_dir2 = {project_dir}")
-        AppSettings.logger.debug(f"project_dir contains {os.listdir(project_dir)}")
+        AppSettings.logger.debug(f"project_dir contains {self.file_index.listdir(project_dir)}")
 
         # reference_re = re.compile(r'^_.*_ *$', re.M | re.U)
         # for story_number in range(1, 50+1):
@@ -13,6 +13,8 @@ class LintConfigError(Exception):
 class LintConfig:
     """ Class representing markdownlint configuration """
     default_rule_classes = [rules.MaxLineLengthRule, rules.TrailingWhiteSpace, rules.HardTab]
+    # Only applied once turned on with enable_rule_by_id()
+    optional_rule_classes = [rules.HeaderIncrement, rules.TopLevelHeader]
 
     def __init__(self):
         # Use an ordered dict so that the order in which rules are applied is always the same
@@ -25,6 +27,13 @@ class LintConfig:
     def disable_rule_by_id(self, rule_id):
         del self._rules[rule_id]
 
+    def enable_rule_by_id(self, rule_id):
+        for rule_cls in self.default_rule_classes + self.optional_rule_classes:
+            if rule_cls.id == rule_id:
+                self._rules[rule_id] = rule_cls()
+                return
+        raise LintConfigError(f"No such rule: {rule_id}")
+
     def get_rule_by_name_or_id(self, rule_id_or_name):
         # try finding rule by id
         rule = self._rules.get(rule_id_or_name)
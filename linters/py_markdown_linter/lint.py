@@ -1,6 +1,8 @@
-
 from linters.py_markdown_linter import rules
 
+DISABLE_COMMENT = '<!-- markdownlint:disable -->'
+ENABLE_COMMENT = '<!-- markdownlint:enable -->'
+
 
 class MarkdownLinter:
     def __init__(self, config):
@@ -10,32 +12,73 @@ class MarkdownLinter:
     def line_rules(self):
         return [rule for rule in self.config.rules if isinstance(rule, rules.LineRule)]
 
+    @property
+    def file_rules(self):
+        return [rule for rule in self.config.rules if isinstance(rule, rules.FileRule)]
+
+    @staticmethod
+    def find_candidate_lines(line_rules, markdown_string, lines):
+        """ Returns the indexes, in order, of the lines that any of the given line rules might flag """
+        candidate_lines = set()
+        for rule in line_rules:
+            rule_lines = rule.find_candidate_lines(markdown_string, lines)
+            if rule_lines is None:
+                return range(len(lines))
+            candidate_lines.update(rule_lines)
+        return sorted(candidate_lines)
+
     def _apply_line_rules(self, markdown_string):
         """ Iterates over the lines in a given markdown string and applies all the enabled line rules to each line """
         all_violations = []
         lines = markdown_string.split("\n")
         line_rules = self.line_rules
+        candidate_lines = self.find_candidate_lines(line_rules, markdown_string, lines)
+        if DISABLE_COMMENT not in markdown_string:
+            for line_index in candidate_lines:
+                for rule in line_rules:
+                    violation = rule.validate(lines[line_index])
+                    if violation:
+                        violation.line_nr = line_index + 1
+                        all_violations.append(violation)
+            return all_violations
+
+        candidate_lines = set(candidate_lines)
         line_nr = 1
         ignoring = False
-        for line in lines:
+        for line_index, line in enumerate(lines):
             if ignoring:
-                if line.strip() == '<!-- markdownlint:enable -->':
+                if line.strip() == ENABLE_COMMENT:
                     ignoring = False
             else:
-                if line.strip() == '<!-- markdownlint:disable -->':
+                if line.strip() == DISABLE_COMMENT:
                     ignoring = True
                     continue
 
-                for rule in line_rules:
-                    violation = rule.validate(line)
-                    if violation:
-                        violation.line_nr = line_nr
-                        all_violations.append(violation)
+                if line_index in candidate_lines:
+                    for rule in line_rules:
+                        violation = rule.validate(line)
+                        if violation:
+                            violation.line_nr = line_nr
+                            all_violations.append(violation)
             line_nr += 1
         return all_violations
 
+    def _apply_file_rules(self, markdown_string):
+        """ Converts the markdown string to a tree (only once) and applies all the enabled file rules to it """
+        file_rules = self.file_rules
+        if not file_rules:
+            return []
+        soup = rules.FileRule.md_to_tree(markdown_string)
+        all_violations = []
+        for rule in file_rules:
+            violation = rule.validate_tree(soup)
+            if violation:
+                all_violations.append(violation)
+        return all_violations
+
     def lint(self, markdown_string):
         all_violations = []
+        all_violations.extend(self._apply_file_rules(markdown_string))
         all_violations.extend(self._apply_line_rules(markdown_string))
         return all_violations
 
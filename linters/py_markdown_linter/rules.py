@@ -6,6 +6,7 @@ import markdown
 from linters.py_markdown_linter.options import IntOption
 
 RE_HEADERS = re.compile('^h[1-6]$')
+RE_TRAILING_WHITESPACE = re.compile(r"\s$")
 
 
 class Rule(metaclass=ABCMeta):
@@ -42,10 +43,24 @@ class FileRule(Rule):
         """
         return BeautifulSoup(markdown.markdown(md), "html.parser")
 
+    def validate(self, lines):
+        return self.validate_tree(self.md_to_tree(lines))
+
+    @abstractmethod
+    def validate_tree(self, soup):
+        """ Validates a file already converted by md_to_tree (so it can be shared by all the file rules) """
+        pass
+
 
 class LineRule(Rule):
     """ Class representing rules that act on a line by line basis """
-    pass
+
+    def find_candidate_lines(self, markdown_string, lines):
+        """
+        Returns the indexes of all the lines (split from markdown_string) this rule might flag,
+            found with a quick whole-file check, or None if every line has to be validated
+        """
+        return None
 
 
 class RuleViolation:
@@ -70,8 +85,7 @@ class HeaderIncrement(FileRule):
     id = "MD001"
     error_str = "Headers don't increment"
 
-    def validate(self, lines):
-        soup = self.md_to_tree(lines)
+    def validate_tree(self, soup):
         old_level = None
         for header in soup.find_all(RE_HEADERS):
             level = int(header.name[-1])
@@ -87,8 +101,7 @@ class TopLevelHeader(FileRule):
     options_spec = [IntOption("first-header-level", 1, "Top level header")]
     error_str = "First header of the file must be top level header"
 
-    def validate(self, lines):
-        soup = self.md_to_tree(lines)
+    def validate_tree(self, soup):
         top_level = self.options['first-header-level'].value
         first_header = soup.find(RE_HEADERS)
         if first_header:
@@ -103,9 +116,11 @@ class TrailingWhiteSpace(LineRule):
     id = "MD009"
     error_str = "Line has trailing whitespace"
 
+    def find_candidate_lines(self, markdown_string, lines):
+        return [n for n, line in enumerate(lines) if line[-1:].isspace()]  # Same as RE_TRAILING_WHITESPACE
+
     def validate(self, line):
-        pattern = re.compile(r"\s$")
-        if pattern.search(line):
+        if RE_TRAILING_WHITESPACE.search(line):
             return RuleViolation(self.id, self.error_str)
 
 
@@ -115,6 +130,11 @@ class HardTab(LineRule):
     id = "MD010"
     error_str = "Line contains hard tab characters (\\t)"
 
+    def find_candidate_lines(self, markdown_string, lines):
+        if "\t" not in markdown_string:
+            return []
+        return [n for n, line in enumerate(lines) if "\t" in line]
+
     def validate(self, line):
         if "\t" in line:
             return RuleViolation(self.id, self.error_str)
@@ -127,6 +147,10 @@ class MaxLineLengthRule(LineRule):
     options_spec = [IntOption('line-length', 80, "Max line length")]
     error_str = "Line exceeds max length ({0}>{1})"
 
+    def find_candidate_lines(self, markdown_string, lines):
+        max_length = self.options['line-length'].value
+        return [n for n, line in enumerate(lines) if len(line) > max_length]
+
     def validate(self, line):
         max_length = self.options['line-length'].value
         if len(line) > max_length:
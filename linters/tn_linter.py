@@ -1,6 +1,7 @@
 from typing import Optional
 import os
 import re
+import csv
 
 from rq_settings import prefix, debug_mode_flag
 from app_settings.app_settings import AppSettings
@@ -8,10 +9,34 @@ from door43_tools.bible_books import BOOK_NUMBERS
 from general_tools import file_utils
 from linters.markdown_linter import MarkdownLinter
 from linters.linter import Linter
+from linters.lint_logger import LintLogger
 from linters.py_markdown_linter.lint import MarkdownLinter as PyMarkdownLinter
 from linters.py_markdown_linter.config import LintConfig
 
 
+# The notes are fragments of a book, so the (optional) header rules are left off and checked by TnTsvLinter.check_markdown
+TSV_DISABLED_RULE_IDS = ('MD009', 'MD010', 'MD013')
+TSV_BUFFER_SIZE = 1024 * 1024 # bytes read from a TSV file at a time
+_tsv_linter = None
+
+
+def check_tsv_file(source_dir:str, filename:str) -> LintLogger:
+    """
+    Checks the rows of one TSV file (in whichever process this gets called)
+
+    Returns the log with all its warnings.
+    """
+    global _tsv_linter
+    if _tsv_linter is None:
+        _tsv_linter = TnTsvLinter(repo_subject='TSV_Translation_Notes', source_dir=source_dir)
+        _tsv_linter.close() # Only its checks are used (not its temp folder)
+    _tsv_linter.source_dir = source_dir
+    _tsv_linter.log = LintLogger(max_warnings=None)
+    _tsv_linter.check_tsv_file(filename)
+    return _tsv_linter.log
+
+
+
 class TnLinter(MarkdownLinter):
 
     # match links of form '](link)'
@@ -38,14 +63,10 @@ class TnLinter(MarkdownLinter):
         :return boolean:
         """
         self.source_dir = os.path.abspath(self.source_dir)
-        source_dir = self.source_dir if not self.single_dir else os.path.join(self.source_dir, self.single_dir)
-        for root, _dirs, files in os.walk(source_dir):
-            for f in files:
-                file_path = os.path.join(root, f)
-                parts = os.path.splitext(f)
-                if parts[1] == '.md':
-                    contents = file_utils.read_file(file_path)
-                    self.find_invalid_links(root, f, contents)
+        for filename, contents in self.get_link_check_strings().items(): # Mostly the contents linted as Markdown below
+            if self.log.is_full(): break
+            folder, f = os.path.split(os.path.join(self.source_dir, filename))
+            self.find_invalid_links(folder, f, contents)
 
         for dir in BOOK_NUMBERS:
             found_files = False
@@ -53,7 +74,7 @@ class TnLinter(MarkdownLinter):
                 continue
             AppSettings.logger.debug(f"Processing folder {dir}")
             file_path = os.path.join(self.source_dir, dir)
-            for root, _dirs, files in os.walk(file_path):
+            for root, _dirs, files in self.file_index.walk(file_path):
                 if root == file_path:
                     continue  # skip book folder
 
@@ -81,10 +102,7 @@ class TnLinter(MarkdownLinter):
                 if link.find('.md') < 0:
                     continue
 
-                file_path = os.path.join(folder, link)
-                file_path_abs = os.path.abspath(file_path)
-                exists = os.path.exists(file_path_abs)
-                if not exists:
+                if not self.file_index.link_exists(folder, link):
                     a = self.get_file_link(f, folder)
                     self.log.warning(f"{a}: contains invalid link: ({link})")
 
@@ -107,6 +125,8 @@ class TnTsvLinter(Linter):
     link_marker_re = re.compile(r'\]\(([^\n()]+)\)')
     EXPECTED_TAB_COUNT = 4 # So there's one more column than this
         # NOTE: The preprocessor removes unneeded columns while fixing links
+    EXPECTED_HEADER = 'Book	Chapter	Verse	ID	SupportReference	OrigQuote	Occurrence	GLQuote	OccurrenceNote'
+    MAX_ERROR_COUNT = 20 # per file
 
 
     # def __init__(self, *args, **kwargs) -> None:
@@ -121,21 +141,15 @@ class TnTsvLinter(Linter):
         self.source_dir is the directory of source files (.tsv)
         :return boolean:
         """
-        lint_config = LintConfig()
-        for rule_id in ('MD009', 'MD010', 'MD013'): # Ignore
-            lint_config.disable_rule_by_id(rule_id)
-        py_markdown_linter = PyMarkdownLinter(lint_config)
-
         self.source_dir = os.path.abspath(self.source_dir)
         source_dir = self.source_dir
-        for root, _dirs, files in os.walk(source_dir):
+        for root, _dirs, files in self.file_index.walk(source_dir):
             for f in files:
                 file_path = os.path.join(root, f)
-                if os.path.splitext(f)[1] == '.tsv':
-                    contents = file_utils.read_file(file_path)
-                    self.find_invalid_links(root, f, contents)
+                if os.path.splitext(f)[1] == '.tsv' and not self.log.is_full():
+                    self.find_invalid_links_in_file(root, f, file_path)
 
-        file_list = os.listdir(source_dir)
+        file_list = self.file_index.listdir(source_dir)
         if  len(self.rc.projects) != 1: # Many repos are intentionally just one book
             for dir in BOOK_NUMBERS:
                 found_file = False
@@ -147,71 +161,21 @@ class TnTsvLinter(Linter):
                     self.log.warning(f"Missing tN tsv book: '{dir}'")
 
         # Now check tabs and C:V numbers
-        MAX_ERROR_COUNT = 20
-        for filename in sorted(file_list):
-            if not filename.endswith('.tsv'): continue # Skip other files
-            error_count = 0
-            AppSettings.logger.info(f"Linting {filename}…")
-            tsv_filepath = os.path.join(source_dir, filename)
-            started = False
-            expectedB = filename[-7:-4]
-            lastC = lastV = C = V = '0'
-            with open(tsv_filepath, 'rt') as tsv_file:
-                for tsv_line in tsv_file:
-                    tsv_line = tsv_line.rstrip('\n')
-                    tab_count = tsv_line.count('\t')
-                    if not started:
-                        # AppSettings.logger.debug(f"TSV header line is '{tsv_line}'")
-                        if tsv_line != 'Book	Chapter	Verse	ID	SupportReference	OrigQuote	Occurrence	GLQuote	OccurrenceNote':
-                            self.log.warning(f"Unexpected TSV header line: '{tsv_line}' in {filename}")
-                            error_count += 1
-                        started = True
-                    elif tab_count != TnTsvLinter.EXPECTED_TAB_COUNT:
-                        self.log.warning(f"Bad {expectedB} line near {C}:{V} with {tab_count} tabs (expected {TnTsvLinter.EXPECTED_TAB_COUNT})")
-                        B = C = V = _OrigQuote = OccurrenceNote = None
-                        error_count += 1
-                    else:
-                        B, C, V, _OrigQuote, OccurrenceNote = tsv_line.split('\t')
-                        if B != expectedB:
-                            self.log.warning(f"Unexpected '{B}' in '{tsv_line}' in {filename}")
-                        if not C:
-                            self.log.warning(f"Missing chapter number after {lastC}:{lastV} in {filename}")
-                        elif not C.isdigit() and C not in ('front','back'):
-                            self.log.warning(f"Bad '{C}' chapter number near verse {V} in {filename}")
-                        elif C.isdigit() and lastC.isdigit():
-                            lastCint, Cint = int(lastC), int(C)
-                            if Cint < lastCint:
-                                self.log.warning(f"Decrementing '{C}' chapter number after {lastC} in {filename}")
-                            elif Cint > lastCint+1:
-                                self.log.warning(f"Missing chapter number {lastCint+1} after {lastC} in {filename}")
-                        if C == lastC: # still in the same chapter
-                            if not V.isdigit():
-                                self.log.warning(f"Bad '{V}' verse number in chapter {C} in {filename}")
-                            elif lastV.isdigit():
-                                lastVint, Vint = int(lastV), int(V)
-                                if Vint < lastVint:
-                                    self.log.warning(f"Decrementing '{V}' verse number after {lastV} in chapter {C} in {filename}")
-                                # NOTE: Disabled because missing verse notes are expected
-                                # elif Vint > lastVint+1:
-                                    # self.log.warning(f"Missing verse number {lastVint+1} after {lastV} in chapter {C} in {filename}")
-                        else: # just started a new chapter
-                            if not V.isdigit() and V != 'intro':
-                                self.log.warning(f"Bad '{V}' verse number in start of chapter {C} in {filename}")
-                        # if OrigQuote and need_to_check_quotes:
-                        #     try: self.check_original_language_quotes(B,C,V,OrigQuote)
-                        #     except Exception as e:
-                        #         self.log.warning(f"{B} {C}:{V} Unable to check original language quotes: {e}")
-                        if OccurrenceNote:
-                            left_count, right_count = OccurrenceNote.count('['), OccurrenceNote.count(']')
-                            if left_count != right_count:
-                                self.log.warning(f"Unmatched square brackets at {B} {C}:{V} in '{OccurrenceNote}'")
-                            self.check_markdown(py_markdown_linter, OccurrenceNote, f'{B} {C}:{V}')
-                        lastC, lastV = C, V
-                        if lastC == 'front': lastC = '0'
-                        elif lastC == 'back': lastC = '999'
-                    if error_count > MAX_ERROR_COUNT:
-                        AppSettings.logger.critical("TnTsvLinter: Too many TSV count errors—aborting!")
-                        break
+        #   (the books are checked at the same time, but their warnings are still logged in order)
+        tsv_filenames = [filename for filename in sorted(file_list) if filename.endswith('.tsv')]
+        executor = self.get_lint_executor(len(tsv_filenames))
+        if executor:
+            checks = [executor.submit(check_tsv_file, source_dir, filename) for filename in tsv_filenames]
+            for check in checks:
+                if self.log.is_full():
+                    for pending_check in checks:
+                        pending_check.cancel() # if not started yet
+                    break
+                self.log.add_warnings_from(check.result())
+        else:
+            for filename in tsv_filenames:
+                if self.log.is_full(): break
+                self.check_tsv_file(filename)
 
         # if prefix and debug_mode_flag:
         #     AppSettings.logger.debug(f"Temp folder '{self.preload_dir}' has been left on disk for debugging!")
@@ -221,6 +185,94 @@ class TnTsvLinter(Linter):
     # end of TnTsvLinter.lint()
 
 
+    def check_tsv_file(self, filename:str) -> None:
+        """
+        Checks the rows of one TSV file in self.source_dir
+
+        The rows are read one at a time, so the memory used doesn't depend on the size of the book.
+        """
+        AppSettings.logger.info(f"Linting {filename}…")
+        lint_config = LintConfig()
+        for rule_id in TSV_DISABLED_RULE_IDS:
+            lint_config.disable_rule_by_id(rule_id)
+        py_markdown_linter = PyMarkdownLinter(lint_config)
+
+        error_count = 0
+        tsv_filepath = os.path.join(self.source_dir, filename)
+        started = False
+        expectedB = filename[-7:-4]
+        lastC = lastV = C = V = '0'
+        with open(tsv_filepath, 'rt', newline='', buffering=TSV_BUFFER_SIZE) as tsv_file:
+            # QUOTE_NONE so that quote characters in the notes are just text
+            tsv_reader = csv.reader(tsv_file, delimiter='\t', quoting=csv.QUOTE_NONE)
+            while not self.log.is_full():
+                try:
+                    row = next(tsv_reader)
+                except StopIteration:
+                    break
+                except csv.Error as e: # e.g., a field bigger than csv.field_size_limit()
+                    self.log.warning(f"Unable to read {expectedB} line near {C}:{V} in {filename}: {e}")
+                    error_count += 1
+                    if error_count > self.MAX_ERROR_COUNT: break
+                    continue
+                tab_count = len(row) - 1 if row else 0
+                if not started:
+                    tsv_line = '\t'.join(row)
+                    # AppSettings.logger.debug(f"TSV header line is '{tsv_line}'")
+                    if tsv_line != self.EXPECTED_HEADER:
+                        self.log.warning(f"Unexpected TSV header line: '{tsv_line}' in {filename}")
+                        error_count += 1
+                    started = True
+                elif tab_count != self.EXPECTED_TAB_COUNT:
+                    self.log.warning(f"Bad {expectedB} line near {C}:{V} with {tab_count} tabs (expected {self.EXPECTED_TAB_COUNT})")
+                    B = C = V = _OrigQuote = OccurrenceNote = None
+                    error_count += 1
+                else:
+                    B, C, V, _OrigQuote, OccurrenceNote = row
+                    if B != expectedB:
+                        tsv_line = '\t'.join(row)
+                        self.log.warning(f"Unexpected '{B}' in '{tsv_line}' in {filename}")
+                    if not C:
+                        self.log.warning(f"Missing chapter number after {lastC}:{lastV} in {filename}")
+                    elif not C.isdigit() and C not in ('front','back'):
+                        self.log.warning(f"Bad '{C}' chapter number near verse {V} in {filename}")
+                    elif C.isdigit() and lastC.isdigit():
+                        lastCint, Cint = int(lastC), int(C)
+                        if Cint < lastCint:
+                            self.log.warning(f"Decrementing '{C}' chapter number after {lastC} in {filename}")
+                        elif Cint > lastCint+1:
+                            self.log.warning(f"Missing chapter number {lastCint+1} after {lastC} in {filename}")
+                    if C == lastC: # still in the same chapter
+                        if not V.isdigit():
+                            self.log.warning(f"Bad '{V}' verse number in chapter {C} in {filename}")
+                        elif lastV.isdigit():
+                            lastVint, Vint = int(lastV), int(V)
+                            if Vint < lastVint:
+                                self.log.warning(f"Decrementing '{V}' verse number after {lastV} in chapter {C} in {filename}")
+                            # NOTE: Disabled because missing verse notes are expected
+                            # elif Vint > lastVint+1:
+                                # self.log.warning(f"Missing verse number {lastVint+1} after {lastV} in chapter {C} in {filename}")
+                    else: # just started a new chapter
+                        if not V.isdigit() and V != 'intro':
+                            self.log.warning(f"Bad '{V}' verse number in start of chapter {C} in {filename}")
+                    # if OrigQuote and need_to_check_quotes:
+                    #     try: self.check_original_language_quotes(B,C,V,OrigQuote)
+                    #     except Exception as e:
+                    #         self.log.warning(f"{B} {C}:{V} Unable to check original language quotes: {e}")
+                    if OccurrenceNote:
+                        left_count, right_count = OccurrenceNote.count('['), OccurrenceNote.count(']')
+                        if left_count != right_count:
+                            self.log.warning(f"Unmatched square brackets at {B} {C}:{V} in '{OccurrenceNote}'")
+                        self.check_markdown(py_markdown_linter, OccurrenceNote, f'{B} {C}:{V}')
+                    lastC, lastV = C, V
+                    if lastC == 'front': lastC = '0'
+                    elif lastC == 'back': lastC = '999'
+                if error_count > self.MAX_ERROR_COUNT:
+                    AppSettings.logger.critical("TnTsvLinter: Too many TSV count errors—aborting!")
+                    break
+    # end of TnTsvLinter.check_tsv_file function
+
+
     def check_markdown(self, mdLinter:PyMarkdownLinter, markdown_string:str, reference:str) -> None:
         """
         Checks the header progressions in the markdown string
@@ -260,6 +312,20 @@ class TnTsvLinter(Linter):
     # end of TnTsvLinter.check_markdown function
 
 
+    def find_invalid_links_in_file(self, folder:str, filename:str, file_path:str) -> None:
+        """
+        Checks the links in a TSV file, one line at a time
+            (the links can't go over the end of a line)
+        """
+        try:
+            with open(file_path, 'rt', encoding='utf-8-sig', newline='\n', buffering=TSV_BUFFER_SIZE) as tsv_file:
+                for line in tsv_file:
+                    if '](' in line:
+                        self.find_invalid_links(folder, filename, line)
+        except (OSError, UnicodeDecodeError) as e:
+            AppSettings.logger.error(f"Unable to read {file_path}: {e}")
+    # end of TnTsvLinter.find_invalid_links_in_file function
+
     def find_invalid_links(self, folder:str, filename:str, contents:str) -> None:
         # AppSettings.logger.debug(f"TnTsvLinter.find_invalid_links( {folder}, {f}, {contents} ) …")
         for link_match in TnLinter.link_marker_re.finditer(contents):
@@ -270,10 +336,7 @@ class TnTsvLinter(Linter):
                 if link.find('.tsv') < 0:
                     continue
 
-                file_path = os.path.join(folder, link)
-                file_path_abs = os.path.abspath(file_path)
-                exists = os.path.exists(file_path_abs)
-                if not exists:
+                if not self.file_index.link_exists(folder, link):
                     a = self.get_file_link(filename, folder)
                     self.log.warning(f"{a}: contains invalid link: ({link})")
     # end of TnTsvLinter.find_invalid_links function
@@ -1,7 +1,6 @@
 import os
 import re
 from app_settings.app_settings import AppSettings
-from general_tools import file_utils
 from linters.markdown_linter import MarkdownLinter
 
 
@@ -19,13 +18,10 @@ class TwLinter(MarkdownLinter):
         :return bool:
         """
         self.source_dir = os.path.abspath(self.source_dir)
-        for root, _dirs, files in os.walk(self.source_dir):
-            for f in files:
-                file_path = os.path.join(root, f)
-                parts = os.path.splitext(f)
-                if parts[1] == '.md':
-                    contents = file_utils.read_file(file_path)
-                    self.find_invalid_links(root, f, contents)
+        for filename, contents in self.get_link_check_strings().items(): # Mostly the contents linted as Markdown below
+            if self.log.is_full(): break
+            folder, f = os.path.split(os.path.join(self.source_dir, filename))
+            self.find_invalid_links(folder, f, contents)
 
         return super(TwLinter, self).lint()  # Runs checks on Markdown, using the markdown linter
 
@@ -38,14 +34,9 @@ class TwLinter(MarkdownLinter):
                 if link.find('.md') < 0:
                     continue
 
-                file_path = os.path.join(folder, link)
-                file_path_abs = os.path.abspath(file_path)
-                exists = os.path.exists(file_path_abs)
-                if not exists:
+                if not self.file_index.link_exists(folder, link):
                     a = self.get_file_link(f, folder)
-                    msg = "{0}: contains invalid link: ({1})".format(a, link)
-                    self.log.warnings.append(msg)
-                    AppSettings.logger.debug(msg)
+                    self.log.warning("{0}: contains invalid link: ({1})".format(a, link))
 
     def get_file_link(self, f, folder):
         # What is this doing and why?
@@ -1,9 +1,12 @@
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 import os
+import re
 import traceback
+from concurrent.futures import Future
 from linters.linter import Linter
+from linters.lint_result_store import get_source_version
 from door43_tools.page_metrics import PageMetrics
-from tx_usfm_tools import verifyUSFM, books
+from tx_usfm_tools import verifyUSFM, parseUsfm, usfm_verses, books
 from app_settings.app_settings import AppSettings
 
 
@@ -18,6 +21,10 @@ SHOULD_ALWAYS_HAVE_TEXT_MARKERS = ( # Put longest markers ahead of shorter ones
                             's1','s2','s3','s4', # Can't use 's' yet coz we have empty s5 fields
                             'zaln-s', 'w',
                             )
+# Matches the first of the above markers that a line starts with (like checking them in turn)
+SHOULD_ALWAYS_HAVE_TEXT_MARKER_RE = re.compile('|'.join(re.escape(marker) for marker in SHOULD_ALWAYS_HAVE_TEXT_MARKERS))
+# Matches each line that sets the chapter or verse or starts with one of the above markers
+MARKER_LINE_RE = re.compile(r'^\\(?=c |v |' + SHOULD_ALWAYS_HAVE_TEXT_MARKER_RE.pattern + ').*', re.M)
 
 
 
@@ -44,7 +51,8 @@ class UsfmLinter(Linter):
         if not valid_lang_code:
             self.log.warning(f"Invalid language code: {lang_code}")
 
-        for root, _dirs, files in os.walk(self.source_dir):
+        usfm_files = []
+        for root, _dirs, files in self.file_index.walk(self.source_dir):
             for filename in sorted(files):
                 if os.path.splitext(filename)[1].lower() != '.usfm':  # only usfm files
                     continue
@@ -52,10 +60,25 @@ class UsfmLinter(Linter):
                 if self.single_file and (filename != self.single_file):
                     continue
 
-                AppSettings.logger.debug(f"Linting {filename} …")
                 file_path = os.path.join(root, filename)
                 sub_path = '.' + file_path[len(self.source_dir):]
-                self.parse_file(file_path, sub_path, filename)
+                try:
+                    with open(file_path, 'rt') as f:
+                        book_text = f.read().lstrip()
+                except Exception:
+                    book_text = None  # parse_file() will warn about it
+                usfm_files.append((file_path, sub_path, filename, self.get_book_ids(filename), book_text))
+
+        # The books are verified at the same time, but their warnings are still logged
+        #   in the same order as if they'd been linted one at a time
+        verifications = self.start_verifying(usfm_files, lang_code)
+        for (file_path, sub_path, filename, book_ids, book_text), verification in zip(usfm_files, verifications):
+            if self.log.is_full():
+                for verification in verifications:
+                    if verification: verification.cancel() # if not started yet
+                break
+            AppSettings.logger.debug(f"Linting {filename} …")
+            self.parse_file(file_path, sub_path, filename, verification, book_ids, book_text)
 
         if not self.found_books:
             self.log.warning("No translations found")
@@ -63,15 +86,50 @@ class UsfmLinter(Linter):
         return True
 
 
-    def parse_file(self, file_path:str, sub_path:str, file_name:str) -> None:
+    def start_verifying(self, usfm_files:List[Tuple[str,str,str,Tuple[str,str],Optional[str]]],
+                                                    lang_code:str) -> List[Optional[Future]]:
+        """
+        Starts verifying each of the (file_path, sub_path, file_name, book_ids, book_text) books
+            in this linter's pool of processes
+            (most of the time linting a Bible goes in parsing each book's USFM)
+
+        Returns a Future for each book's (errors, book_code) from verifyUSFM (already done
+            if the results were stored by an earlier job), or None if the book couldn't be read
+            or has to be verified in this process.
+        """
+        verifications:List[Optional[Future]] = [None] * len(usfm_files)
+        executor = self.get_lint_executor(len(usfm_files))
+        if not executor:
+            return verifications
+        for n, (_file_path, _sub_path, _file_name, (book_code, book_full_name), book_text) in enumerate(usfm_files):
+            if not book_text:
+                continue
+            result_key = self.get_verification_key(book_text, book_full_name, book_code, lang_code)
+            results = self.result_store.get(result_key) if result_key else None
+            if results is None:
+                verifications[n] = executor.submit(verifyUSFM.verify_contents_quiet,
+                                                   book_text, book_full_name, book_code, lang_code)
+            else:
+                verifications[n] = Future()
+                verifications[n].set_result(results)
+        return verifications
+    # end of start_verifying function
+
 
-        book_code, book_full_name = self.get_book_ids(file_name)
+    def parse_file(self, file_path:str, sub_path:str, file_name:str,
+                                        verification:Optional[Future]=None,
+                                        book_ids:Optional[Tuple[str,str]]=None, book_text:Optional[str]=None) -> None:
+        """
+        book_ids (from get_book_ids) and book_text are only worked out here if they're not given
+        """
+        book_code, book_full_name = book_ids or self.get_book_ids(file_name)
 
         try:
-            f = open(file_path, 'rt')
-            book_text = f.read().lstrip()
+            if book_text is None:
+                with open(file_path, 'rt') as f:
+                    book_text = f.read().lstrip()
             if book_text:
-                self.parse_usfm_text(sub_path, file_name, book_text, book_full_name, book_code)
+                self.parse_usfm_text(sub_path, file_name, book_text, book_full_name, book_code, verification)
             else:
                 self.log.warning(f"USFM book '{file_name}' seems empty")
         except Exception as e:
@@ -125,9 +183,23 @@ class UsfmLinter(Linter):
     # end of get_book_ids function
 
 
+    def get_verification_key(self, book_text:str, book_full_name:str, book_code:str, lang_code:str) -> Optional[str]:
+        """
+        Returns the key for the stored verifyUSFM results for the book, or None if results aren't being stored
+        """
+        if not self.result_store:
+            return None
+        return self.result_store.make_key(self.__class__.__name__,
+                                          get_source_version(verifyUSFM, parseUsfm, usfm_verses), book_text,
+                                          (book_full_name, book_code, lang_code))
+
+
     def parse_usfm_text(self, sub_path:str, file_name:str,
-                                book_text:str, book_full_name:str, book_code:str) -> None:
+                                book_text:str, book_full_name:str, book_code:str,
+                                verification:Optional[Future]=None) -> None:
         """
+        If verification is given, it's the Future for verifyUSFM's results for this book,
+            otherwise the book is verified here.
         """
         if not book_text:
             self.log.warning(f"{book_code} - No USFM text found")
@@ -135,7 +207,16 @@ class UsfmLinter(Linter):
 
         try:
             lang_code = self.rc.resource.language.identifier
-            errors, book_code = verifyUSFM.verify_contents_quiet(book_text, book_full_name, book_code, lang_code)
+            result_key = self.get_verification_key(book_text, book_full_name, book_code, lang_code)
+            if verification is None:
+                results = self.result_store.get(result_key) if result_key else None
+                if results is None:
+                    results = verifyUSFM.verify_contents_quiet(book_text, book_full_name, book_code, lang_code)
+            else:
+                results = verification.result()
+            if result_key:
+                self.result_store.put(result_key, results)
+            errors, book_code = results
 
             # if found_book_code:
             #     book_code = found_book_code
@@ -156,19 +237,19 @@ class UsfmLinter(Linter):
         # RJH added checks for USFM lines without content (Dec 2019)
         # TODO: Ideally this should go in
         C = V = '0'
-        for line in book_text.split('\n'):
-            if line.startswith('\\'):
-                if line.startswith('\\c '): C, V = line[3:], '0'
-                elif line.startswith('\\v '):
-                    ixSpace = line.find(' ', 3) # Find the end of the verse number
-                    V = '?' if ixSpace==-1 else line[3:ixSpace]
-                for marker in SHOULD_ALWAYS_HAVE_TEXT_MARKERS:
-                    if line.startswith(f'\\{marker}'):
-                        if len(line) <= len(marker) + 1: # 1 for backslash
-                            self.log.warning(f"{book_code} {C}:{V} '{line}' line has no content")
-                        elif len(line) < len(marker) + 5: # 1 for backslash and space + 3
-                            # Shortest line is '\h Job', '\usfm 3.0'
-                            self.log.warning(f"{book_code} {C}:{V} '{line}' line seems too short")
-                        break
+        for line_match in MARKER_LINE_RE.finditer(book_text): # Only the lines we need to look at
+            line = line_match.group()
+            if line.startswith('\\c '): C, V = line[3:], '0'
+            elif line.startswith('\\v '):
+                ixSpace = line.find(' ', 3) # Find the end of the verse number
+                V = '?' if ixSpace==-1 else line[3:ixSpace]
+            marker_match = SHOULD_ALWAYS_HAVE_TEXT_MARKER_RE.match(line, 1) # after the backslash
+            if marker_match:
+                marker_end = marker_match.end()
+                if len(line) <= marker_end:
+                    self.log.warning(f"{book_code} {C}:{V} '{line}' line has no content")
+                elif len(line) < marker_end + 4: # space + 3
+                    # Shortest line is '\h Job', '\usfm 3.0'
+                    self.log.warning(f"{book_code} {C}:{V} '{line}' line seems too short")
     # end of parse_usfm_text function
 # end of UsfmLinter class
@@ -1,6 +1,8 @@
 # TX RQ Settings
 
-from os import getenv
+from os import getenv, cpu_count
+from os.path import join
+from tempfile import gettempdir
 
 # NOTE: These variable names are defined by the rq package
 
@@ -28,3 +30,15 @@ WORKER_NAME = getenv('WORKER_NAME', 'worker-1')
 
 # Our stuff
 debug_mode_flag = getenv('DEBUG_MODE', 'True').lower() not in ['false', 'f', '', 0]
+# Which intermediate files converters keep for debugging: none, errors or full (defaults to full in debug mode, else none)
+debug_artifacts_level = getenv('DEBUG_ARTIFACTS', '').lower()
+# Where each job's debug artifacts are saved (not in the converter's temp folder, which is removed after the job)
+debug_artifacts_dir = getenv('DEBUG_ARTIFACTS_DIR', join(gettempdir(), 'tX_debug_artifacts'))
+# Which engine the Markdown linter uses: local (a pool of processes here) or lambda (the tx_markdown_linter AWS Lambda)
+#   (dev deployments in debug mode don't call the AWS Lambda unless set)
+markdown_linter_backend = getenv('MARKDOWN_LINTER_BACKEND', 'local' if prefix and debug_mode_flag else 'lambda').lower()
+# Where the linters keep the results for each file, to reuse for unchanged files in later jobs
+#   (e.g., /tmp/tX_lint_results.sqlite, off unless set)
+lint_results_db = getenv('LINT_RESULTS_DB', '')
+# How many processes each linter uses for checking files in parallel (defaults to the number of CPUs)
+lint_workers = int(getenv('LINT_WORKERS', '0')) or cpu_count() or 1
@@ -0,0 +1,41 @@
+import os
+import unittest
+
+from converters.pdf import locales
+from general_tools.file_utils import load_json_object
+
+
+class TestPdfLocales(unittest.TestCase):
+
+    def test_fallback_chain(self):
+        self.assertEqual(locales.get_fallback_chain('es-419'), ['es-419', 'es', 'en'])
+        self.assertEqual(locales.get_fallback_chain('el-x-koine'), ['el-x-koine', 'el-x', 'el', 'en'])
+        self.assertEqual(locales.get_fallback_chain('plt'), ['plt', 'mg', 'en'])
+        self.assertEqual(locales.get_fallback_chain('en'), ['en'])
+
+    def test_locale_language(self):
+        self.assertEqual(locales.get_locale_language('fr'), 'fr')
+        self.assertEqual(locales.get_locale_language('arb'), 'ar')
+        self.assertEqual(locales.get_locale_language('xyz'), 'en')
+
+    def test_missing_keys_fall_back_to_english(self):
+        en_translations = locales.get_translations('en')
+        shu_translations = locales.get_translations('shu')
+        self.assertEqual(set(shu_translations), set(en_translations))
+        self.assertEqual(shu_translations['no_questions_for_this_verse'],
+                         en_translations['no_questions_for_this_verse'])
+        self.assertNotEqual(shu_translations['table_of_contents'], en_translations['table_of_contents'])
+        self.assertIs(locales.get_translations('shu'), shu_translations)
+
+    def test_shipped_bundles_are_valid(self):
+        en_bundle = load_json_object(os.path.join(locales.LOCALE_DIR, 'en.json'))
+        for language_id, bundle in locales.load_locale_bundles().items():
+            errors, _missing = locales.validate_locale_bundle(bundle, en_bundle)
+            self.assertEqual(errors, [], language_id)
+
+    def test_validate_locale_bundle(self):
+        en_bundle = {'source': 'en', 'target': 'en', 'translations': {'date': 'Date', 'version': 'Version'}}
+        bundle = {'source': 'en', 'translations': {'date': '', 'bogus': 'Bogus'}}
+        errors, missing = locales.validate_locale_bundle(bundle, en_bundle)
+        self.assertEqual(errors, ['Missing `target` field', 'Empty translation for `date`', 'Unknown key `bogus`'])
+        self.assertEqual(missing, ['version'])
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+from pypdf import PdfReader, PdfWriter
+
+from converters.pdf.pdf_sections import get_pdf_sections, split_html_element, pack_html_pieces, \
+    get_section_html, get_cross_section_links, join_pdf_files
+
+Page = namedtuple('Page', ['height', 'anchors', 'links'])
+
+
+class TestPdfSections(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test."""
+        self.temp_dir = tempfile.mkdtemp(prefix='tX_test_pdf_sections_')
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pack_html_pieces(self):
+        self.assertEqual(pack_html_pieces(['aaa', 'bbb', 'cc', 'dddddddd', 'e'], 6), ['aaa\nbbb', 'cc', 'dddddddd', 'e'])
+        self.assertEqual(pack_html_pieces([], 6), [])
+
+    def test_split_html_element(self):
+        soup = BeautifulSoup('<div id="book" class="bible book"><p>one</p><p>two</p><p>three</p></div>', 'html.parser')
+        self.assertEqual(split_html_element(soup, soup.div, 1000), [str(soup.div)])
+        pieces = split_html_element(soup, soup.div, 30)
+        self.assertEqual(pieces, ['<div class="bible book" id="book"><p>one</p>\n<p>two</p></div>',
+                                  '<div class="bible book"><p>three</p></div>'])
+
+    def test_get_pdf_sections(self):
+        soup = BeautifulSoup('''<html><body>
+<div class="cover"><h2 class="header-right">Cover</h2></div>
+<div id="contents"><ul><li><a href="#ch-1">1</a></li></ul></div>
+<div><h1 class="section-header">Titus</h1><p id="ch-1">chapter 1</p></div>
+<div><p>chapter 2</p></div>
+</body></html>''', 'html.parser')
+        front_matter_html, sections = get_pdf_sections(soup, 80)
+        self.assertIn('id="contents"', front_matter_html())
+        self.assertNotIn('Titus', front_matter_html())
+        soup.find(id='contents').a['data-page'] = '3'
+        self.assertIn('data-page="3"', front_matter_html())
+        self.assertEqual(len(sections), 2)
+        self.assertTrue(sections[0].startswith('<span class="hidden" style=\'string-set: header-left "", '
+                                               'header-right "Cover"\'></span>'))
+        self.assertIn('id="ch-1"', sections[0])
+        self.assertIn('string-set: header-left "Titus", header-right "Cover"', sections[1])
+        self.assertIn('chapter 2', sections[1])
+
+    def test_get_section_html(self):
+        soup = BeautifulSoup('<html lang="en" data-title=\'Say "hi" &amp; &lt;bye&gt;\'><head><title>T</title></head>'
+                             '<body class="bible book"><p>all</p></body></html>', 'html.parser')
+        html = get_section_html(soup, '<p>part</p>', 'p { color: red; }')
+        self.assertIn('<html data-title=\'Say "hi" &amp; &lt;bye&gt;\' lang="en">', html)
+        self.assertIn('<head><title>T</title>\n<style>p { color: red; }</style>\n</head>', html)
+        self.assertIn('<body class="bible book">\n<p>part</p>\n</body>', html)
+
+    def test_join_pdf_files(self):
+        pdf_files = []
+        for section_idx, page_count in enumerate([1, 2]):
+            writer = PdfWriter()
+            for _ in range(page_count):
+                writer.add_blank_page(600, 800)
+            if section_idx:
+                writer.add_named_destination('ch-2', 1)
+            pdf_files.append(os.path.join(self.temp_dir, f'section_{section_idx}.pdf'))
+            with open(pdf_files[-1], 'wb') as out_file:
+                writer.write(out_file)
+        toc_page = Page(height=800, anchors={'contents': (0, 0)}, links=[('internal', 'ch-2', (10, 20, 110, 40), None),
+                                                                         ('internal', 'contents', (0, 0, 5, 5), None)])
+        anchors, links = get_cross_section_links([toc_page], 0)
+        self.assertEqual(anchors, {'contents'})
+        self.assertEqual(links, [(0, 'ch-2', [7.5, 585.0, 82.5, 570.0])])
+        pdf_file = os.path.join(self.temp_dir, 'joined.pdf')
+        join_pdf_files(pdf_files, pdf_file, links)
+        reader = PdfReader(pdf_file)
+        self.assertEqual(len(reader.pages), 3)
+        self.assertEqual(reader.get_destination_page_number(reader.named_destinations['ch-2']), 2)
+        annotation = reader.pages[0]['/Annots'][0].get_object()
+        self.assertEqual(annotation['/Dest'], 'ch-2')
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from converters.pdf.rc_link import ResourceContainerLink, ResourceContainerLinks
+
+
+class TestResourceContainerLinks(unittest.TestCase):
+
+    @staticmethod
+    def make_rcs(count):
+        rcs = ResourceContainerLinks()
+        for i in range(count):
+            rc = ResourceContainerLink(f'rc://en/tw/dict/bible/kt/word{i}', title=f'Word {i}')
+            rcs[rc.rc_link] = rc
+        return rcs
+
+    def test_get_by_article_id(self):
+        rcs = self.make_rcs(10)
+        rc = rcs.get_by_article_id('en-tw-dict-bible-kt-word5')
+        self.assertEqual(rc.rc_link, 'rc://en/tw/dict/bible/kt/word5')
+        self.assertIsNone(rcs.get_by_article_id('en-tw-dict-bible-kt-missing'))
+
+    def test_first_added_wins(self):
+        rcs = ResourceContainerLinks()
+        first = ResourceContainerLink('rc://en/ta/man/translate/figs-idiom', article_id='same')
+        second = ResourceContainerLink('rc://en/ta/man/translate/figs-irony', article_id='same')
+        rcs[first.rc_link] = first
+        rcs[second.rc_link] = second
+        self.assertIs(rcs.get_by_article_id('same'), first)
+        del rcs[first.rc_link]
+        self.assertIs(rcs.get_by_article_id('same'), second)
+
+    def test_copy_from_merged_dicts(self):
+        rcs = self.make_rcs(3)
+        appendix_rcs = ResourceContainerLinks()
+        rc = ResourceContainerLink('rc://en/ta/man/translate/figs-idiom', linking_level=1)
+        appendix_rcs[rc.rc_link] = rc
+        all_rcs = ResourceContainerLinks({**rcs, **appendix_rcs})
+        self.assertEqual(len(all_rcs), 4)
+        self.assertIs(all_rcs.get_by_article_id('en-ta-man-translate-figs-idiom'), rc)
+
+    def test_changed_rc_link_is_reindexed(self):
+        rcs = ResourceContainerLinks()
+        rc = ResourceContainerLink('rc://en/ta/man/figs-idiom')
+        rcs[rc.rc_link] = rc
+        self.assertIs(rcs.get_by_article_id('en-ta-man-figs-idiom'), rc)
+        # As PdfConverter.get_ta_article_html() does for a bad TA link
+        rc.extra_info = [rc.project]
+        rc.project = 'translate'
+        self.assertIs(rcs.get_by_article_id('en-ta-man-translate-figs-idiom'), rc)
+        self.assertIsNone(rcs.get_by_article_id('en-ta-man-figs-idiom'))
+        rc.set_article_id('changed')
+        self.assertIs(rcs.get_by_article_id('changed'), rc)
+
+    def test_lookups_scale_linearly(self):
+        # Looking up every article of a 5000 article book used to be quadratic (minutes), now it is a dict lookup
+        rcs = self.make_rcs(5000)
+        start = time.time()
+        for i in range(5000):
+            self.assertIsNotNone(rcs.get_by_article_id(f'en-tw-dict-bible-kt-word{i}'))
+        self.assertLess(time.time() - start, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from converters.pdf import verse_objects_index
+from converters.pdf.verse_objects_index import VerseObjectsIndex, INDEX_FILENAME
+from general_tools.file_utils import write_file
+
+
+class TestVerseObjectsIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test."""
+        self.temp_dir = tempfile.mkdtemp(prefix='tX_test_verse_objects_index_')
+        self.bible_path = os.path.join(self.temp_dir, 'en', 'bibles', 'ult')
+        for version in ['v9', 'v10']:
+            book_path = os.path.join(self.bible_path, version, 'tit')
+            for chapter in range(1, 4):
+                write_file(os.path.join(book_path, f'{chapter}.json'), {
+                    str(verse): {'verseObjects': [{'type': 'text', 'text': f'{version} {chapter}:{verse}'}]}
+                    for verse in range(1, 6)
+                })
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get(self):
+        index = VerseObjectsIndex(self.bible_path)
+        self.assertEqual(index.get('tit', '2', '3'), [{'type': 'text', 'text': 'v10 2:3'}])
+        self.assertEqual(index.get('tit', 3, 5), [{'type': 'text', 'text': 'v10 3:5'}])
+        self.assertEqual(index.get('tit', '2', '30'), [])
+        self.assertEqual(index.get('phm', '1', '1'), [])
+
+    def test_book_is_read_once(self):
+        index = VerseObjectsIndex(self.bible_path)
+        with mock.patch.object(verse_objects_index, 'load_json_object',
+                               wraps=verse_objects_index.load_json_object) as load_json_object:
+            for chapter in range(1, 4):
+                for verse in range(1, 6):
+                    index.get('tit', chapter, verse)
+        self.assertEqual(load_json_object.call_count, 3)
+
+    def test_pickled_index_is_reused(self):
+        VerseObjectsIndex(self.bible_path).get('tit', '1', '1')
+        self.assertEqual(sorted(os.listdir(os.path.join(self.bible_path, 'v10', 'tit'))),
+                         ['1.json', '2.json', '3.json', INDEX_FILENAME]) # No temp file left behind
+        index = VerseObjectsIndex(self.bible_path)
+        with mock.patch.object(verse_objects_index, 'load_json_object') as load_json_object:
+            self.assertEqual(index.get('tit', '1', '4'), [{'type': 'text', 'text': 'v10 1:4'}])
+        load_json_object.assert_not_called()
+
+    def test_no_versions(self):
+        index = VerseObjectsIndex(os.path.join(self.temp_dir, 'en', 'bibles', 'ust'))
+        self.assertIsNone(index.bible_version_path)
+        self.assertEqual(index.get('tit', '1', '1'), [])
@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+from general_tools import alignment_tools
+
+
+def milestone(content, children, occurrence=1):
+    return {'type': 'milestone', 'tag': 'zaln', 'content': content, 'occurrence': occurrence, 'children': children}
+
+
+def word(text, occurrence=1):
+    return {'type': 'word', 'tag': 'w', 'text': text, 'occurrence': occurrence}
+
+
+class AlignmentToolsTests(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test."""
+        alignment_tools.clear_alignment_cache()
+        # "Paul, a servant of God and an apostle" aligned to Παῦλος δοῦλος Θεοῦ ἀπόστολος δὲ
+        self.verse_objects = [
+            milestone('Παῦλος', [word('Paul')]),
+            {'type': 'text', 'text': ', '},
+            milestone('δοῦλος', [word('a'), {'type': 'text', 'text': ' '}, word('servant')]),
+            {'type': 'text', 'text': ' '},
+            milestone('Θεοῦ', [word('of'), {'type': 'text', 'text': ' '}, word('God')]),
+            {'type': 'text', 'text': ' '},
+            milestone('δὲ', [word('and')]),
+            {'type': 'text', 'text': ' '},
+            milestone('ἀπόστολος', [word('an'), {'type': 'text', 'text': ' '}, word('apostle')]),
+        ]
+
+    def test_get_alignment(self):
+        alignment = alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ')
+        self.assertEqual(alignment_tools.flatten_alignment(alignment), 'a servant of God')
+
+    def test_get_alignment_with_ellipsis(self):
+        alignment = alignment_tools.get_alignment(self.verse_objects, 'Παῦλος…ἀπόστολος')
+        self.assertEqual(alignment_tools.flatten_alignment(alignment), 'Paul…an apostle')
+
+    def test_get_alignment_not_found(self):
+        self.assertIsNone(alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Χριστοῦ'))
+        self.assertIsNone(alignment_tools.get_alignment(self.verse_objects, 'Θεοῦ', 2))
+
+    def test_get_alignment_of_quote_list(self):
+        quote = [{'word': 'Θεοῦ', 'occurrence': 1}, {'word': '…'}, {'word': 'ἀπόστολος', 'occurrence': 1}]
+        alignment = alignment_tools.get_alignment(self.verse_objects, quote)
+        self.assertEqual(alignment_tools.flatten_alignment(alignment), 'of God…an apostle')
+
+    def test_get_alignment_is_memoized_by_verse_ref(self):
+        verse_ref = ('ult/v1', 'tit', '1', '1')
+        first = alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ', verse_ref=verse_ref)
+        with mock.patch.object(alignment_tools, 'get_milestone_index') as get_milestone_index:
+            second = alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ', verse_ref=verse_ref)
+            get_milestone_index.assert_not_called()
+        self.assertEqual(first, second)
+        second[0][0]['word'] = 'changed'
+        self.assertEqual(alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ', verse_ref=verse_ref), first)
+
+    def test_alignment_cache_stats(self):
+        verse_ref = ('ult/v1', 'tit', '1', '1')
+        alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ') # Not cached without a verse_ref
+        for _n in range(3):
+            alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ', verse_ref=verse_ref)
+        alignment_tools.get_alignment(self.verse_objects, 'δοῦλος Θεοῦ', 2, verse_ref=verse_ref)
+        self.assertEqual(alignment_tools.get_alignment_cache_stats(), {'hits': 2, 'misses': 2})
+        alignment_tools.clear_alignment_cache()
+        self.assertEqual(alignment_tools.get_alignment_cache_stats(), {'hits': 0, 'misses': 0})
@@ -0,0 +1,54 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from general_tools.debug_artifacts import DebugArtifacts, DEBUG_ARTIFACTS_NONE, DEBUG_ARTIFACTS_ERRORS, \
+    DEBUG_ARTIFACTS_FULL
+
+
+class DebugArtifactsTests(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test."""
+        self.tmp_dir = tempfile.mkdtemp(prefix='tX_test_debug_artifacts_')
+        self.artifacts_dir = os.path.join(self.tmp_dir, 'DebugArtifacts')
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_none_writes_nothing(self):
+        artifacts = DebugArtifacts(self.artifacts_dir, DEBUG_ARTIFACTS_NONE)
+        self.assertIsNone(artifacts.save('body.html', '<p>body</p>'))
+        self.assertIsNone(artifacts.save('failed.html', '<p>body</p>', DEBUG_ARTIFACTS_ERRORS))
+        artifacts.close()
+        self.assertFalse(os.path.exists(self.artifacts_dir))
+
+    def test_errors_level(self):
+        artifacts = DebugArtifacts(self.artifacts_dir, DEBUG_ARTIFACTS_ERRORS)
+        self.assertIsNone(artifacts.save('body.html', '<p>body</p>'))
+        filepath = artifacts.save('failed.html', '<p>failed</p>', DEBUG_ARTIFACTS_ERRORS)
+        artifacts.close()
+        self.assertEqual(os.listdir(self.artifacts_dir), ['failed.html.gz'])
+        with gzip.open(filepath, 'rt', encoding='utf-8') as artifact_file:
+            self.assertEqual(artifact_file.read(), '<p>failed</p>')
+
+    def test_full_level(self):
+        artifacts = DebugArtifacts(self.artifacts_dir, DEBUG_ARTIFACTS_FULL)
+        body_filepath = artifacts.save('body.html', '<p>bódy</p>')
+        artifacts.save('failed.html', '<p>failed</p>', DEBUG_ARTIFACTS_ERRORS)
+        artifacts.close()
+        self.assertEqual(sorted(os.listdir(self.artifacts_dir)), ['body.html.gz', 'failed.html.gz'])
+        with gzip.open(body_filepath, 'rt', encoding='utf-8') as artifact_file:
+            self.assertEqual(artifact_file.read(), '<p>bódy</p>')
+
+    def test_unknown_level(self):
+        artifacts = DebugArtifacts(self.artifacts_dir, 'everything')
+        self.assertEqual(artifacts.level, DEBUG_ARTIFACTS_NONE)
+        self.assertFalse(artifacts.wants(DEBUG_ARTIFACTS_ERRORS))
+
+
+if __name__ == '__main__':
+    unittest.main()
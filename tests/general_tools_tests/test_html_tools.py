@@ -0,0 +1,89 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from general_tools import html_tools
+from general_tools.alignment_tools import split_string_into_alignment
+
+
+class HtmlToolsTests(unittest.TestCase):
+
+    def test_mark_phrases_in_html(self):
+        html = '<span class="v-num">1</span>In the beginning, God created the heavens and the earth.'
+        marked = html_tools.mark_phrases_in_html(html, split_string_into_alignment('God created'))
+        self.assertEqual(marked, '<span class="v-num">1</span>In the beginning, '
+                                 '<span class="highlight">God created</span> the heavens and the earth.')
+
+    def test_mark_phrases_in_html_not_found(self):
+        html = 'In the beginning, God created the heavens and the earth.'
+        self.assertIsNone(html_tools.mark_phrases_in_html(html, split_string_into_alignment('God made')))
+        self.assertIsNone(html_tools.mark_phrases_in_html(html, split_string_into_alignment('the', 4)))
+        # Only whole words are marked
+        self.assertIsNone(html_tools.mark_phrases_in_html(html, split_string_into_alignment('heaven')))
+
+    def test_mark_phrases_in_html_with_occurrence_and_parts(self):
+        html = 'the heavens and the earth'
+        marked = html_tools.mark_phrases_in_html(html, split_string_into_alignment('the earth', 2), tag='<b>')
+        self.assertEqual(marked, 'the heavens and <b>the earth</b>')
+        marked = html_tools.mark_phrases_in_html(html, split_string_into_alignment('heavens…earth'), tag='<b>')
+        self.assertEqual(marked, 'the <b>heavens</b> and the <b>earth</b>')
+
+    def test_phrase_highlighter_across_tags_and_entities(self):
+        html = 'Tom &amp; <i>Jerry ran</i> far'
+        highlighter = html_tools.PhraseHighlighter(html)
+        self.assertTrue(highlighter.mark(split_string_into_alignment('Tom & Jerry'), tag='<span class="a">'))
+        self.assertTrue(highlighter.mark(split_string_into_alignment('Jerry ran far'), tag='<span class="b">'))
+        self.assertFalse(highlighter.mark(split_string_into_alignment('Jerry walked'), tag='<span class="c">'))
+        self.assertEqual(highlighter.get_html(),
+                         '<span class="a">Tom &amp; </span>'
+                         '<i><span class="a"><span class="b">Jerry</span></span><span class="b"> ran</span></i>'
+                         '<span class="b"> far</span>')
+
+    def test_find_quote_variation_in_text(self):
+        text = 'He said, “Let there be light!”'
+        self.assertEqual(html_tools.find_quote_variation_in_text(text, '"Let there be light!"'),
+                         '“Let there be light!”')
+        self.assertIsNone(html_tools.find_quote_variation_in_text(text, '"Let there be darkness!"'))
+
+
+class HeaderToolsTests(unittest.TestCase):
+    # Outputs of the BeautifulSoup implementations these replaced
+    TW_ARTICLE = '<h1>God</h1>\n<h2>Definition:</h2>\n<p>text</p>\n<h3 class="x">Sub</h3>'
+    NOTES = '<p>intro</p><h4 id="a">A</h4><h5>B</h5><h6>C</h6>'
+
+    def assertSameHtml(self, html, expected):
+        self.assertEqual(str(BeautifulSoup(html, 'html.parser')), expected)
+
+    def test_increment_headers(self):
+        self.assertSameHtml(html_tools.increment_headers(self.TW_ARTICLE, 2),
+                            '<h3>God</h3>\n<h4>Definition:</h4>\n<p>text</p>\n<h5 class="x">Sub</h5>')
+        self.assertSameHtml(html_tools.increment_headers(self.NOTES, 2),
+                            '<p>intro</p><h6 id="a">A</h6><h6>B</h6><h6>C</h6>')
+
+    def test_decrement_headers(self):
+        self.assertSameHtml(html_tools.decrement_headers(self.TW_ARTICLE),
+                            '<h1>God</h1>\n<h1>Definition:</h1>\n<p>text</p>\n<h2 class="x">Sub</h2>')
+        self.assertSameHtml(html_tools.decrement_headers(self.NOTES),
+                            '<p>intro</p><h3 id="a">A</h3><h4>B</h4><h6>C</h6>')
+
+    def test_make_first_header_section_header(self):
+        self.assertSameHtml(html_tools.make_first_header_section_header(self.TW_ARTICLE, level=4, no_toc=True,
+                                                                        header_level=3),
+                            '<h4 class="section-header no-toc" header-level="3">God</h4>\n<h2>Definition:</h2>\n'
+                            '<p>text</p>\n<h3 class="x">Sub</h3>')
+        self.assertSameHtml(html_tools.make_first_header_section_header(self.NOTES, level=4, no_toc=True,
+                                                                        header_level=3),
+                            '<p>intro</p><h4 class="section-header no-toc" header-level="3" id="a">A</h4>'
+                            '<h5>B</h5><h6>C</h6>')
+
+    def test_transform_headers_in_one_pass(self):
+        html = html_tools.transform_headers(self.NOTES, html_tools.first_header_section_header_step(),
+                                            html_tools.increment_headers_step(1))
+        self.assertSameHtml(html, '<p>intro</p><h5 class="section-header" id="a">A</h5><h6>B</h6><h6>C</h6>')
+        self.assertEqual(html, html_tools.increment_headers(html_tools.make_first_header_section_header(self.NOTES)))
+
+    def test_header_tags_are_matched_like_the_parser(self):
+        # A header left open is closed by the closing tag of the header around it, and stray closing tags are dropped
+        html = '<h3>Title<h2>Open</h3><!-- <h2> --></h1><p>Text</p>'
+        self.assertSameHtml(html_tools.decrement_headers(html),
+                            '<h2>Title<h1>Open</h1></h2><!-- <h2> --><p>Text</p>')
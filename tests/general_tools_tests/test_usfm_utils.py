@@ -0,0 +1,30 @@
+import unittest
+
+from general_tools import usfm_utils
+
+
+class UsfmUtilsTests(unittest.TestCase):
+
+    def test_unalign_usfm(self):
+        aligned_usfm = '''\\id TIT EN_ULT
+\\c 1
+\\p
+\\v 1 \\zaln-s |x-strong="G39720" x-lemma="Παῦλος" x-occurrence="1" x-occurrences="1" x-content="Παῦλος"\\*\\w Paul|x-occurrence="1" x-occurrences="1"\\w*\\zaln-e\\*,
+\\zaln-s |x-strong="G14010" x-lemma="δοῦλος" x-occurrence="1" x-occurrences="1" x-content="δοῦλος"\\*\\w a|x-occurrence="1" x-occurrences="1"\\w*
+\\w servant|x-occurrence="1" x-occurrences="1"\\w*\\zaln-e\\*
+
+\\ts\\*
+\\zaln-s |x-strong="G23160" x-lemma="θεός" x-occurrence="1" x-occurrences="1" x-content="Θεοῦ"\\*\\w of|x-occurrence="1" x-occurrences="1"\\w*
+\\k-s | x-tw="rc://*/tw/dict/bible/kt/god"\\*\\w God|x-occurrence="1" x-occurrences="1"\\w*\\k-e\\*\\zaln-e\\*
+\\v 2 \\w "He|x-occurrence="1" x-occurrences="1"\\w* \\w said|x-occurrence="1" x-occurrences="1"\\w* ( \\w yes|x-occurrence="1" x-occurrences="1"\\w* ) .
+'''
+        self.assertEqual(usfm_utils.unalign_usfm(aligned_usfm),
+                         '\\id TIT EN_ULT\n\\c 1\n\\p\n\\v 1 Paul, a servant of God\n\\v 2 "He said (yes).')
+
+    def test_unalign_usfm_unaligned(self):
+        usfm = '\\c 1\n\\s5\n\\p\n\\v 1 Hello\nworld ,  he said .\n\n\\v 2 "Good" \\fqa bye\\fqa'
+        self.assertEqual(usfm_utils.unalign_usfm(usfm),
+                         '\\c 1\n\n\\p\n\\v 1 Hello world, he said.\n\\v 2 "Good" \\fqa bye\\fqa*')
+
+    def test_join_usfm_lines(self):
+        self.assertEqual(usfm_utils.join_usfm_lines('\n\\v 1 a\nb\n\nc\n\\v 2 d\n'), '\\v 1 a b c\n\\v 2 d\n')
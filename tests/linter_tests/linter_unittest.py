@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 from door43_tools.td_language import TdLanguage
 
 
@@ -17,5 +18,7 @@ class LinterTestCase(unittest.TestCase):
         }
 
 
-        super(LinterTestCase, self).run(result)
+        # Tests that want a lint results store patch in their own
+        with mock.patch('linters.linter.lint_results_db', ''):
+            super(LinterTestCase, self).run(result)
 
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import shutil
+import unittest
+from unittest import mock
+
+from general_tools.file_utils import write_file
+from linters.file_index import FileIndex
+from linters.tq_linter import TqLinter
+
+
+class TestFileIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test."""
+        self.temp_dir = tempfile.mkdtemp(prefix='tX_test_file_index_')
+        self.source_dir = os.path.join(self.temp_dir, 'en_tq')
+        for book in ('gen', 'exo', 'tit'):
+            for chapter in ('01', '02'):
+                write_file(os.path.join(self.source_dir, book, chapter, '01.md'), '# Question?\n\nAnswer.\n')
+        write_file(os.path.join(self.source_dir, 'README.MD'), '# en_tq\n')
+        os.symlink(os.path.join(self.source_dir, 'gen'), os.path.join(self.source_dir, 'genesis'))
+        os.symlink(os.path.join(self.source_dir, 'missing.md'), os.path.join(self.source_dir, 'broken.md'))
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_walk_matches_os_walk(self):
+        file_index = FileIndex(self.source_dir)
+        for top in (self.source_dir, os.path.join(self.source_dir, 'gen'), os.path.join(self.source_dir, 'nowhere')):
+            for topdown in (True, False):
+                self.assertEqual(list(file_index.walk(top, topdown=topdown)), list(os.walk(top, topdown=topdown)))
+
+    def test_lookups_match_the_disk(self):
+        file_index = FileIndex(self.source_dir + os.sep)
+        for path in ('', 'gen', 'gen/01', 'gen/01/01.md', 'gen/01/../02/01.md', 'genesis', 'genesis/01/01.md',
+                     'broken.md', 'README.MD', 'nowhere', '../en_tq/tit', '..'):
+            path = os.path.join(self.source_dir, path)
+            self.assertEqual(file_index.exists(path), os.path.exists(path), path)
+            self.assertEqual(file_index.isfile(path), os.path.isfile(path), path)
+            self.assertEqual(file_index.isdir(path), os.path.isdir(path), path)
+        self.assertEqual(sorted(file_index.listdir(self.source_dir)), sorted(os.listdir(self.source_dir)))
+        self.assertRaises(FileNotFoundError, file_index.listdir, os.path.join(self.source_dir, 'nowhere'))
+
+    def test_link_exists_is_remembered(self):
+        file_index = FileIndex(self.source_dir)
+        folder_path = os.path.join(self.source_dir, 'gen', '01')
+        with mock.patch.object(file_index, 'exists', wraps=file_index.exists) as mock_exists:
+            for _n in range(3):
+                self.assertTrue(file_index.link_exists(folder_path, '../02/01.md'))
+                self.assertTrue(file_index.link_exists(folder_path, '../../tit/01/01.md'))
+                self.assertFalse(file_index.link_exists(folder_path, '../03/01.md'))
+        self.assertEqual(mock_exists.call_count, 3)
+
+    def test_extensions_and_stats(self):
+        file_index = FileIndex(self.source_dir)
+        self.assertEqual(len(file_index.get_files('.md')), 7)
+        self.assertEqual(file_index.get_files('.md', os.path.join(self.source_dir, 'tit')),
+                         [os.path.join(self.source_dir, 'tit', '01', '01.md'),
+                          os.path.join(self.source_dir, 'tit', '02', '01.md')])
+        file_path = os.path.join(self.source_dir, 'exo', '02', '01.md')
+        self.assertEqual(file_index.get_stat(file_path), (os.path.getsize(file_path), os.path.getmtime(file_path)))
+        self.assertIsNone(file_index.get_stat(os.path.join(self.source_dir, 'exo')))
+
+    def test_linter_walks_the_tree_once(self):
+        folder_count = sum(1 for _ in os.walk(self.source_dir))
+        linter = TqLinter(repo_subject='Translation_Questions', source_dir=self.source_dir)
+        with mock.patch('os.scandir', wraps=os.scandir) as mock_scandir, \
+                mock.patch('linters.linter.lint_workers', 1):
+            linter.run()
+        # Before the index, each of the 66 books walked the whole tree again
+        self.assertEqual(mock_scandir.call_count, folder_count)
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+from linters.lint_logger import LintLogger
+
+
+class TestLintLogger(unittest.TestCase):
+
+    def test_results_are_reduced(self):
+        log = LintLogger()
+        for n in range(1500):
+            log.warning(f'warning {n}')
+        self.assertEqual(len(log.warnings) + len(log.last_warnings), 1009) # Not all 1,500 of them
+        all_warnings = [f'warning {n}' for n in range(1500)]
+        self.assertEqual(log.get_results(), all_warnings[:990] + ['………………'] + all_warnings[-9:]
+                                                + ['Linter warnings reduced from 1,500 to 1000'])
+
+    def test_results_not_reduced(self):
+        log = LintLogger()
+        for n in range(1000):
+            log.warning(f'warning {n}')
+        self.assertEqual(log.get_results(), [f'warning {n}' for n in range(1000)])
+
+    def test_category_budget(self):
+        log = LintLogger()
+        log.warning('first')
+        for n in range(LintLogger.CATEGORY_BUDGETS['punctuation'] + 5):
+            self.assertEqual(log.is_full('punctuation'), n >= LintLogger.CATEGORY_BUDGETS['punctuation'])
+            log.warning(f'punctuation {n}', 'punctuation')
+        log.warning('last')
+        self.assertFalse(log.is_full())
+        results = log.get_results()
+        self.assertEqual(results[0], 'first')
+        # The punctuation warnings were still logged after is_full('punctuation') said not to look for them
+        self.assertEqual(results[-2:], ['last', "Another 5 'punctuation' warnings weren't listed (and no more were looked for)"])
+
+    def test_warning_budget(self):
+        log = LintLogger()
+        with mock.patch.object(LintLogger, 'WARNING_BUDGET', 20):
+            for n in range(20):
+                self.assertFalse(log.is_full())
+                log.warning(f'warning {n}')
+            self.assertTrue(log.is_full())
+            self.assertEqual(log.get_results()[-1], 'Linting stopped early after 20 warnings')
+
+    def test_add_warnings_from(self):
+        log, other_log = LintLogger(), LintLogger(max_warnings=None)
+        log.warning('first')
+        for n in range(1200):
+            other_log.warning(f'other {n}')
+        other_log.suppressed_counts['punctuation'] = 3
+        self.assertEqual(len(other_log.warnings), 1200)
+        log.add_warnings_from(other_log)
+        self.assertEqual(log.warning_count, 1201)
+        self.assertEqual(log.get_results()[:2], ['first', 'other 0'])
+        self.assertEqual(log.get_results()[-3:], ['other 1199', 'Linter warnings reduced from 1,201 to 1000',
+                                                  "Another 3 'punctuation' warnings weren't listed"])
+
+    def test_add_warnings_from_applies_category_budgets(self):
+        log = LintLogger()
+        for worker in range(2):
+            other_log = LintLogger(max_warnings=None)
+            for n in range(400):
+                other_log.warning(f'punctuation {worker}-{n}', 'punctuation')
+            log.add_warnings_from(other_log)
+        self.assertEqual(log.warning_count, LintLogger.CATEGORY_BUDGETS['punctuation'])
+        results = log.get_results()
+        self.assertEqual(len(results), 501) # Same as if it had all been logged here
+        self.assertEqual(results[-2:], ['punctuation 1-99', "Another 300 'punctuation' warnings weren't listed"])
+        self.assertTrue(log.is_full('punctuation'))
+
+    def test_unchecked_category(self):
+        log, other_log = LintLogger(), LintLogger(max_warnings=None)
+        for n in range(LintLogger.CATEGORY_BUDGETS['punctuation']):
+            other_log.warning(f'punctuation {n}', 'punctuation')
+        self.assertTrue(other_log.is_full('punctuation')) # so the linter stops looking for them
+        self.assertFalse(other_log.is_full())
+        log.add_warnings_from(other_log)
+        self.assertEqual(log.get_results()[-1], "No more 'punctuation' warnings were looked for after the first 500")
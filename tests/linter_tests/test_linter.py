@@ -1,4 +1,5 @@
 import os
+import multiprocessing
 
 from mock import mock
 from requests import Response
@@ -28,6 +29,18 @@ class MyLinter(Linter):
             super(MyLinter, self).download_archive()
 
 
+class PoolLinter(Linter):
+    def lint(self):
+        executor = self.get_lint_executor(2)
+        self.pids = [future.result() for future in [executor.submit(os.getpid) for _n in range(2)]]
+        return True
+
+
+class PairsLinter(Linter):
+    def lint(self):
+        return True
+
+
 class TestLinter(LinterTestCase):
 
     resources_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'resources')
@@ -35,6 +48,53 @@ class TestLinter(LinterTestCase):
     def test_instantiate_abstract_class(self):
         self.assertRaises(TypeError, Linter, None)
 
+    def test_check_punctuation_pairs(self):
+        linter = PairsLinter(repo_subject='Unknown', source_dir=self.resources_dir)
+        linter.close()
+        linter.check_punctuation_pairs('Plain text with no pairs', 'plain')
+        linter.check_punctuation_pairs('See [this (and {that})](link) **_word_**', 'nested')
+        linter.check_punctuation_pairs('Points:\n 1) one\n 2) two', 'points', allow_close_parenthesis_points=True)
+        self.assertEqual(linter.log.warnings, [])
+        linter.check_punctuation_pairs('A (note [here) and\nthere] and **bold', 'ref')
+        self.assertEqual(linter.log.warnings, [
+            "ref line 1: Possible nesting error—found unexpected ')' after recent '[' near A (note [here) and",
+            "ref: Seem to have the following unclosed field(s): '('",
+            "ref: Seem to have have mismatched '**' pairs in 'A (note [here) and\nthere] and **bold'",
+            ])
+
+    def test_check_punctuation_pairs_stops_when_budget_used(self):
+        linter = PairsLinter(repo_subject='Unknown', source_dir=self.resources_dir)
+        linter.close()
+        with mock.patch.dict(linter.log.CATEGORY_BUDGETS, {'punctuation': 2}):
+            for n in range(5):
+                linter.check_punctuation_pairs(f'Note {n} (unclosed', f'ref{n}')
+            self.assertEqual(len(linter.log.warnings), 2)
+            self.assertEqual(linter.log.category_counts['punctuation'], 2) # The others weren't looked at
+            self.assertEqual(linter.log.get_results()[-1],
+                             "No more 'punctuation' warnings were looked for after the first 2")
+
+    def test_lint_executor(self):
+        linter = PoolLinter(repo_subject='Unknown', source_dir=self.resources_dir)
+        with mock.patch('linters.linter.lint_workers', 1):
+            self.assertIsNone(linter.get_lint_executor(10))
+        with mock.patch('linters.linter.lint_workers', 2):
+            self.assertIsNone(linter.get_lint_executor(1))
+            executor = linter.get_lint_executor(10)
+            self.assertIsNotNone(executor)
+            self.assertIs(linter.get_lint_executor(3), executor)
+            linter.close()
+            self.assertIsNone(linter.lint_executor)
+
+    def test_no_lint_processes_left_after_run(self):
+        linter = PoolLinter(repo_subject='Unknown', source_dir=self.resources_dir)
+        with mock.patch('linters.linter.lint_workers', 2):
+            results = linter.run()
+        linter.close()
+        self.assertTrue(results['success'])
+        self.assertNotIn(os.getpid(), linter.pids) # They really were run in other processes
+        self.assertIsNone(linter.lint_executor)
+        self.assertEqual(multiprocessing.active_children(), [])
+
     # Removed coz of extra parameters Nov 2019 RJH
     # def test_run(self):
     #     linter = MyLinter(repo_subject='Unknown', source_file=os.path.join(self.resources_dir, 'linter', 'files.zip'))
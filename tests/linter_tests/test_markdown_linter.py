@@ -3,7 +3,7 @@ import tempfile
 import shutil
 import mock
 from tests.linter_tests.linter_unittest import LinterTestCase
-from linters.markdown_linter import MarkdownLinter
+from linters.markdown_linter import MarkdownLinter, lint_markdown_string
 
 
 class TestMarkdownLinter(LinterTestCase):
@@ -89,3 +89,64 @@ class TestMarkdownLinter(LinterTestCase):
         ml = MarkdownLinter(repo_subject='Unknown', source_dir=None)
         text = ml.strip_tags('<a href="test"><u>remove my tags')
         self.assertEqual(text, 'remove my tags')
+
+    def write_markdown_files(self):
+        for n in range(1, 6):
+            with open(os.path.join(self.temp_dir, f'{n:02}.md'), 'wt') as md_file:
+                md_file.write(f'# Article {n}\n\n' + ('### Skipped a level (see\n' if n % 2 else '## Section\n'))
+
+    @mock.patch('linters.markdown_linter.markdown_linter_backend', 'local')
+    def test_lint_locally(self):
+        self.write_markdown_files()
+        linter = MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir)
+        with mock.patch('linters.markdown_linter.MarkdownLinter.invoke_markdown_linter') as mock_invoke, \
+                mock.patch('linters.linter.lint_workers', 1):
+            linter.run()
+        mock_invoke.assert_not_called()
+        self.assertEqual(linter.log.warnings[6:], ["01: Headers don't increment", "03: Headers don't increment",
+                                                   "05: Headers don't increment"])
+        # Linting in a pool of processes gives the same warnings in the same order
+        parallel_linter = MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir)
+        with mock.patch('linters.linter.lint_workers', 2):
+            parallel_linter.run()
+        self.assertEqual(parallel_linter.log.warnings, linter.log.warnings)
+
+    @mock.patch('linters.markdown_linter.markdown_linter_backend', 'local')
+    def test_lint_only_changed_files(self):
+        self.write_markdown_files()
+        lint_results_db = os.path.join(self.temp_dir, 'lint_results.sqlite')
+        with mock.patch('linters.linter.lint_results_db', lint_results_db), \
+                mock.patch('linters.linter.lint_workers', 1), \
+                mock.patch('linters.markdown_linter.lint_markdown_string', wraps=lint_markdown_string) as mock_lint:
+            linter = MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir)
+            linter.run()
+            self.assertEqual(mock_lint.call_count, 5)
+            with open(os.path.join(self.temp_dir, '02.md'), 'at') as md_file:
+                md_file.write('#### Skipped another level\n')
+            relinter = MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir)
+            relinter.run()
+            self.assertEqual(mock_lint.call_count, 6)
+        self.assertEqual(relinter.log.warnings, linter.log.warnings[:7] + ["02: Headers don't increment"]
+                                                + linter.log.warnings[7:])
+
+    @mock.patch('linters.markdown_linter.markdown_linter_backend', 'local')
+    def test_stored_results_not_reused_after_rules_change(self):
+        self.write_markdown_files()
+        lint_results_db = os.path.join(self.temp_dir, 'lint_results.sqlite')
+        with mock.patch('linters.linter.lint_results_db', lint_results_db), \
+                mock.patch('linters.linter.lint_workers', 1), \
+                mock.patch('linters.markdown_linter.lint_markdown_string', wraps=lint_markdown_string) as mock_lint:
+            MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir).run()
+            with mock.patch('linters.markdown_linter.get_source_version', return_value='changed rules'):
+                MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir).run()
+        self.assertEqual(mock_lint.call_count, 10)
+
+    @mock.patch('linters.markdown_linter.markdown_linter_backend', 'lambda')
+    @mock.patch('linters.markdown_linter.MarkdownLinter.invoke_markdown_linter')
+    def test_lint_remotely(self, mock_invoke):
+        self.write_markdown_files()
+        mock_invoke.return_value = {}
+        linter = MarkdownLinter(repo_subject='Translation_Academy', source_dir=self.temp_dir)
+        linter.run()
+        self.assertEqual(len(mock_invoke.call_args[0][0]['options']['strings']), 5)
+        self.assertEqual(len(linter.log.warnings), 6) # Only the punctuation checks
@@ -3,7 +3,7 @@ import tempfile
 import shutil
 import mock
 from tests.linter_tests.linter_unittest import LinterTestCase
-from general_tools.file_utils import unzip
+from general_tools.file_utils import read_file, unzip
 from linters.obs_linter import ObsLinter
 
 
@@ -120,6 +120,17 @@ class TestObsLinter(LinterTestCase):
         linter = self.run_linter()
         self.verify_results(expected_warnings, linter)
 
+    @mock.patch('linters.markdown_linter.markdown_linter_backend', 'local')
+    def test_chapters_read_once(self):
+        with mock.patch('linters.markdown_linter.read_file', wraps=read_file) as mock_read_file, \
+                mock.patch('linters.obs_linter.read_file', wraps=read_file) as mock_obs_read_file, \
+                mock.patch('linters.linter.lint_workers', 1):
+            linter = self.run_linter()
+        read_file_paths = [call[0][0] for call in mock_read_file.call_args_list + mock_obs_read_file.call_args_list]
+        self.assertEqual(len(read_file_paths), len(set(read_file_paths)))
+        self.assertIn(os.path.join(self.repo_dir, 'content', '01.md'), read_file_paths)
+        self.assertEqual(linter.log.warnings, [])
+
     def run_linter(self):
         linter = ObsLinter(repo_subject='Open_Bible_Stories', source_dir=self.repo_dir)
         linter.run()
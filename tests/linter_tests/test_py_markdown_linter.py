@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from linters.py_markdown_linter import rules
+from linters.py_markdown_linter.config import LintConfig
+from linters.py_markdown_linter.lint import MarkdownLinter
+
+
+class TestPyMarkdownLinter(unittest.TestCase):
+
+    def lint(self, markdown_string, disabled=(), enabled=()):
+        config = LintConfig()
+        for rule_id in enabled:
+            config.enable_rule_by_id(rule_id)
+        for rule_id in disabled:
+            config.disable_rule_by_id(rule_id)
+        return [(violation.rule_id, violation.line_nr) for violation in MarkdownLinter(config).lint(markdown_string)]
+
+    def test_line_rules(self):
+        markdown_string = '# Title\n\nText \nA\ttab \n' + 'x' * 81 + '\n'
+        self.assertEqual(self.lint(markdown_string),
+                         [('MD009', 3), ('MD009', 4), ('MD010', 4), ('MD013', 5)])
+
+    def test_line_rules_disabled_by_comment(self):
+        markdown_string = 'Text \n<!-- markdownlint:disable -->\nA\ttab\n<!-- markdownlint:enable -->\nMore \n'
+        self.assertEqual(self.lint(markdown_string), [('MD009', 1), ('MD009', 4)])
+
+    def test_only_candidate_lines_are_validated(self):
+        markdown_string = '# Title\n\nSome text\nMore text\t\n'
+        with mock.patch.object(rules.HardTab, 'validate', autospec=True, return_value=None) as validate:
+            self.lint(markdown_string)
+        self.assertEqual([call[0][1] for call in validate.call_args_list], ['More text\t'])
+
+    def test_file_rules(self):
+        markdown_string = '## Title\n\n#### Sub-heading\n'
+        self.assertEqual(self.lint(markdown_string), []) # Not on by default
+        self.assertEqual(self.lint(markdown_string, disabled=('MD009', 'MD010', 'MD013'), enabled=('MD001', 'MD002')),
+                         [('MD001', None), ('MD002', None)])
+        self.assertEqual(self.lint('# Title\n\n## Sub-heading\n', enabled=('MD001', 'MD002')), [])
+
+    def test_markdown_is_converted_once_for_all_file_rules(self):
+        with mock.patch.object(rules.FileRule, 'md_to_tree', wraps=rules.FileRule.md_to_tree) as md_to_tree:
+            self.lint('# Title\n\n### Sub-heading\n', enabled=('MD001', 'MD002'))
+        md_to_tree.assert_called_once()
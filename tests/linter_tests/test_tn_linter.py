@@ -230,6 +230,39 @@ class TestTnTsvLinter(LinterTestCase):
     #     self.verify_results_warnings_count(expected_warnings, linter)
 
 
+    def test_tsv_rows_checked_in_parallel(self):
+        header = TnTsvLinter.EXPECTED_HEADER
+        write_file(os.path.join(self.temp_dir, 'en_tn_57-TIT.tsv'), '\n'.join((header,
+            'TIT\tfront\tintro\t\t# Introduction to Titus<br>### Outline',
+            'TIT\t1\t1\t\u03c0\u03b1\u1fe6\u03bb\u03bf\u03c2\tSee [Paul](../tit/01.tsv)',
+            'TIT\t1\tone\t\tA "quoted" note',
+            'TIT\t1',
+            'TIT\t3\t1\t\t[Unmatched', '')))
+        write_file(os.path.join(self.temp_dir, 'en_tn_65-3JN.tsv'), '\n'.join((header,
+            '3JN\t1\t2\t\tNote (with [a link](rc://en/ta/man/translate/figs-metaphor))',
+            '3JN\t1\t1\t\tNote 1) first', '')))
+        expected_warnings = [
+            '<a href="https://git.door43.org///src/master//en_tn_57-TIT.tsv">/en_tn_57-TIT.tsv</a>: contains invalid link: (../tit/01.tsv)',
+            "Markdown header jumped directly to level 3 at TIT front:intro",
+            "Bad 'one' verse number in chapter 1 in en_tn_57-TIT.tsv",
+            "Bad TIT line near 1:one with 1 tabs (expected 4)",
+            "Missing chapter number 2 after 1 in en_tn_57-TIT.tsv",
+            "Unmatched square brackets at TIT 3:1 in '[Unmatched'",
+            "TIT 3:1: Possible missing closing ']' — found 1 '[' but 0 ']'",
+            "TIT 3:1: Seem to have the following unclosed field(s): '['",
+            "Decrementing '1' verse number after 2 in chapter 1 in en_tn_65-3JN.tsv",
+        ]
+        linters_warnings = []
+        for workers in (1, 2):
+            linter = TnTsvLinter(repo_subject='TSV_Translation_Notes', source_dir=self.temp_dir)
+            with mock.patch('linters.linter.lint_workers', workers):
+                linter.run()
+            linters_warnings.append([warning for warning in linter.log.warnings
+                                                if not warning.startswith('Missing tN tsv book')])
+        self.assertEqual(linters_warnings[0], expected_warnings)
+        self.assertEqual(linters_warnings[1], linters_warnings[0])
+
+
     # Removed coz of extra parameters Nov 2019 RJH
     # def test_lint_overflow_warnings(self):
     #     # given
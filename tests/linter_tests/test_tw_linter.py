@@ -71,6 +71,30 @@ class TestTwLinter(LinterTestCase):
     # def verify_results(self, expected_warnings, linter):
     #     self.assertEqual(len(linter.log.warnings) > 0, expected_warnings)
 
+    @mock.patch('linters.markdown_linter.MarkdownLinter.invoke_markdown_linter', return_value={})
+    def test_files_read_once(self, _mock_invoke_markdown_linter):
+        write_file(os.path.join(self.temp_dir, 'bible', 'kt', 'god.md'), '# God\n\nSee [Lord](../kt/lord.md).\n')
+        write_file(os.path.join(self.temp_dir, 'bible', 'names', 'aaron.md'), '# Aaron\n\nSee [Moses](../moses.md).\n')
+        write_file(os.path.join(self.temp_dir, 'bible', 'kt', 'lord.md'), '# Lord\n\nSee [God](./god.md).\n')
+        with mock.patch('linters.markdown_linter.read_file', wraps=read_file) as mock_read_file:
+            linter = TwLinter(repo_subject='Translation_Words', source_dir=self.temp_dir)
+            linter.run()
+        self.assertEqual(mock_read_file.call_count, 3)
+        self.assertEqual([warning for warning in linter.log.warnings if 'invalid link' in warning],
+                         ['<a href="https://git.door43.org///src/master/bible/names/aaron.md">bible/names/aaron.md</a>'
+                          ': contains invalid link: (../moses.md)'])
+
+    @mock.patch('linters.markdown_linter.MarkdownLinter.invoke_markdown_linter', return_value={})
+    def test_links_checked_in_excluded_files(self, _mock_invoke_markdown_linter):
+        write_file(os.path.join(self.temp_dir, 'bible', 'kt', 'god.md'), '# God\n')
+        write_file(os.path.join(self.temp_dir, 'README.md'), '# tW\n\nSee [God](bible/kt/god.md) and [Lord](bible/kt/lord.md).\n')
+        linter = TwLinter(repo_subject='Translation_Words', source_dir=self.temp_dir)
+        linter.run()
+        self.assertNotIn('README.md', linter.get_strings()) # Not linted as Markdown
+        self.assertEqual([warning for warning in linter.log.warnings if 'invalid link' in warning],
+                         ['<a href="https://git.door43.org///src/master//README.md">/README.md</a>'
+                          ': contains invalid link: (bible/kt/lord.md)'])
+
     def verify_results_warnings_count(self, expected_warnings_count, linter):
         # print( "warnings3,", len(linter.log.warnings), linter.log.warnings)
         self.assertEqual(len(linter.log.warnings), expected_warnings_count)
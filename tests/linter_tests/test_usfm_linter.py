@@ -3,9 +3,11 @@ import tempfile
 import shutil
 import time
 import unittest
+from unittest import mock
 from tests.linter_tests.linter_unittest import LinterTestCase
 from general_tools import file_utils
 from linters.usfm_linter import UsfmLinter
+from tx_usfm_tools import verifyUSFM
 from general_tools.file_utils import write_file, read_file, unzip
 from resource_container.ResourceContainer import RC
 from app_settings.app_settings import AppSettings
@@ -517,6 +519,44 @@ class TestUsfmLinter(LinterTestCase):
         AppSettings.logger.debug("Checking time was " + str(elapsed_seconds) + " seconds")
         self.verify_results_counts(expected_warnings, linter)
 
+    def test_EnUlbSubsetVerifiedInParallel(self):
+        check_files = ['31-OBA.usfm', '57-TIT.usfm', '64-2JN.usfm', '65-3JN.usfm']
+        out_dir = self.unzip_resource_only('en_ulb.zip', check_files)
+        self.replace_tag(out_dir, '57-TIT.usfm', 'mt', '')
+        self.replace_verse(out_dir, '65-3JN.usfm', chapter=1, start_vs=3, end_vs=5, replace='\\v 3 ')
+        with mock.patch('linters.linter.lint_workers', 1):
+            expected = self.run_linter(out_dir).log.warnings
+        with mock.patch('linters.linter.lint_workers', 2):
+            linter = self.run_linter(out_dir)
+        self.assertTrue(expected)
+        self.assertEqual(linter.log.warnings, expected)
+
+    def test_PhpReusesStoredVerification(self):
+        out_dir = self.copy_resource(self.php_repo_path)
+        self.replace_verse(out_dir, self.php_file_name, chapter=2, start_vs=1, end_vs=3, replace='\\v 1 ')
+        lint_results_db = os.path.join(self.temp_dir, 'lint_results.sqlite')
+        with mock.patch('linters.linter.lint_results_db', lint_results_db), \
+                mock.patch('linters.linter.lint_workers', 1), \
+                mock.patch('tx_usfm_tools.verifyUSFM.verify_contents_quiet',
+                           wraps=verifyUSFM.verify_contents_quiet) as mock_verify:
+            expected = self.run_linter(out_dir).log.warnings
+            linter = self.run_linter(out_dir)
+            self.assertEqual(mock_verify.call_count, 1)
+            self.append_text(out_dir, self.php_file_name, '\\v 24 Extra')
+            self.run_linter(out_dir)
+            self.assertEqual(mock_verify.call_count, 2)
+        self.assertTrue(expected)
+        self.assertEqual(linter.log.warnings, expected)
+
+    def test_PhpLinesWithoutContent(self):
+        out_dir = self.copy_resource(self.php_repo_path)
+        self.append_text(out_dir, self.php_file_name, '\n\\s1\n\\v 24\n\\s5\n')
+        linter = self.run_linter(out_dir)
+        self.assertEqual([warning for warning in linter.log.warnings if warning.endswith((' content', ' short'))],
+                         ["PHP 4:21 '\\s1' line has no content",
+                          "PHP 4:? '\\v 24' line seems too short",
+                          ])
+
     def test_EnUlbValidConvertSingle(self):
         out_dir = self.unzip_resource('en_ulb.zip')
         expected_warnings = 0
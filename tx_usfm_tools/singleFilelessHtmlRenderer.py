@@ -14,7 +14,7 @@ class SingleFilelessHtmlRenderer(AbstractRenderer):
     def __init__(self, books_usfm):
         # logging.debug(f"SingleHTMLRenderer.__init__( {inputDir}, {outputFilename} ) …")
         self.booksUsfm = books_usfm
-        self.html = ''
+        self.html_parts = []  # Joined once at the end, rather than copying the HTML so far for every token
         # Position
         self.cb = ''    # Current Book
         self.cc = '001'    # Current Chapter
@@ -47,8 +47,8 @@ class SingleFilelessHtmlRenderer(AbstractRenderer):
         warning_list = self.run()
         self.writeFootnotes()
         self.writeCrossReferences()
-        self.html += '\n    </body>\n</html>\n'
-        return [self.html, warning_list]
+        self.html_parts.append('\n    </body>\n</html>\n')
+        return [''.join(self.html_parts), warning_list]
 
     def writeHeader(self):
         h = """
@@ -102,7 +102,7 @@ class SingleFilelessHtmlRenderer(AbstractRenderer):
 <body>
 <h1>""" + self.bookName + """</h1>
 """
-        self.html += h
+        self.html_parts.append(h)
 
     def startLI(self, level=1):
         # if 'NUM' in self.bookName and '00' in self.cc: logging.debug(f"@{self.cc}:{self.cv} startLI({level})…")
@@ -111,13 +111,13 @@ class SingleFilelessHtmlRenderer(AbstractRenderer):
         assert self.listItemLevel == 0
         # self.listItemLevel = 0 # Should be superfluous I think
         while self.listItemLevel < level:
-            self.html += '<ul>'
+            self.html_parts.append('<ul>')
             self.listItemLevel += 1
 
     def stopLI(self):
         # if 'NUM' in self.bookName and '00' in self.cc and self.listItemLevel: logging.debug(f"@{self.cc}:{self.cv} stopLI() from level {self.listItemLevel}…")
         while self.listItemLevel > 0:
-            self.html += '</ul>'
+            self.html_parts.append('</ul>')
             self.listItemLevel -= 1
         assert self.listItemLevel == 0
 
@@ -125,7 +125,7 @@ class SingleFilelessHtmlRenderer(AbstractRenderer):
         return s.replace('~', '&nbsp;')
 
     def write(self, unicodeString):
-        self.html += unicodeString.replace('~', '&nbsp;')
+        self.html_parts.append(unicodeString.replace('~', '&nbsp;'))
 
     def writeIndent(self, level):
         assert level > 0
@@ -140,10 +140,10 @@ class SingleFilelessHtmlRenderer(AbstractRenderer):
         # if 'NUM' in self.bookName and '00' in self.cc and self.indentFlag: logging.debug(f"@{self.cc}:{self.cv} closeParagraph() from {self.indentFlag}…")
         if self.inParagraph:
             self.inParagraph = False
-            self.html += '</p>\n'
+            self.html_parts.append('</p>\n')
         if self.indentFlag:
             self.indentFlag = False
-            self.html += '</p>\n'
+            self.html_parts.append('</p>\n')
 
     def renderID(self, token):
         self.writeFootnotes()
@@ -9,6 +9,9 @@ from tx_usfm_tools.parseUsfm import UsfmToken
 #   Simplest renderer. Ignores everything except ascii text.
 #
 
+# Size of the output file's buffer, so the many small writes for the tokens go out to the file in large chunks
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
 class SingleHTMLRenderer(AbstractRenderer):
     def __init__(self, inputDir, outputFilename):
         # logging.debug(f"SingleHTMLRenderer.__init__( {inputDir}, {outputFilename} ) …")
@@ -54,7 +57,7 @@ class SingleHTMLRenderer(AbstractRenderer):
         # logging.debug("SingleHTMLRenderer.render() …")
         self.loadUSFM(self.inputDir) # Result is in self.booksUsfm
         #print(f"About to render USFM ({len(self.booksUsfm)} books): {str(self.booksUsfm)[:300]} …")
-        with open(self.outputFilename, 'wt', encoding='utf-8') as self.f:
+        with open(self.outputFilename, 'wt', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as self.f:
             warning_list = self.run()
             self.writeFootnotes()
             self.writeCrossReferences()
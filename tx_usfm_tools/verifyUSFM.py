@@ -4,7 +4,7 @@
 # Uses parseUsfm module.
 # Place this script in the USFM-Tools folder.
 
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import re
 import sys
 import logging
@@ -13,9 +13,7 @@ from tx_usfm_tools import parseUsfm, usfm_verses
 
 
 # Global variables
-lastToken = None
 vv_re = re.compile(r'([0-9]+)-([0-9]+)')
-error_log:Optional[List[str]] = None
 
 chapter_marker_re = re.compile(r'\\c(?!a)') # Don't match on \ca
 verse_marker_re = re.compile(r'\\v(?!a)') # Don't match on \va
@@ -26,134 +24,124 @@ NON_CHAPTER_BOOK_CODES = ('FRT','BAK','OTH','INT','CNC','GLO','TDX','NDX')
 
 
 class State:
-    IDs = []
-    ID = ''
-    IDE = ''
-    usfm = ''
-    toc1 = ''
-    toc2 = ''
-    toc3 = ''
-    mt = ''
-    heading = ''
-    master_chapter_label = ''
-    chapter_label = ''
-    chapter = 0
-    nParagraphs = 0
-    nMargins = 0
-    nQuotes = 0
-    verse = 0
-    lastVerse = 0
-    needVerseText = False
-    textOkayHere = False
-    referenceString = ''
-    lastReferenceString = ''
-    chapters = set()
-    verseCounts = {}
-    errorRefs = set()
+    """
+    Everything known about the book being verified, and the errors found in it so far.
+
+    A new State is made for each book (and passed to all the functions below),
+        so several books can be verified at the same time.
+    """
+    verseCounts = usfm_verses.verses
     englishWords = []
-    lang_code = None
-    book_code = None
+
+    def __init__(self):
+        self.IDs = []
+        self.errorRefs = set()
+        self.error_log:Optional[List[str]] = None
+        self.lastToken = None
+        self.lang_code = None
+        self.lastChapter = 0
+        self.reset_book()
 
     def reset_all(self):
         self.reset_book()
-        State.IDs = []
-        State.errorRefs = set()
+        self.IDs = []
+        self.errorRefs = set()
 
     def reset_book(self):
-        State.ID = ''
-        State.IDE = ''
-        State.usfm = ''
-        State.toc1 = ''
-        State.toc2 = ''
-        State.toc3 = ''
-        State.mt = ''
-        State.heading = ''
-        State.master_chapter_label = ''
-        State.chapter_label = ''
-        State.chapter = 0
-        State.lastVerse = 0
-        State.verse = 0
-        State.needVerseText = False
-        State.textOkayHere = False
-        State.chapters = set()
-        State.nParagraphs = 0
-        State.nMargins = 0
-        State.nQuotes = 0
-        State.lastReferenceString = ''
-        State.referenceString = ''
-        State.book_code = None
+        self.ID = ''
+        self.IDE = ''
+        self.usfm = ''
+        self.toc1 = ''
+        self.toc2 = ''
+        self.toc3 = ''
+        self.mt = ''
+        self.heading = ''
+        self.master_chapter_label = ''
+        self.chapter_label = ''
+        self.chapter = 0
+        self.lastVerse = 0
+        self.verse = 0
+        self.needVerseText = False
+        self.textOkayHere = False
+        self.chapters = set()
+        self.nParagraphs = 0
+        self.nMargins = 0
+        self.nQuotes = 0
+        self.lastReferenceString = ''
+        self.referenceString = ''
+        self.book_code = None
 
     def set_book_code(self, book):
-        State.book_code = book
-        State.referenceString = book  # default
+        self.book_code = book
+        self.referenceString = book  # default
 
     def setLanguageCode(self, code):
-        State.lang_code = code
+        self.lang_code = code
 
     def addID(self, id):
         self.reset_book()
-        State.IDs.append(id)
-        State.ID = id
-        State.lastReferenceString = State.referenceString
-        State.referenceString = id
+        self.IDs.append(id)
+        self.ID = id
+        self.lastReferenceString = self.referenceString
+        self.referenceString = id
 
     def getIDs(self):
-        return State.IDs
+        return self.IDs
 
     def addHeading(self, heading):
-        State.heading = heading
+        self.heading = heading
 
     def addIDE(self, ide):
-        State.IDE = ide
+        self.IDE = ide
 
     def addUSFM(self, usfm):
-        State.usfm = usfm
+        self.usfm = usfm
 
     def addTOC1(self, toc):
-        State.toc1 = toc
+        self.toc1 = toc
 
     def addTOC2(self, toc):
-        State.toc2 = toc
+        self.toc2 = toc
 
     def addTOC3(self, toc):
-        State.toc3 = toc
+        self.toc3 = toc
 
     def addMT(self, mt):
-        State.mt = mt
+        self.mt = mt
 
     def addChapterLabel(self, text):
-        if State.chapter == 0:
-            State.master_chapter_label = text
+        if self.chapter == 0:
+            self.master_chapter_label = text
         else:
-            State.chapter_label = text
+            self.chapter_label = text
 
     def addChapter(self, c):
-        State.lastChapter = State.chapter
-        State.chapter = int(c)
-        State.chapters.add(State.chapter)
-        State.lastVerse = 0
-        State.nParagraphs = 0
-        State.nMargins = 0
-        State.nQuotes = 0
-        State.verse = 0
-        State.needVerseText = False
-        State.textOkayHere = False
-        State.lastReferenceString = State.referenceString
-        State.referenceString = self.get_id() + ' ' + str(State.chapter)
+        self.lastChapter = self.chapter
+        self.chapter = int(c)
+        self.chapters.add(self.chapter)
+        self.lastVerse = 0
+        self.nParagraphs = 0
+        self.nMargins = 0
+        self.nQuotes = 0
+        self.verse = 0
+        self.needVerseText = False
+        self.textOkayHere = False
+        self.lastReferenceString = self.referenceString
+        self.referenceString = self.get_id() + ' ' + str(self.chapter)
 
     def get_id(self):
-        id = State.ID
-        if not State.ID:
-            id = State.book_code  # use book code if no ID given
+        id = self.ID
+        if not self.ID:
+            id = self.book_code  # use book code if no ID given
         return id
 
     def addParagraph(self):
-        State.nParagraphs += 1
-        State.textOkayHere = True
+        self.nParagraphs += 1
+        self.textOkayHere = True
 
     def addMargin(self):
-        State.nMargins += 1
-        State.textOkayHere = True
+        self.nMargins += 1
+        self.textOkayHere = True
 
     # supports a span of verses, e.g. 3-4, if needed. Passes the verse(s) on to addVerse()
     def addVerses(self, vv):
@@ -172,33 +160,33 @@ class State:
             self.addVerse(str(vn))
 
     def addVerse(self, v):
-        State.lastVerse = State.verse
-        State.verse = int(v)
-        State.needVerseText = True
-        State.textOkayHere = True
-        State.lastReferenceString = State.referenceString
-        State.referenceString = self.get_id() + ' ' + str(State.chapter) + ':' + v
+        self.lastVerse = self.verse
+        self.verse = int(v)
+        self.needVerseText = True
+        self.textOkayHere = True
+        self.lastReferenceString = self.referenceString
+        self.referenceString = self.get_id() + ' ' + str(self.chapter) + ':' + v
 
     def textOkay(self):
-        return State.textOkayHere
+        return self.textOkayHere
 
     def needText(self):
-        return State.needVerseText
+        return self.needVerseText
 
     def addText(self):
-        State.needVerseText = False
-        State.textOkayHere = True
+        self.needVerseText = False
+        self.textOkayHere = True
 
     def addQuote(self):
-        State.nQuotes += State.nQuotes + 1
-        State.textOkayHere = True
+        self.nQuotes += self.nQuotes + 1
+        self.textOkayHere = True
 
     # Adds the specified reference to the set of error references
     # Returns True if reference can be added
     # Returns False if reference was previously added
     def addError(self, ref):
         success = False
-        if ref not in State.errorRefs:
+        if ref not in self.errorRefs:
             self.errorRefs.add(ref)
             success = True
         return success
@@ -206,14 +194,16 @@ class State:
 
     def getEnglishWords(self):
         if not State.englishWords:
+            english_words_list = []  # Only shared once it's complete
             for book in usfm_verses.verses:
                 book_data = usfm_verses.verses[book]
                 english_name = book_data['en_name'].lower()
                 english_words = english_name.split(' ')
                 for word in english_words:
                     if word and not isNumber(word):
-                        State.englishWords.append(word)
-            State.englishWords.sort()
+                        english_words_list.append(word)
+            english_words_list.sort()
+            State.englishWords = english_words_list
         return State.englishWords
 
 
@@ -244,15 +234,14 @@ class State:
 
 
 
-def report_error(msg):
-    if error_log is None:  # if error logging is enabled then don't print
+def report_error(state, msg):
+    if state.error_log is None:  # if error logging is enabled then don't print
         sys.stderr.write(msg)
     else:
-        error_log.append(msg.rstrip(' \t\n\r'))
+        state.error_log.append(msg.rstrip(' \t\n\r'))
 
 
-def verifyVerseCount():
-    state = State()
+def verifyVerseCount(state):
     if not state.ID:
         return -1
 
@@ -260,44 +249,42 @@ def verifyVerseCount():
         # Revelation 12 may have 17 or 18 verses
         # 3 John may have 14 or 15 verses
         if state.referenceString != 'REV 12:18' and state.referenceString != '3JN 1:15':
-            report_error(f"{state.referenceString} - Should have {state.nVerses(state.ID, state.chapter)} verses\n")
+            report_error(state, f"{state.referenceString} - Should have {state.nVerses(state.ID, state.chapter)} verses\n")
 
 
-def verifyNotEmpty(filename, book_code):
-    state = State()
+def verifyNotEmpty(state, filename, book_code):
     if not state.ID \
     or (state.chapter==0 and book_code not in NON_CHAPTER_BOOK_CODES):
-        report_error(f"{filename} - File may be empty.")
+        report_error(state, f"{filename} - File may be empty.")
 
 
-def verifyIdentification(book_code):
-    state = State()
+def verifyIdentification(state, book_code):
     if not state.ID:
-        report_error(f"{book_code} - Missing \\id tag")
+        report_error(state, f"{book_code} - Missing \\id tag")
     elif (book_code is not None) and (book_code != state.ID):
-        report_error(f"{state.ID} - Found in \\id tag does not match code '{book_code}' found in filename")
+        report_error(state, f"{state.ID} - Found in \\id tag does not match code '{book_code}' found in filename")
 
     if not state.IDE:
-        report_error(f"{book_code} - Missing \\ide tag")
+        report_error(state, f"{book_code} - Missing \\ide tag")
 
     if state.heading:
         if state.heading.isupper():
-            report_error(f"{book_code} - \\h '{state.heading}' shouldn't be UPPERCASE")
+            report_error(state, f"{book_code} - \\h '{state.heading}' shouldn't be UPPERCASE")
     else:
-        report_error(f"{book_code} - Missing \\h tag")
+        report_error(state, f"{book_code} - Missing \\h tag")
 
     if book_code not in NON_CHAPTER_BOOK_CODES:
         if not state.toc1:
-            report_error(f"{book_code} - Missing \\toc1 tag")
+            report_error(state, f"{book_code} - Missing \\toc1 tag")
 
         if not state.toc2:
-            report_error(f"{book_code} - Missing \\toc2 tag")
+            report_error(state, f"{book_code} - Missing \\toc2 tag")
 
         if not state.toc3:
-            report_error(f"{book_code} - Missing \\toc3 tag")
+            report_error(state, f"{book_code} - Missing \\toc3 tag")
 
         if not state.mt:
-            report_error(f"{book_code} - Missing \\mt or \\mt1 tag")
+            report_error(state, f"{book_code} - Missing \\mt or \\mt1 tag")
 # end of verifyIdentification function
 
 
@@ -309,7 +296,7 @@ def make_reference_string(book, chapter, verse=None):
 # end of make_reference_string function
 
 
-def verifyChapterAndVerseMarkers(text, book):
+def verifyChapterAndVerseMarkers(state, text, book):
     pos = 0
     last_ch = 1
     for chapter_current in chapter_marker_re.finditer(text):
@@ -323,30 +310,30 @@ def verifyChapterAndVerseMarkers(text, book):
             end_index += 1
         previous_char = text[start_index - 1]
         newline_before = (previous_char == '\n') or (previous_char == '\r')
-        ch_num, has_space_after = get_chapter_number(text, end_index)
+        ch_num, has_space_after = get_chapter_number(state, text, end_index)
         if ch_num >= 0:
             if not has_space:
-                add_error(text, book, "Missing space before chapter number: '{0}'", start_index, last_ch)
+                add_error(state, text, book, "Missing space before chapter number: '{0}'", start_index, last_ch)
             elif not has_space_after:
-                add_error(text, book, "Missing new line after chapter number: '{0}'", start_index, last_ch)
+                add_error(state, text, book, "Missing new line after chapter number: '{0}'", start_index, last_ch)
             elif not newline_before:
-                add_error(text, book, "Missing new line before chapter marker: '{0}'", start_index-4, last_ch)
-            check_chapter(text, book, last_ch, pos, start_index)
+                add_error(state, text, book, "Missing new line before chapter marker: '{0}'", start_index-4, last_ch)
+            check_chapter(state, text, book, last_ch, pos, start_index)
             last_ch = ch_num
             pos = end_index
         else:
-            add_error(text, book, "Invalid chapter number format: '{0}'", start_index, last_ch)
+            add_error(state, text, book, "Invalid chapter number format: '{0}'", start_index, last_ch)
 
-    check_chapter(text, book, last_ch, pos, len(text))  # check last chapter
+    check_chapter(state, text, book, last_ch, pos, len(text))  # check last chapter
 
 
-def add_error(text, book, message, pos, chapter, verse=None):
+def add_error(state, text, book, message, pos, chapter, verse=None):
     length = 8
     example = text[pos: pos + length]
-    report_error(make_reference_string(book, chapter, verse) + " - " + message.format(example))
+    report_error(state, make_reference_string(book, chapter, verse) + " - " + message.format(example))
 
 
-def check_chapter(text, book, chapter_num, start, end):
+def check_chapter(state, text, book, chapter_num, start, end):
     last_vs_range = '1'
     for verse_current in verse_marker_re.finditer(text, start, end):
         start = verse_current.start()
@@ -357,26 +344,26 @@ def check_chapter(text, book, chapter_num, start, end):
             end += 1
         char = text[start - 1]
         space_before = char in WHITE_SPACE
-        vs_range, has_space_after = get_verse_range(text, end)
+        vs_range, has_space_after = get_verse_range(state, text, end)
         if vs_range != '':
             if not has_space:
-                add_error(text, book, "Missing space before verse number: '{0}'", start, chapter_num, vs_range)
+                add_error(state, text, book, "Missing space before verse number: '{0}'", start, chapter_num, vs_range)
             elif not has_space_after:
-                add_error(text, book, "Missing space after verse number: '{0}'", start, chapter_num, vs_range)
+                add_error(state, text, book, "Missing space after verse number: '{0}'", start, chapter_num, vs_range)
             elif not space_before:
-                add_error(text, book, "Missing space before verse marker: '{0}'", start-1, chapter_num, vs_range)
+                add_error(state, text, book, "Missing space before verse marker: '{0}'", start-1, chapter_num, vs_range)
             last_vs_range = vs_range
         else:
             # print("book", book, "chapter", chapter_num, "verse_current", verse_current)
             # print(f"start='{start}' end='{end}'")
             # print(f"char='{char}'")
             # print(f"space_before={space_before} vs_range={vs_range} has_space_after={has_space_after}")
-            add_error(text, book, "Invalid verse number: '{0}'", start, chapter_num, last_vs_range)
+            add_error(state, text, book, "Invalid verse number: '{0}'", start, chapter_num, last_vs_range)
 
 
-def get_verse_range(text, start):
+def get_verse_range(state, text, start):
     pos = start
-    verse, c, end = get_number(text, pos)
+    verse, c, end = get_number(state, text, pos)
     if verse == '':
         return verse, False
 
@@ -384,7 +371,7 @@ def get_verse_range(text, start):
         has_white_space = (c in WHITE_SPACE)
         return verse, has_white_space
 
-    second_vs, c, end = get_number(text, end+1)
+    second_vs, c, end = get_number(state, text, end+1)
     if second_vs == '':
         return '', False
 
@@ -393,16 +380,16 @@ def get_verse_range(text, start):
     return verse, has_white_space
 
 
-def get_chapter_number(text, start):
+def get_chapter_number(state, text, start):
     pos = start
-    digits, c, _end = get_number(text, pos)
+    digits, c, _end = get_number(state, text, pos)
     has_white_space = (c in WHITE_SPACE)
     if digits:
         return int(digits), has_white_space
     return -1, has_white_space
 
 
-def get_number(text, start_index):
+def get_number(state, text, start_index):
     """
     Called by get_verse_range() and get_chapter_number()
     """
@@ -412,8 +399,7 @@ def get_number(text, start_index):
     for pos in range(start_index, len(text)):
         c = text[pos]
         if c=='0' and not digits:
-            state = State()
-            report_error(f"{state.referenceString} has leading zero in following chapter/verse number")
+            report_error(state, f"{state.referenceString} has leading zero in following chapter/verse number")
         if (c >= '0') and (c <= '9'):
             digits += c
             continue
@@ -421,24 +407,22 @@ def get_number(text, start_index):
         break
     return digits, c, end_index
 
-def verifyChapterCount():
-    state = State()
+def verifyChapterCount(state):
     if state.ID:
         expected_chapters = state.nChapters(state.ID)
         if len(state.chapters) != expected_chapters:
             for i in range(1, expected_chapters + 1):
                 if i not in state.chapters:
-                    report_error(f"{state.ID} {i} - Missing chapter\n")
+                    report_error(state, f"{state.ID} {i} - Missing chapter\n")
 
 
-def verifyTextTranslated(text:str, token) -> None:
-    found, word = needsTranslation(text)
+def verifyTextTranslated(state, text:str, token) -> None:
+    found, word = needsTranslation(state, text)
     if found:
-        report_error(f"Token '\\{token}' has possible untranslated word '{word}'")
+        report_error(state, f"Token '\\{token}' has possible untranslated word '{word}'")
 
 
-def needsTranslation(text) -> Tuple[bool,Optional[str]]:
-    state = State()
+def needsTranslation(state, text) -> Tuple[bool,Optional[str]]:
     if state.lang_code \
     and state.lang_code not in ('en', 'el-x-koine', 'hbo'):  # no need to translate English
         # NOTE: We don't put booknames in original Heb/Grk documents either
@@ -479,53 +463,44 @@ def isNumber(s) -> bool:
     return False
 
 
-def takeCL(text:str):
-    state = State()
+def takeCL(state, text:str):
     state.addChapterLabel(text)
-    verifyTextTranslated(text, 'cl')
+    verifyTextTranslated(state, text, 'cl')
 
-def takeTOC1(text):
-    state = State()
+def takeTOC1(state, text):
     state.addTOC1(text)
-    verifyTextTranslated(text, 'toc1')
+    verifyTextTranslated(state, text, 'toc1')
 
-def takeTOC2(text):
-    state = State()
+def takeTOC2(state, text):
     state.addTOC2(text)
-    verifyTextTranslated(text, 'toc2')
+    verifyTextTranslated(state, text, 'toc2')
 
-def takeTOC3(text):
-    state = State()
+def takeTOC3(state, text):
     state.addTOC3(text)
-    # verifyTextTranslated(text, 'toc3') # toc3 commonly has 3-letter book code, not to be translated
+    # verifyTextTranslated(state, text, 'toc3') # toc3 commonly has 3-letter book code, not to be translated
 
-def takeMT(text):
-    state = State()
+def takeMT(state, text):
     state.addMT(text)
-    verifyTextTranslated(text, 'mt')
+    verifyTextTranslated(state, text, 'mt')
 
-def takeH(heading):
-    state = State()
+def takeH(state, heading):
     state.addHeading(heading)
-    verifyTextTranslated(heading, 'h')
+    verifyTextTranslated(state, heading, 'h')
 
-def takeIDE(ide):
-    state = State()
+def takeIDE(state, ide):
     state.addIDE(ide)
 
-def takeUSFM(usfm):
-    state = State()
+def takeUSFM(state, usfm):
     state.addUSFM(usfm)
 
 
-def takeID(id):
-    state = State()
+def takeID(state, id):
     code = '' if not id else id.split(' ')[0] # Take the first token in the \id field
     if len(code) < 3:
-        report_error(f"{state.referenceString} - Invalid ID: '{id}'\n")
+        report_error(state, f"{state.referenceString} - Invalid ID: '{id}'\n")
         return
     if code in state.getIDs():
-        report_error(f"{state.referenceString} - Duplicate ID: '{id}'\n")
+        report_error(state, f"{state.referenceString} - Duplicate ID: '{id}'\n")
         return
     if code in NON_CHAPTER_BOOK_CODES: # Books without chapters/verses
         state.addID(code)
@@ -535,50 +510,46 @@ def takeID(id):
         if k == code:
             state.addID(code)
             return
-    report_error(f"{state.referenceString} - Invalid Code '{code}' in ID: '{id}'\n")
+    report_error(state, f"{state.referenceString} - Invalid Code '{code}' in ID: '{id}'\n")
 
 
-def takeC(c):
-    state = State()
+def takeC(state, c):
     state.addChapter(c)
     if not state.IDs:
-        report_error(f"{state.referenceString} - Missing ID before chapter\n")
+        report_error(state, f"{state.referenceString} - Missing ID before chapter\n")
     if state.chapter < state.lastChapter:
-        report_error(f"{state.referenceString} - Chapter out of order\n")
+        report_error(state, f"{state.referenceString} - Chapter out of order\n")
     elif state.chapter == state.lastChapter:
-        report_error(f"{state.referenceString} - Duplicate chapter\n")
+        report_error(state, f"{state.referenceString} - Duplicate chapter\n")
     elif state.chapter > state.lastChapter + 2:
-        report_error(f"{state.lastReferenceString} - Missing chapters between this and: {state.referenceString}\n")
+        report_error(state, f"{state.lastReferenceString} - Missing chapters between this and: {state.referenceString}\n")
     elif state.chapter > state.lastChapter + 1:
-        report_error(f"{state.lastReferenceString} - Missing chapter between this and: {state.referenceString}\n")
+        report_error(state, f"{state.lastReferenceString} - Missing chapter between this and: {state.referenceString}\n")
 
 
-def takeP():
-    state = State()
+def takeP(state):
     state.addParagraph()
 
-def takeM():
-    state = State()
+def takeM(state):
     state.addMargin()
 
 
-def takeV(v):
-    state = State()
+def takeV(state, v):
     state.addVerses(v)
     if state.lastVerse == 0:  # if first verse in chapter
         if not state.IDs and state.chapter == 0:
-            report_error(f"{state.referenceString} {v} - Missing ID before verse\n")
+            report_error(state, f"{state.referenceString} {v} - Missing ID before verse\n")
         if state.chapter == 0:
-            report_error(f"{state.referenceString} - Missing chapter tag\n")
+            report_error(state, f"{state.referenceString} - Missing chapter tag\n")
         if (state.nParagraphs == 0) and (state.nQuotes == 0) and (state.nMargins == 0):
-            report_error(f"{state.referenceString} - Missing paragraph marker (\\p), margin (\\m) or quote (\\q) before verse text\n")
+            report_error(state, f"{state.referenceString} - Missing paragraph marker (\\p), margin (\\m) or quote (\\q) before verse text\n")
 
     missing = ""
     if state.verse < state.lastVerse and state.addError(state.lastReferenceString):
-        report_error(f"{state.referenceString} - Verse out of order: after {state.lastReferenceString}\n")
+        report_error(state, f"{state.referenceString} - Verse out of order: after {state.lastReferenceString}\n")
         state.addError(state.referenceString)
     elif state.verse == state.lastVerse:
-        report_error(f"{state.referenceString} - Duplicated verse number\n")
+        report_error(state, f"{state.referenceString} - Duplicated verse number\n")
     elif state.verse == state.lastVerse + 2 and not isOptional(state.referenceString):
         missing = " - Missing verse between this and: "
     elif state.verse > state.lastVerse + 2:
@@ -586,13 +557,13 @@ def takeV(v):
 
     if missing:
         state.addError(state.lastReferenceString)
-        if not error_log is None:  # see if already warned for missing verses
+        if not state.error_log is None:  # see if already warned for missing verses
             gaps = False
             for i in range(state.lastVerse+1, state.verse):
                 ref = f"{state.ID} {state.chapter}:{i}"
                 ref_len = len(ref)
                 verse_warning_found = False
-                for error in error_log:
+                for error in state.error_log:
                     if error[:ref_len] == ref:
                         verse_warning_found = True
                         break
@@ -601,23 +572,22 @@ def takeV(v):
             if not gaps:
                 return
 
-        report_error(state.lastReferenceString + missing + state.referenceString + '\n')
+        report_error(state, state.lastReferenceString + missing + state.referenceString + '\n')
 
 
-def takeText(t):
-    state = State()
-    global lastToken
-    if not state.textOkay() and not isTextCarryingToken(lastToken):
+def takeText(state, t):
+    lastToken = state.lastToken
+    if not state.textOkay() and not (lastToken and get_token_kind(lastToken).is_text_carrying):
         if t[0] == '\\':
-            report_error(f"{state.referenceString} - Nearby uncommon or invalid marker\n")
+            report_error(state, f"{state.referenceString} - Nearby uncommon or invalid marker\n")
         else:
             print(f"Missing verse marker before text: <{t}> around {state.referenceString}")
-            report_error(f"Missing verse marker or extra text around {state.referenceString}: <{t[:10]}>.\n")
-            report_error(f"{state.referenceString} - Missing verse marker or extra text nearby\n")
+            report_error(state, f"Missing verse marker or extra text around {state.referenceString}: <{t[:10]}>.\n")
+            report_error(state, f"{state.referenceString} - Missing verse marker or extra text nearby\n")
         if lastToken:
-            report_error(f"{state.referenceString} - Preceding Token.type was '{lastToken.getType()}'\n")
+            report_error(state, f"{state.referenceString} - Preceding Token.type was '{lastToken.getType()}'\n")
         else:
-            report_error(f"{state.referenceString} - No preceding Token\n")
+            report_error(state, f"{state.referenceString} - No preceding Token\n")
     state.addText()
 
 
@@ -626,9 +596,9 @@ def takeUnknown(state, token):
     if (value == 'v') or (value == 'c'):
         return  # skip malformed chapter and verses - will be caught later
     elif value == 'p':
-        report_error(f"{state.referenceString} - Orphan paragraph marker follows")
+        report_error(state, f"{state.referenceString} - Orphan paragraph marker follows")
     else:
-        report_error(f"{state.referenceString} - Unknown USFM token: '\\{value}'")
+        report_error(state, f"{state.referenceString} - Unknown USFM token: '\\{value}'")
 
 
 # Returns True if token is part of a footnote
@@ -680,72 +650,100 @@ def isTextCarryingToken(token):
         or isCharacterFormatting(token) # RJH added this (for \wj fields, etc.)
 
 
-def take(token):
-    state = State()
-    if isFootnote(token):
+def takeCToken(state, token):
+    verifyVerseCount(state)  # for the preceding chapter
+    takeC(state, token.value)
+
+
+# How take() handles each type of token, in the order they're checked in,
+#   i.e., the first of these whose predicates a token answers True to decides its handler
+TOKEN_HANDLERS = (
+    (('isID',), lambda state, token: takeID(state, token.value)),
+    (('isIDE',), lambda state, token: takeIDE(state, token.value)),
+    (('isUSFM',), lambda state, token: takeUSFM(state, token.value)),
+    (('isH',), lambda state, token: takeH(state, token.value)),
+    (('isTOC1',), lambda state, token: takeTOC1(state, token.value)),
+    (('isTOC2',), lambda state, token: takeTOC2(state, token.value)),
+    (('isTOC3',), lambda state, token: takeTOC3(state, token.value)),
+    (('isMT', 'isMT1'), lambda state, token: takeMT(state, token.value)),
+    (('isCL',), lambda state, token: takeCL(state, token.value)),
+    (('isC',), takeCToken),
+    (('isP', 'isPI', 'isPI1', 'isPI2', 'isPC', 'isNB', 'is_ip'), lambda state, token: takeP(state)),
+    (('isV',), lambda state, token: takeV(state, token.value)),
+    (('isTEXT',), lambda state, token: takeText(state, token.value)),
+    (('isQ', 'isQ1', 'isQ2', 'isQ3'), lambda state, token: state.addQuote()),
+    (('isM', 'isMI', 'is_im'), lambda state, token: state.addMargin()),
+    (('isUnknown',), takeUnknown),
+)
+
+
+class TokenKind:
+    """
+    What take() needs to know about a class of token,
+        worked out once from its is...() methods so each token only needs a dictionary lookup
+    """
+    def __init__(self, token_class):
+        token = token_class()
+        self.is_footnote = isFootnote(token)
+        self.is_text = token.isTEXT()
+        self.is_text_carrying = isTextCarryingToken(token)
+        self.handler = None
+        for predicates, handler in TOKEN_HANDLERS:
+            if any(getattr(token, predicate)() for predicate in predicates):
+                self.handler = handler
+                break
+
+
+token_kinds:Dict[type,TokenKind] = {}
+
+
+def get_token_kind(token) -> TokenKind:
+    try:
+        return token_kinds[token.__class__]
+    except KeyError:
+        kind = token_kinds[token.__class__] = TokenKind(token.__class__)
+        return kind
+
+
+def load_token_kinds(token_class=parseUsfm.UsfmToken):
+    for subclass in token_class.__subclasses__():
+        token_kinds[subclass] = TokenKind(subclass)
+        load_token_kinds(subclass)
+
+
+def take(state, token):
+    kind = get_token_kind(token)
+    if kind.is_footnote:
         state.addText()     # footnote suffices for verse text
-    if state.needText() and not token.isTEXT() and not isTextCarryingToken(token):
+    if state.needText() and not kind.is_text and not kind.is_text_carrying:
         # print(f"EMPTY VERSE {state.referenceString}: {token}")
-        report_error(f"{state.referenceString} - Empty verse\n")
-    if token.isID():
-        takeID(token.value)
-    elif token.isIDE():
-        takeIDE(token.value)
-    elif token.isUSFM():
-        takeUSFM(token.value)
-    elif token.isH():
-        takeH(token.value)
-    elif token.isTOC1():
-        takeTOC1(token.value)
-    elif token.isTOC2():
-        takeTOC2(token.value)
-    elif token.isTOC3():
-        takeTOC3(token.value)
-    elif token.isMT() or token.isMT1():
-        takeMT(token.value)
-    elif token.isCL():
-        takeCL(token.value)
-    elif token.isC():
-        verifyVerseCount()  # for the preceding chapter
-        takeC(token.value)
-    elif token.isP() \
-    or token.isPI() or token.isPI1() or token.isPI2() \
-    or token.isPC() or token.isNB() or token.is_ip():
-        takeP()
-    elif token.isV():
-        takeV(token.value)
-    elif token.isTEXT():
-        takeText(token.value)
-    elif token.isQ() or token.isQ1() or token.isQ2() or token.isQ3():
-        state.addQuote()
-    elif token.isM() or token.isMI() or token.is_im():
-        state.addMargin()
-    elif token.isUnknown():
-        takeUnknown(state, token)
-    global lastToken
-    lastToken = token
-# end of take(token) function
+        report_error(state, f"{state.referenceString} - Empty verse\n")
+    if kind.handler is not None:
+        kind.handler(state, token)
+    state.lastToken = token
+# end of take(state, token) function
+
+
+load_token_kinds()
 
 
 def verify_contents_quiet(unicodestring:str, filename:str, book_code:str,
                                                         lang_code:str) -> Tuple[List[str],str]:
     """
     This is called by the USFM linter.
+
+    Everything about the book is kept in its own State, so it's safe to verify several books at once.
     """
-    global error_log
-    error_log = []  # enable error logging
     state = State()
-    state.reset_all()  # clear out previous values
+    state.error_log = []  # enable error logging
     state.set_book_code(book_code)
     state.setLanguageCode(lang_code)
-    verifyChapterAndVerseMarkers(unicodestring, book_code)
+    verifyChapterAndVerseMarkers(state, unicodestring, book_code)
     for token in parseUsfm.parseString(unicodestring):
-        take(token)
-    verifyNotEmpty(filename, book_code)
-    verifyIdentification(book_code)
-    verifyVerseCount()  # for last chapter
-    verifyChapterCount()
-    errors = error_log
-    error_log = None  # turn error logging back off
-    return errors, state.ID
+        take(state, token)
+    verifyNotEmpty(state, filename, book_code)
+    verifyIdentification(state, book_code)
+    verifyVerseCount(state)  # for last chapter
+    verifyChapterCount(state)
+    return state.error_log, state.ID
 # end of verify_contents_quiet function